@@ -0,0 +1,190 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+
+from bson import ObjectId
+
+from benchmark.performance_tracker import PerformanceTracker, decode_history_cursor
+
+# 대시보드 목록에 필요한 필드만 기본 프로젝션 (히스토그램 바이트 등은 제외)
+DEFAULT_HISTORY_FIELDS = [
+    "model_name",
+    "github_commit_sha",
+    "throughput_tokens_per_sec",
+    "latency_ms",
+    "ttft_ms",
+    "memory_usage_gb",
+    "latency_percentiles",
+    "server_metrics.summary",
+]
+
+_tracker: Optional[PerformanceTracker] = None
+
+async def get_tracker() -> PerformanceTracker:
+    """프로세스당 하나의 PerformanceTracker(MongoDB 커넥션 풀)를 공유"""
+    global _tracker
+    if _tracker is None:
+        _tracker = PerformanceTracker(
+            mongodb_url=os.getenv("MONGODB_URL", "mongodb://localhost:27017"),
+            github_token=os.getenv("GITHUB_TOKEN", "")
+        )
+        # 여러 백엔드 레플리카가 뜨는 환경에서는 다른 프로세스가 저장한 결과도 SSE로 전달
+        if os.getenv("BENCHMARK_LIVE_REPLICATION", "false").lower() == "true":
+            _tracker.start_live_stream_replication()
+        # 추세 API가 읽는 시간/일 롤업 갱신 (upsert라 레플리카마다 돌아도 결과는 같음, 0이면 끔)
+        rollup_interval_s = float(os.getenv("BENCHMARK_ROLLUP_INTERVAL_S", "300"))
+        if rollup_interval_s > 0:
+            _tracker.start_rollup_job(rollup_interval_s)
+    return _tracker
+
+@asynccontextmanager
+async def lifespan(app):
+    global _tracker
+    try:
+        yield
+    finally:
+        # 종료 시 버퍼에 남은 결과를 저장하고 MongoDB 연결 정리
+        if _tracker is not None:
+            await _tracker.close()
+            _tracker = None
+
+router = APIRouter(lifespan=lifespan)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _history_etag(version: int, request: Request) -> str:
+    """하이워터마크 버전 + 조회 조건(since 제외)으로 약한 ETag 생성
+
+    since는 클라이언트가 마지막으로 받은 결과를 가리킬 뿐이므로, 버전이 같으면
+    since와 무관하게 새 결과가 없다는 뜻이다.
+    """
+    params = sorted((k, v) for k, v in request.query_params.multi_items() if k != "since")
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+    return f'W/"{version}-{digest}"'
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+@router.get("/api/benchmarks")
+async def list_benchmarks(
+    request: Request,
+    model: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="쉼표로 구분한 반환 필드"),
+    after: Optional[str] = Query(None, description="이전 응답 마지막 줄의 cursor"),
+    since: Optional[str] = Query(None, description="이전 응답에서 inserted_at이 가장 큰 줄의 cursor (그 이후 저장된 결과만 저장 순으로 조회)"),
+    limit: int = Query(100, ge=1, le=100000),
+    tracker: PerformanceTracker = Depends(get_tracker)
+):
+    """
+    벤치마크 결과를 최신순 NDJSON으로 스트리밍합니다.
+
+    한 줄에 결과 하나씩 내려보내며, 각 줄의 cursor를 after로 넘기면 다음 페이지를,
+    since로 넘기면 그 이후 저장된 결과만 저장 순(오래된 것부터)으로 조회합니다. since 응답은
+    마지막 줄의 cursor를 다음 since로 쓰면 limit에서 잘린 결과도 다음 조회에서 이어 받습니다.
+    모델별 하이워터마크가 바뀌지 않았으면
+    If-None-Match에 대해 결과 조회 없이 304를 반환합니다.
+
+    Raises:
+        HTTPException: cursor 형식이 잘못된 경우
+    """
+    for cursor in (after, since):
+        if cursor:
+            try:
+                decode_history_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+    version = await tracker.get_history_version(model)
+    etag = _history_etag(version, request)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    field_list = fields.split(",") if fields else DEFAULT_HISTORY_FIELDS
+
+    async def generate():
+        try:
+            async for document in tracker.iter_performance_history(
+                model_name=model,
+                start=start,
+                end=end,
+                fields=field_list,
+                after=after,
+                since=since,
+                limit=limit
+            ):
+                document.pop("_id", None)
+                yield json.dumps(document, default=_json_default) + "\n"
+        except Exception as e:
+            # 스트리밍 도중이라 상태 코드를 바꿀 수 없으므로 로그만 남기고 종료
+            logging.error(f"Benchmark history stream failed: {e}")
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson", headers=headers)
+
+@router.get("/api/benchmarks/stream")
+async def stream_benchmarks(
+    request: Request,
+    model: Optional[str] = None,
+    tracker: PerformanceTracker = Depends(get_tracker)
+):
+    """
+    새로 저장되는 벤치마크 결과를 Server-Sent Events로 실시간 전달합니다.
+
+    구독자별 큐가 가득 차면 오래된 이벤트부터 버리며, 계속 따라오지 못하면
+    "dropped" 이벤트를 보낸 뒤 연결을 끊습니다 (클라이언트는 since로 재조회 후 재연결).
+    """
+    subscription = tracker.broadcaster.subscribe(model)
+
+    async def generate():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event is None:
+                    yield "event: dropped\ndata: {}\n\n"
+                    break
+                data = json.dumps(event, default=_json_default)
+                yield f"id: {event['cursor']}\nevent: benchmark\ndata: {data}\n\n"
+        finally:
+            tracker.broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/api/benchmarks/{model_name}/trend")
+async def get_benchmark_trend(
+    model_name: str,
+    days: int = Query(7, ge=1, le=365),
+    hardware: Optional[str] = Query(None, description="없으면 하드웨어별 구간을 모두 반환"),
+    tracker: PerformanceTracker = Depends(get_tracker)
+):
+    """모델별 성능 추세 (시간/일 단위 롤업, 하드웨어별)"""
+    return {"data": await tracker.get_performance_trend(model_name, days, hardware)}
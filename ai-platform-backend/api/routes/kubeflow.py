@@ -1,36 +1,609 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 import asyncio
+import hashlib
+import json
 import logging
-from kubernetes import client, config
+import os
+import re
+import threading
+import time
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
 from prometheus_client import Counter, Histogram
 
-router = APIRouter()
+# 동시에 처리할 Kubernetes API 호출 수 (executor 스레드 수 = 커넥션 풀 크기로 맞춰 대기 없이 커넥션 재사용)
+K8S_API_CONCURRENCY = int(os.getenv("K8S_API_CONCURRENCY", "16"))
+K8S_REQUEST_TIMEOUT_S = float(os.getenv("K8S_REQUEST_TIMEOUT_S", "30"))
+# 워크플로우 생성 요청률 (API 서버 priority & fairness 한도 아래로 유지) 과 429 재시도 횟수
+K8S_SUBMIT_QPS = float(os.getenv("K8S_SUBMIT_QPS", "20"))
+K8S_SUBMIT_BURST = int(os.getenv("K8S_SUBMIT_BURST", "40"))
+K8S_SUBMIT_MAX_RETRIES = int(os.getenv("K8S_SUBMIT_MAX_RETRIES", "5"))
+BATCH_MAX_RUNS = int(os.getenv("KUBEFLOW_BATCH_MAX_RUNS", "1000"))
+# 상태 캐시를 유지할 네임스페이스 (쉼표 구분)
+WORKFLOW_NAMESPACES = [ns.strip() for ns in os.getenv("KUBEFLOW_WATCH_NAMESPACES", "kubeflow").split(",") if ns.strip()]
+ARGO_GROUP = "argoproj.io"
+ARGO_VERSION = "v1alpha1"
+ARGO_WORKFLOWS = "workflows"
+FINISHED_PHASES = ("Succeeded", "Failed", "Error")
+# 워크플로우 이름은 파드 라벨 값으로도 쓰이므로 DNS-1123 label 길이(63자) 이내로 생성
+WORKFLOW_NAME_MAX_LENGTH = 63
+GENERATE_NAME_SUFFIX_LENGTH = 5  # API 서버가 generateName 뒤에 붙이는 임의 문자 수
+IDEMPOTENT_NAME_SUFFIX_LENGTH = 12  # idempotency 키 해시에서 이름에 붙이는 길이
+IDEMPOTENCY_KEY_LABEL = "ai-platform.io/idempotency-key"  # 키 해시 (라벨 값 제약 때문에 원문 대신 해시)
+IDEMPOTENCY_KEY_ANNOTATION = "ai-platform.io/idempotency-key"
+REQUEST_HASH_ANNOTATION = "ai-platform.io/request-hash"
+CACHE_INVALIDATED_ANNOTATION = "ai-platform.io/cache-invalidated"
+# 같은 파이프라인/파라미터의 성공한 실행 결과를 재사용하는 기간 (0이면 실행 캐시 비활성화)
+RUN_CACHE_TTL_S = float(os.getenv("KUBEFLOW_RUN_CACHE_TTL_S", "86400"))
 
 # Prometheus 메트릭
 pipeline_runs_total = Counter('kubeflow_pipeline_runs_total', 'Total pipeline runs')
 pipeline_duration = Histogram('kubeflow_pipeline_duration_seconds', 'Pipeline execution time')
+pipeline_cache_requests_total = Counter(
+    'kubeflow_pipeline_cache_requests_total', 'Pipeline run cache decisions', ['result']
+)
+pipeline_cache_invalidations_total = Counter(
+    'kubeflow_pipeline_cache_invalidations_total', 'Pipeline runs removed from the run cache'
+)
+
+_api_client: Optional[client.ApiClient] = None
+_custom_objects: Optional[client.CustomObjectsApi] = None
+_k8s_executor: Optional[ThreadPoolExecutor] = None
+
+def _load_k8s_configuration() -> client.Configuration:
+    configuration = client.Configuration()
+    try:
+        config.load_incluster_config(client_configuration=configuration)
+    except config.ConfigException:
+        config.load_kube_config(client_configuration=configuration)
+    configuration.connection_pool_maxsize = K8S_API_CONCURRENCY
+    return configuration
+
+def init_k8s_client():
+    """프로세스당 한 번 설정을 읽고 CustomObjectsApi와 전용 executor 생성 (TLS 커넥션 재사용)"""
+    global _api_client, _custom_objects, _k8s_executor
+    if _custom_objects is not None:
+        return
+    _api_client = client.ApiClient(_load_k8s_configuration())
+    _custom_objects = client.CustomObjectsApi(_api_client)
+    _k8s_executor = ThreadPoolExecutor(max_workers=K8S_API_CONCURRENCY, thread_name_prefix="k8s-api")
+
+def close_k8s_client():
+    global _api_client, _custom_objects, _k8s_executor
+    if _k8s_executor is not None:
+        _k8s_executor.shutdown(wait=False, cancel_futures=True)
+    if _api_client is not None:
+        _api_client.close()
+    _api_client = _custom_objects = _k8s_executor = None
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+def _dns1123_prefix(pipeline_name: str, max_length: int) -> str:
+    """파이프라인 이름을 DNS-1123 규칙(소문자 영숫자와 '-', 영숫자로 시작/끝)에 맞는 접두사로 변환"""
+    prefix = re.sub(r"[^a-z0-9-]+", "-", pipeline_name.lower())
+    prefix = re.sub(r"-{2,}", "-", prefix)[:max_length].strip("-")
+    return prefix or "pipeline"
+
+def _idempotency_hash(idempotency_key: str) -> str:
+    return hashlib.sha256(idempotency_key.encode()).hexdigest()[:40]
+
+def _parameter_value(value) -> str:
+    """워크플로우 파라미터 값 (문자열은 그대로, 나머지는 키를 정렬한 JSON: dict 키 순서와 무관하게 같은 값)"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+def _request_hash(pipeline_name: str, parameters: dict) -> str:
+    # 제출되는 파라미터 값으로 해시해 같은 값으로 실행되는 요청(1과 "1" 등)은 같은 해시가 되도록 함
+    submitted = {k: _parameter_value(v) for k, v in parameters.items()}
+    canonical = json.dumps([pipeline_name, submitted], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _idempotency_entry(workflow: Dict) -> Optional[Tuple[str, Tuple[str, Optional[str]]]]:
+    """워크플로우의 (키 해시, (이름, 요청 해시)) — idempotency 키 없이 생성된 워크플로우는 None"""
+    metadata = workflow["metadata"]
+    key_hash = (metadata.get("labels") or {}).get(IDEMPOTENCY_KEY_LABEL)
+    if not key_hash:
+        return None
+    return key_hash, (metadata["name"], (metadata.get("annotations") or {}).get(REQUEST_HASH_ANNOTATION))
+
+def _workflow_outputs(workflow: Dict) -> Dict:
+    """워크플로우 출력 파라미터/아티팩트 (status.outputs, 없으면 루트 노드 출력)"""
+    status = workflow.get("status") or {}
+    if status.get("outputs"):
+        return status["outputs"]
+    root = (status.get("nodes") or {}).get(workflow["metadata"]["name"]) or {}
+    return root.get("outputs") or {}
+
+def _run_cache_entry(workflow: Dict) -> Optional[Tuple[str, Dict]]:
+    """성공했고 무효화되지 않은 워크플로우의 (요청 해시, 캐시 항목) — 캐시 대상이 아니면 None"""
+    metadata = workflow["metadata"]
+    annotations = metadata.get("annotations") or {}
+    status = workflow.get("status") or {}
+    request_hash = annotations.get(REQUEST_HASH_ANNOTATION)
+    if not request_hash or status.get("phase") != "Succeeded" or annotations.get(CACHE_INVALIDATED_ANNOTATION):
+        return None
+    return request_hash, {
+        "pipeline_id": metadata["name"],
+        "pipeline_name": (workflow.get("spec") or {}).get("entrypoint"),
+        "finished_at": _parse_time(status.get("finishedAt")),
+        "outputs": _workflow_outputs(workflow),
+    }
+
+def summarize_workflow(workflow: Dict) -> Dict:
+    """Argo Workflow 객체에서 상태 조회에 필요한 값만 추출 (노드 맵 전체는 캐시에 보관하지 않음)"""
+    status = workflow.get("status") or {}
+    node_phases: Dict[str, int] = {}
+    for node in (status.get("nodes") or {}).values():
+        if node.get("type") == "Pod":
+            phase = node.get("phase") or "Pending"
+            node_phases[phase] = node_phases.get(phase, 0) + 1
+    return {
+        "pipeline_id": workflow["metadata"]["name"],
+        "namespace": workflow["metadata"].get("namespace"),
+        "status": status.get("phase") or "Pending",
+        "progress": status.get("progress"),
+        "nodes": node_phases,
+        "started_at": _parse_time(status.get("startedAt")),
+        "finished_at": _parse_time(status.get("finishedAt")),
+        "message": status.get("message"),
+        "outputs": _workflow_outputs(workflow) if status.get("phase") == "Succeeded" else None,
+    }
+
+class WorkflowInformer:
+    """
+    Argo Workflow informer 방식 상태 캐시
+
+    네임스페이스마다 한 번 list한 뒤 백그라운드 스레드에서 watch 이벤트로 요약 상태를 갱신한다.
+    상태 조회는 API 서버 호출 없이 메모리에서 응답하며, watch가 만료(410 Gone)되면 다시 list부터 시작한다.
+    idempotency 키 라벨이 있는 워크플로우는 키 해시 인덱스에도 기록해 재시도 요청을 API 호출 없이 판별한다.
+    성공한 워크플로우는 요청 해시(파이프라인 이름 + 정규화한 파라미터) 인덱스에 기록해 실행 캐시로 사용한다.
+    """
+
+    def __init__(self, api: client.CustomObjectsApi, namespaces: List[str], watch_timeout_s: int = 300):
+        self.api = api
+        self.namespaces = namespaces
+        self.watch_timeout_s = watch_timeout_s
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._workflows: Dict[str, Dict[str, Dict]] = {namespace: {} for namespace in namespaces}
+        self._keys: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {namespace: {} for namespace in namespaces}
+        # namespace -> 요청 해시 -> 워크플로우 이름 -> 캐시 항목
+        self._runs: Dict[str, Dict[str, Dict[str, Dict]]] = {namespace: {} for namespace in namespaces}
+
+    def _index_run(self, namespace: str, workflow: Dict, removed: bool = False):
+        name = workflow["metadata"]["name"]
+        request_hash = ((workflow["metadata"].get("annotations") or {})).get(REQUEST_HASH_ANNOTATION)
+        runs = self._runs[namespace]
+        if request_hash in runs:
+            runs[request_hash].pop(name, None)
+            if not runs[request_hash]:
+                del runs[request_hash]
+        entry = None if removed else _run_cache_entry(workflow)
+        if entry is not None:
+            runs.setdefault(entry[0], {})[name] = entry[1]
+
+    def _apply(self, namespace: str, event_type: str, workflow: Dict):
+        name = workflow["metadata"]["name"]
+        entry = _idempotency_entry(workflow)
+        with self._lock:
+            previous = self._workflows[namespace].get(name)
+            if event_type == "DELETED":
+                self._workflows[namespace].pop(name, None)
+                if entry is not None and self._keys[namespace].get(entry[0], (None,))[0] == name:
+                    del self._keys[namespace][entry[0]]
+                self._index_run(namespace, workflow, removed=True)
+                return
+            summary = summarize_workflow(workflow)
+            self._workflows[namespace][name] = summary
+            if entry is not None:
+                self._keys[namespace][entry[0]] = entry[1]
+            self._index_run(namespace, workflow)
+        # list로 채운 이미 끝난 워크플로우는 제외하고 종료 전이만 실행 시간 히스토그램에 기록
+        if (previous is not None and previous["status"] not in FINISHED_PHASES
+                and summary["status"] in FINISHED_PHASES and summary["started_at"] and summary["finished_at"]):
+            pipeline_duration.observe((summary["finished_at"] - summary["started_at"]).total_seconds())
+
+    def _list(self, namespace: str) -> str:
+        result = self.api.list_namespaced_custom_object(
+            ARGO_GROUP, ARGO_VERSION, namespace, ARGO_WORKFLOWS, _request_timeout=K8S_REQUEST_TIMEOUT_S
+        )
+        items = result.get("items", [])
+        workflows = {item["metadata"]["name"]: summarize_workflow(item) for item in items}
+        keys = dict(entry for entry in map(_idempotency_entry, items) if entry is not None)
+        with self._lock:
+            self._workflows[namespace] = workflows
+            self._keys[namespace] = keys
+            self._runs[namespace] = {}
+            for item in items:
+                self._index_run(namespace, item)
+        return result["metadata"]["resourceVersion"]
+
+    def _informer(self, namespace: str, resource_version: Optional[str]):
+        while not self._stop.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list(namespace)
+                stream = watch.Watch().stream(
+                    self.api.list_namespaced_custom_object,
+                    ARGO_GROUP, ARGO_VERSION, namespace, ARGO_WORKFLOWS,
+                    resource_version=resource_version,
+                    timeout_seconds=self.watch_timeout_s,
+                    allow_watch_bookmarks=True,
+                )
+                for event in stream:
+                    if self._stop.is_set():
+                        return
+                    if event["type"] == "ERROR":
+                        resource_version = None
+                        break
+                    workflow = event["raw_object"]
+                    if event["type"] != "BOOKMARK":
+                        self._apply(namespace, event["type"], workflow)
+                    resource_version = workflow["metadata"]["resourceVersion"]
+            except ApiException as e:
+                if e.status == 410:
+                    resource_version = None  # watch 만료: 다시 list
+                    continue
+                logging.error(f"Workflow watch failed in {namespace}: {e}")
+                time.sleep(1.0)
+            except Exception as e:
+                logging.error(f"Workflow watch failed in {namespace}: {e}")
+                time.sleep(1.0)
+
+    def start(self):
+        """최초 list 후 네임스페이스별 watch 스레드 시작 (블로킹 호출)"""
+        if self._threads:
+            return
+        versions = [self._list(namespace) for namespace in self.namespaces]
+        for namespace, version in zip(self.namespaces, versions):
+            thread = threading.Thread(
+                target=self._informer,
+                args=(namespace, version),
+                name=f"workflow-informer-{namespace}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """watch 스레드 종료 요청 (현재 watch 요청이 끝나면 종료)"""
+        self._stop.set()
+
+    def watches(self, namespace: str) -> bool:
+        return namespace in self._workflows
+
+    def get(self, namespace: str, name: str) -> Optional[Dict]:
+        with self._lock:
+            return self._workflows.get(namespace, {}).get(name)
+
+    def find_by_idempotency_key(self, namespace: str, key_hash: str) -> Optional[Tuple[str, Optional[str]]]:
+        """키 해시로 이미 생성된 워크플로우의 (이름, 요청 해시) 조회"""
+        with self._lock:
+            return self._keys.get(namespace, {}).get(key_hash)
+
+    def find_cached_run(self, namespace: str, request_hash: str, max_age_s: float) -> Optional[Dict]:
+        """max_age_s 이내에 끝난 같은 요청의 가장 최근 성공 실행"""
+        cutoff = datetime.now(timezone.utc).timestamp() - max_age_s
+        with self._lock:
+            entries = [
+                entry for entry in self._runs.get(namespace, {}).get(request_hash, {}).values()
+                if entry["finished_at"] is not None and entry["finished_at"].timestamp() >= cutoff
+            ]
+        return max(entries, key=lambda entry: entry["finished_at"], default=None)
+
+    def cached_runs(self, namespace: str, pipeline_name: str, request_hash: Optional[str] = None) -> List[str]:
+        """무효화 대상 워크플로우 이름 (request_hash가 없으면 파이프라인의 모든 캐시 항목)"""
+        with self._lock:
+            runs = self._runs.get(namespace, {})
+            if request_hash is not None:
+                return list(runs.get(request_hash, {}))
+            return [
+                name for entries in runs.values() for name, entry in entries.items()
+                if entry["pipeline_name"] == pipeline_name
+            ]
+
+    def drop_cached_runs(self, namespace: str, names: List[str]):
+        """무효화 패치가 watch로 돌아오기 전에도 이 레플리카에서 바로 캐시에서 제외"""
+        names = set(names)
+        with self._lock:
+            runs = self._runs.get(namespace, {})
+            for request_hash in list(runs):
+                for name in names & runs[request_hash].keys():
+                    del runs[request_hash][name]
+                if not runs[request_hash]:
+                    del runs[request_hash]
+
+    def list(self, namespace: str, phase: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            return [
+                summary for summary in self._workflows.get(namespace, {}).values()
+                if phase is None or summary["status"] == phase
+            ]
+
+_workflow_informer: Optional[WorkflowInformer] = None
+
+@asynccontextmanager
+async def lifespan(app):
+    global _workflow_informer
+    loop = asyncio.get_running_loop()
+    try:
+        init_k8s_client()
+        _workflow_informer = WorkflowInformer(_custom_objects, WORKFLOW_NAMESPACES)
+        await loop.run_in_executor(_k8s_executor, _workflow_informer.start)
+    except Exception as e:
+        # 클러스터 설정을 읽지 못했거나 informer가 시작하지 못해도 앱은 시작
+        # (클라이언트는 요청마다 다시 생성을 시도하고, 상태 조회는 단건 GET으로 대체)
+        logging.error(f"Kubernetes client or workflow informer failed to start: {e}")
+        _workflow_informer = None
+    try:
+        yield
+    finally:
+        if _workflow_informer is not None:
+            _workflow_informer.stop()
+            _workflow_informer = None
+        close_k8s_client()
+
+router = APIRouter(lifespan=lifespan)
 
 class PipelineRequest(BaseModel):
     pipeline_name: str
     parameters: dict
     namespace: str = "kubeflow"
+    use_cache: bool = True  # 같은 파이프라인/파라미터의 성공한 실행이 있으면 새로 실행하지 않음
+    cache_max_age_s: Optional[float] = None  # 재사용할 실행의 최대 경과 시간 (KUBEFLOW_RUN_CACHE_TTL_S 이하)
 
 class PipelineResponse(BaseModel):
     pipeline_id: str
-    status: str
+    status: str  # running / existing / cached
+    message: str
+    cache: str = "bypass"  # 실행 캐시 판단: hit / miss / bypass
+    outputs: Optional[Dict] = None  # 캐시 적중 시 기존 실행의 출력
+
+class CacheInvalidationRequest(BaseModel):
+    pipeline_name: str
+    parameters: Optional[dict] = None  # 없으면 파이프라인의 모든 캐시 항목을 무효화
+    namespace: str = "kubeflow"
+
+class BatchPipelineItem(BaseModel):
+    parameters: dict
+    idempotency_key: Optional[str] = None
+
+class BatchPipelineRequest(BaseModel):
+    pipeline_name: str
+    runs: List[BatchPipelineItem]
+    namespace: str = "kubeflow"
+    max_concurrency: Optional[int] = None  # 이 배치의 동시 생성 요청 수 (기본값/상한 K8S_API_CONCURRENCY)
+    use_cache: bool = True
+    cache_max_age_s: Optional[float] = None
+
+class BatchPipelineItemResult(BaseModel):
+    index: int
+    idempotency_key: Optional[str] = None
+    pipeline_id: Optional[str] = None
+    status: str  # running / existing / cached / failed
     message: str
+    cache: str = "bypass"
+    outputs: Optional[Dict] = None
 
-async def get_k8s_client():
+class BatchPipelineResponse(BaseModel):
+    submitted: int
+    existing: int
+    cached: int
+    failed: int
+    results: List[BatchPipelineItemResult]
+
+class PipelineStatus(BaseModel):
+    pipeline_id: str
+    namespace: str
+    status: str  # Argo Workflow phase: Pending / Running / Succeeded / Failed / Error
+    progress: Optional[str] = None  # 완료 노드 수 / 전체 노드 수 (예: "3/5")
+    nodes: Dict[str, int] = {}  # Pod 노드 phase별 개수
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_s: Optional[float] = None
+    message: Optional[str] = None
+    outputs: Optional[Dict] = None  # 성공한 워크플로우의 출력 파라미터/아티팩트
+
+def _to_status(summary: Dict) -> PipelineStatus:
+    started_at, finished_at = summary["started_at"], summary["finished_at"]
+    duration_s = None
+    if started_at is not None:
+        duration_s = ((finished_at or datetime.now(timezone.utc)) - started_at).total_seconds()
+    return PipelineStatus(**summary, duration_s=duration_s)
+
+async def get_k8s_client() -> client.CustomObjectsApi:
+    """공유 CustomObjectsApi (lifespan 밖에서 쓰거나 시작 시 생성에 실패했으면 요청 시 생성)"""
+    if _custom_objects is None:
+        try:
+            init_k8s_client()
+        except Exception as e:
+            logging.error(f"Kubernetes client initialization failed: {e}")
+            raise HTTPException(status_code=503, detail=f"Kubernetes API unavailable: {str(e)}")
+    return _custom_objects
+
+async def run_k8s_call(func, *args, **kwargs):
+    """블로킹 Kubernetes 클라이언트 호출을 전용 bounded executor에서 실행"""
+    kwargs.setdefault("_request_timeout", K8S_REQUEST_TIMEOUT_S)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_k8s_executor, partial(func, *args, **kwargs))
+
+class _TokenBucket:
+    """프로세스 전체 워크플로우 생성 요청률 제한 (API 서버 APF 한도를 넘지 않도록 클라이언트에서 평탄화)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+_submit_limiter: Optional[_TokenBucket] = None
+
+def _retry_after_s(e: ApiException, attempt: int) -> float:
+    retry_after = (e.headers or {}).get("Retry-After")
     try:
-        config.load_incluster_config()
-    except:
-        config.load_kube_config()
-    return client.CustomObjectsApi()
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(30.0, 0.5 * 2 ** attempt)
+
+class IdempotencyConflict(Exception):
+    """같은 idempotency 키가 다른 파이프라인/파라미터 요청에 재사용된 경우"""
+
+def _check_idempotent_match(name: str, stored_request_hash: Optional[str], request_hash: str):
+    if stored_request_hash is not None and stored_request_hash != request_hash:
+        raise IdempotencyConflict(f"Idempotency key already used for workflow {name} with a different request")
+
+async def _existing_idempotent_workflow(k8s_client: client.CustomObjectsApi, namespace: str, name: str,
+                                        request_hash: str) -> str:
+    """이름 충돌(409) 시 기존 워크플로우가 같은 요청으로 생성된 것인지 확인"""
+    existing = await run_k8s_call(
+        k8s_client.get_namespaced_custom_object, ARGO_GROUP, ARGO_VERSION, namespace, ARGO_WORKFLOWS, name
+    )
+    entry = _idempotency_entry(existing)
+    _check_idempotent_match(name, entry[1][1] if entry else None, request_hash)
+    return name
+
+def find_idempotent_workflow(pipeline_name: str, parameters: dict, namespace: str,
+                             idempotency_key: Optional[str]) -> Optional[str]:
+    """
+    informer 캐시에서 같은 idempotency 키로 이미 생성된 워크플로우 이름 조회 (없거나 판별할 수 없으면 None)
+    
+    Raises:
+        IdempotencyConflict: 같은 키가 다른 요청으로 이미 사용된 경우
+    """
+    if idempotency_key is None or _workflow_informer is None or not _workflow_informer.watches(namespace):
+        return None
+    existing = _workflow_informer.find_by_idempotency_key(namespace, _idempotency_hash(idempotency_key))
+    if existing is None:
+        return None
+    _check_idempotent_match(existing[0], existing[1], _request_hash(pipeline_name, parameters))
+    return existing[0]
+
+def lookup_run_cache(pipeline_name: str, parameters: dict, namespace: str, use_cache: bool = True,
+                     max_age_s: Optional[float] = None) -> Tuple[str, Optional[Dict]]:
+    """
+    실행 캐시 조회 (informer가 감시하는 네임스페이스에서만 동작)
+    
+    Returns:
+        (hit / miss / bypass, 적중 시 기존 실행 캐시 항목)
+    """
+    ttl_s = RUN_CACHE_TTL_S if max_age_s is None else min(max_age_s, RUN_CACHE_TTL_S)
+    entry = None
+    if not use_cache or ttl_s <= 0 or _workflow_informer is None or not _workflow_informer.watches(namespace):
+        decision = "bypass"
+    else:
+        entry = _workflow_informer.find_cached_run(namespace, _request_hash(pipeline_name, parameters), ttl_s)
+        decision = "hit" if entry is not None else "miss"
+    pipeline_cache_requests_total.labels(result=decision).inc()
+    return decision, entry
+
+async def submit_workflow(
+    k8s_client: client.CustomObjectsApi,
+    pipeline_name: str,
+    parameters: dict,
+    namespace: str,
+    idempotency_key: Optional[str] = None
+) -> Tuple[str, bool]:
+    """
+    Argo Workflow 생성 (요청률 제한, APF 429 재시도 포함)
+    
+    idempotency_key가 없으면 generateName으로 API 서버가 고유 이름을 붙이고,
+    있으면 키 해시로 결정된 이름을 사용해 레플리카/재시도 간에도 같은 워크플로우로 수렴한다.
+    
+    Returns:
+        (워크플로우 이름, 새로 생성했는지 여부) — 같은 idempotency_key로 이미 생성된 경우 False
+        
+    Raises:
+        IdempotencyConflict: 같은 키가 다른 요청으로 이미 사용된 경우
+    """
+    global _submit_limiter
+    if _submit_limiter is None:
+        _submit_limiter = _TokenBucket(K8S_SUBMIT_QPS, K8S_SUBMIT_BURST)
+
+    request_hash = _request_hash(pipeline_name, parameters)
+    metadata = {"namespace": namespace}
+    if idempotency_key is not None:
+        key_hash = _idempotency_hash(idempotency_key)
+        existing = find_idempotent_workflow(pipeline_name, parameters, namespace, idempotency_key)
+        if existing is not None:
+            return existing, False
+        prefix = _dns1123_prefix(pipeline_name, WORKFLOW_NAME_MAX_LENGTH - IDEMPOTENT_NAME_SUFFIX_LENGTH - 1)
+        metadata["name"] = f"{prefix}-{key_hash[:IDEMPOTENT_NAME_SUFFIX_LENGTH]}"
+        metadata["labels"] = {IDEMPOTENCY_KEY_LABEL: key_hash}
+        metadata["annotations"] = {
+            IDEMPOTENCY_KEY_ANNOTATION: idempotency_key,
+            REQUEST_HASH_ANNOTATION: request_hash,
+        }
+    else:
+        prefix = _dns1123_prefix(pipeline_name, WORKFLOW_NAME_MAX_LENGTH - GENERATE_NAME_SUFFIX_LENGTH - 1)
+        metadata["generateName"] = f"{prefix}-"
+        metadata["annotations"] = {REQUEST_HASH_ANNOTATION: request_hash}
+
+    # Kubeflow 파이프라인 실행 (실제로는 KFP SDK 사용)
+    pipeline_manifest = {
+        "apiVersion": f"{ARGO_GROUP}/{ARGO_VERSION}",
+        "kind": "Workflow",
+        "metadata": metadata,
+        "spec": {
+            "entrypoint": pipeline_name,
+            "arguments": {
+                "parameters": [
+                    {"name": k, "value": _parameter_value(v)}
+                    for k, v in parameters.items()
+                ]
+            }
+        }
+    }
+
+    for attempt in range(K8S_SUBMIT_MAX_RETRIES + 1):
+        await _submit_limiter.acquire()
+        try:
+            result = await run_k8s_call(
+                k8s_client.create_namespaced_custom_object,
+                group=ARGO_GROUP,
+                version=ARGO_VERSION,
+                namespace=namespace,
+                plural=ARGO_WORKFLOWS,
+                body=pipeline_manifest
+            )
+        except ApiException as e:
+            if e.status == 409 and idempotency_key is not None:
+                name = await _existing_idempotent_workflow(k8s_client, namespace, metadata["name"], request_hash)
+                return name, False
+            # 429는 API 서버가 처리 전에 거절한 요청이므로 그대로 재시도해도 중복 생성되지 않음
+            if e.status == 429 and attempt < K8S_SUBMIT_MAX_RETRIES:
+                await asyncio.sleep(_retry_after_s(e, attempt))
+                continue
+            raise
+        pipeline_runs_total.inc()
+        return result["metadata"]["name"], True
 
 @router.post("/pipelines/run", response_model=PipelineResponse)
 async def run_pipeline(
     request: PipelineRequest,
+    idempotency_key: Optional[str] = Header(None),
     k8s_client = Depends(get_k8s_client)
 ):
     """
@@ -38,55 +611,49 @@ async def run_pipeline(
     
     Args:
         request: 파이프라인 실행 요청 정보
+        idempotency_key: Idempotency-Key 헤더 — 같은 키로 재시도하면 기존 워크플로우를 반환
         k8s_client: Kubernetes API 클라이언트
         
     Returns:
-        PipelineResponse: 파이프라인 실행 결과
+        PipelineResponse: 파이프라인 실행 결과 (기존 워크플로우를 반환한 경우 status="existing")
         
     Raises:
-        HTTPException: Kubernetes API 호출 실패 시
+        HTTPException: 같은 키가 다른 요청에 사용된 경우(409) 또는 Kubernetes API 호출 실패 시
     """
     try:
-        # Prometheus 메트릭 증가
-        pipeline_runs_total.inc()
-        
-        # Kubeflow 파이프라인 실행 (실제로는 KFP SDK 사용)
-        pipeline_manifest = {
-            "apiVersion": "argoproj.io/v1alpha1",
-            "kind": "Workflow", 
-            "metadata": {
-                "name": f"{request.pipeline_name}-{asyncio.get_event_loop().time()}",
-                "namespace": request.namespace
-            },
-            "spec": {
-                "entrypoint": request.pipeline_name,
-                "arguments": {
-                    "parameters": [
-                        {"name": k, "value": str(v)} 
-                        for k, v in request.parameters.items()
-                    ]
-                }
-            }
-        }
-        
-        # Kubernetes API로 워크플로우 생성
-        result = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: k8s_client.create_namespaced_custom_object(
-                group="argoproj.io",
-                version="v1alpha1", 
-                namespace=request.namespace,
-                plural="workflows",
-                body=pipeline_manifest
+        # 재시도 요청은 그 사이 캐시 항목이 생겼더라도 처음 만든 워크플로우를 반환
+        existing = find_idempotent_workflow(
+            request.pipeline_name, request.parameters, request.namespace, idempotency_key
+        )
+        if existing is not None:
+            return PipelineResponse(
+                pipeline_id=existing,
+                status="existing",
+                message="Pipeline already submitted"
             )
+        cache, cached_run = lookup_run_cache(
+            request.pipeline_name, request.parameters, request.namespace, request.use_cache, request.cache_max_age_s
+        )
+        if cached_run is not None:
+            return PipelineResponse(
+                pipeline_id=cached_run["pipeline_id"],
+                status="cached",
+                message="Reused a previous successful run",
+                cache=cache,
+                outputs=cached_run["outputs"]
+            )
+        pipeline_id, created = await submit_workflow(
+            k8s_client, request.pipeline_name, request.parameters, request.namespace, idempotency_key
         )
-        
         return PipelineResponse(
-            pipeline_id=result["metadata"]["name"],
-            status="running",
-            message="Pipeline started successfully"
+            pipeline_id=pipeline_id,
+            status="running" if created else "existing",
+            message="Pipeline started successfully" if created else "Pipeline already submitted",
+            cache=cache
         )
         
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logging.error(f"Pipeline execution failed: {e}")
         raise HTTPException(
@@ -94,8 +661,150 @@ async def run_pipeline(
             detail=f"Failed to run pipeline: {str(e)}"
         )
 
-@router.get("/pipelines/{pipeline_id}/status")
-async def get_pipeline_status(pipeline_id: str, k8s_client = Depends(get_k8s_client)):
-    # 실제로는 워크플로우 상태를 확인
-    # 현재는 더미 응답
-    return {"pipeline_id": pipeline_id, "status": "completed"}
+@router.post("/pipelines/run/batch", response_model=BatchPipelineResponse)
+async def run_pipeline_batch(
+    request: BatchPipelineRequest,
+    k8s_client = Depends(get_k8s_client)
+):
+    """
+    하이퍼파라미터 스윕 등 여러 파라미터 조합을 한 번에 실행합니다.
+    
+    항목별 동시 생성 수는 max_concurrency로, 프로세스 전체 생성 속도는 토큰 버킷으로 제한합니다.
+    실패한 항목이 있어도 나머지는 계속 제출하며 결과는 항목 순서대로 반환합니다.
+    idempotency_key가 같은 항목을 다시 제출하면 기존 워크플로우를 반환합니다 (status="existing").
+    같은 파라미터의 성공한 실행이 캐시에 있으면 새로 실행하지 않고 그 출력을 반환합니다 (status="cached").
+    """
+    if not request.runs:
+        raise HTTPException(status_code=400, detail="runs must not be empty")
+    if len(request.runs) > BATCH_MAX_RUNS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_RUNS} runs per batch")
+
+    semaphore = asyncio.Semaphore(max(1, min(request.max_concurrency or K8S_API_CONCURRENCY, K8S_API_CONCURRENCY)))
+
+    async def submit(index: int, item: BatchPipelineItem) -> BatchPipelineItemResult:
+        try:
+            existing = find_idempotent_workflow(
+                request.pipeline_name, item.parameters, request.namespace, item.idempotency_key
+            )
+        except IdempotencyConflict as e:
+            return BatchPipelineItemResult(
+                index=index, idempotency_key=item.idempotency_key, status="failed", message=str(e)
+            )
+        if existing is not None:
+            return BatchPipelineItemResult(
+                index=index,
+                idempotency_key=item.idempotency_key,
+                pipeline_id=existing,
+                status="existing",
+                message="Pipeline already submitted"
+            )
+        cache, cached_run = lookup_run_cache(
+            request.pipeline_name, item.parameters, request.namespace, request.use_cache, request.cache_max_age_s
+        )
+        if cached_run is not None:
+            return BatchPipelineItemResult(
+                index=index,
+                idempotency_key=item.idempotency_key,
+                pipeline_id=cached_run["pipeline_id"],
+                status="cached",
+                message="Reused a previous successful run",
+                cache=cache,
+                outputs=cached_run["outputs"]
+            )
+        async with semaphore:
+            try:
+                pipeline_id, created = await submit_workflow(
+                    k8s_client, request.pipeline_name, item.parameters, request.namespace, item.idempotency_key
+                )
+            except Exception as e:
+                logging.error(f"Batch pipeline item {index} failed: {e}")
+                return BatchPipelineItemResult(
+                    index=index, idempotency_key=item.idempotency_key, status="failed", message=str(e), cache=cache
+                )
+        return BatchPipelineItemResult(
+            index=index,
+            idempotency_key=item.idempotency_key,
+            pipeline_id=pipeline_id,
+            status="running" if created else "existing",
+            message="Pipeline started successfully" if created else "Pipeline already submitted",
+            cache=cache
+        )
+
+    results = await asyncio.gather(*(submit(index, item) for index, item in enumerate(request.runs)))
+    return BatchPipelineResponse(
+        submitted=sum(result.status == "running" for result in results),
+        existing=sum(result.status == "existing" for result in results),
+        cached=sum(result.status == "cached" for result in results),
+        failed=sum(result.status == "failed" for result in results),
+        results=results
+    )
+
+@router.post("/pipelines/cache/invalidate")
+async def invalidate_pipeline_cache(
+    request: CacheInvalidationRequest,
+    k8s_client = Depends(get_k8s_client)
+):
+    """
+    실행 캐시 무효화
+    
+    대상 워크플로우에 무효화 어노테이션을 붙이므로 다른 레플리카의 informer와 재시작 후의 list에도 반영됩니다.
+    """
+    if _workflow_informer is None or not _workflow_informer.watches(request.namespace):
+        raise HTTPException(status_code=404, detail=f"Namespace {request.namespace} is not watched")
+    request_hash = None
+    if request.parameters is not None:
+        request_hash = _request_hash(request.pipeline_name, request.parameters)
+    names = _workflow_informer.cached_runs(request.namespace, request.pipeline_name, request_hash)
+
+    patch = {"metadata": {"annotations": {CACHE_INVALIDATED_ANNOTATION: datetime.now(timezone.utc).isoformat()}}}
+    invalidated = []
+    for name in names:
+        try:
+            await run_k8s_call(
+                k8s_client.patch_namespaced_custom_object,
+                ARGO_GROUP, ARGO_VERSION, request.namespace, ARGO_WORKFLOWS, name, patch
+            )
+        except ApiException as e:
+            if e.status != 404:
+                logging.error(f"Pipeline cache invalidation failed for {name}: {e}")
+                raise HTTPException(status_code=500, detail=f"Failed to invalidate cache: {str(e)}")
+        invalidated.append(name)
+    _workflow_informer.drop_cached_runs(request.namespace, invalidated)
+    pipeline_cache_invalidations_total.inc(len(invalidated))
+    return {"invalidated": len(invalidated), "pipeline_ids": invalidated}
+
+@router.get("/pipelines/statuses", response_model=List[PipelineStatus])
+async def list_pipeline_statuses(namespace: str = "kubeflow", phase: Optional[str] = None):
+    """대시보드용 네임스페이스 전체 워크플로우 상태 (informer 캐시에서만 응답)"""
+    if _workflow_informer is None or not _workflow_informer.watches(namespace):
+        raise HTTPException(status_code=404, detail=f"Namespace {namespace} is not watched")
+    return [_to_status(summary) for summary in _workflow_informer.list(namespace, phase)]
+
+@router.get("/pipelines/{pipeline_id}/status", response_model=PipelineStatus)
+async def get_pipeline_status(
+    pipeline_id: str,
+    namespace: str = "kubeflow",
+    k8s_client = Depends(get_k8s_client)
+):
+    """
+    Argo Workflow phase, 노드 진행률, 시작/종료 시각을 반환합니다.
+    
+    감시 중인 네임스페이스는 informer 캐시에서 응답하고, 그 외 네임스페이스나 캐시에 아직 없는
+    워크플로우(방금 생성되어 watch 이벤트가 도착하기 전, relist 중 등)는 단건 GET으로 확인합니다.
+    """
+    if _workflow_informer is not None and _workflow_informer.watches(namespace):
+        summary = _workflow_informer.get(namespace, pipeline_id)
+        if summary is not None:
+            return _to_status(summary)
+
+    try:
+        workflow = await run_k8s_call(
+            k8s_client.get_namespaced_custom_object,
+            ARGO_GROUP, ARGO_VERSION, namespace, ARGO_WORKFLOWS, pipeline_id
+        )
+    except ApiException as e:
+        if e.status == 404:
+            raise HTTPException(status_code=404, detail=f"Pipeline {pipeline_id} not found")
+        logging.error(f"Pipeline status lookup failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get pipeline status: {str(e)}")
+    return _to_status(summarize_workflow(workflow))
@@ -0,0 +1,25 @@
+import os
+
+from fastapi import FastAPI
+from prometheus_client import make_asgi_app
+
+from api.routes import benchmarks, kubeflow
+
+# benchmarks 라우터는 vllm-benchmark의 benchmark 패키지를 사용하므로
+# PYTHONPATH에 백엔드와 vllm-benchmark 디렉터리가 함께 있어야 함 (Dockerfile 참고)
+app = FastAPI(title="AI Platform Backend")
+app.include_router(kubeflow.router)
+app.include_router(benchmarks.router)
+
+if os.getenv("PROMETHEUS_ENABLED", "true").lower() == "true":
+    app.mount("/metrics", make_asgi_app())
+
+@app.get("/health")
+async def health():
+    """liveness probe"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """readiness probe (Kubernetes/MongoDB 장애는 요청 단위로 처리하므로 프로세스가 뜨면 준비 완료)"""
+    return {"status": "ready"}
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 이미지의 PYTHONPATH(/app/backend:/app/benchmark)와 같은 구성
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "vllm-benchmark"))
+
+import benchmark.performance_tracker as performance_tracker  # noqa: E402
+from benchmark.performance_tracker import PerformanceTracker  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def tracker(monkeypatch):
+    """mongomock 위의 PerformanceTracker"""
+    monkeypatch.setattr(performance_tracker, "AsyncIOMotorClient", AsyncMongoMockClient)
+    tracker = PerformanceTracker("mongodb://localhost:27017", "", metrics_urls=[])
+    yield tracker
+    await tracker.close()
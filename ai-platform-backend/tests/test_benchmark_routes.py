@@ -0,0 +1,142 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.routes import benchmarks
+from benchmark.performance_tracker import BenchmarkResult
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+async def client(tracker):
+    app = FastAPI()
+    app.include_router(benchmarks.router)
+    app.dependency_overrides[benchmarks.get_tracker] = lambda: tracker
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _store(tracker, model_name: str, count: int, first: int = 0):
+    for minute in range(first, first + count):
+        result = BenchmarkResult(
+            model_name=model_name,
+            throughput_tokens_per_sec=100.0 + minute,
+            latency_ms=50.0,
+            memory_usage_gb=None,
+            timestamp=START + timedelta(minutes=minute),
+            github_commit_sha=f"sha{minute}",
+        )
+        result.latency_histogram.record(50.0)
+        await tracker.store_benchmark_result(result, evaluate_regression=False)
+    await tracker.flush_results()
+
+
+def _lines(response: httpx.Response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_history_streams_projected_ndjson(client, tracker):
+    await _store(tracker, "llama", 3)
+    await _store(tracker, "mistral", 1)
+
+    response = await client.get("/api/benchmarks", params={"model": "llama"})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = _lines(response)
+    assert [record["github_commit_sha"] for record in records] == ["sha2", "sha1", "sha0"]
+    # 기본 프로젝션은 히스토그램 등 큰 필드를 제외
+    assert "histograms" not in records[0]
+    assert "_id" not in records[0]
+    assert {"model_name", "throughput_tokens_per_sec", "cursor", "timestamp"} <= set(records[0])
+
+
+async def test_history_pages_with_after_cursor(client, tracker):
+    await _store(tracker, "llama", 5)
+
+    first = _lines(await client.get("/api/benchmarks", params={"model": "llama", "limit": 2}))
+    second = _lines(await client.get(
+        "/api/benchmarks", params={"model": "llama", "limit": 2, "after": first[-1]["cursor"]}
+    ))
+    fields = _lines(await client.get("/api/benchmarks", params={"model": "llama", "limit": 1, "fields": "latency_ms"}))
+
+    assert [record["github_commit_sha"] for record in first + second] == ["sha4", "sha3", "sha2", "sha1"]
+    assert set(fields[0]) == {"latency_ms", "timestamp", "inserted_at", "cursor"}
+
+
+async def test_invalid_cursor_is_rejected(client):
+    response = await client.get("/api/benchmarks", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+async def test_unchanged_history_returns_304(client, tracker):
+    await _store(tracker, "llama", 2)
+    first = await client.get("/api/benchmarks", params={"model": "llama"})
+    etag = first.headers["etag"]
+    since = _lines(first)[0]["cursor"]
+
+    unchanged = await client.get("/api/benchmarks", params={"model": "llama"}, headers={"If-None-Match": etag})
+    # since는 ETag 계산에서 제외되므로 증분 폴링도 304
+    unchanged_since = await client.get("/api/benchmarks", params={"model": "llama", "since": since},
+                                       headers={"If-None-Match": etag})
+    await _store(tracker, "llama", 1, first=10)
+    tracker._watermark_cache.clear()
+    changed = await client.get("/api/benchmarks", params={"model": "llama", "since": since},
+                               headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert unchanged.text == ""
+    assert unchanged_since.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert [record["github_commit_sha"] for record in _lines(changed)] == ["sha10"]
+
+
+async def test_since_returns_late_runs_in_insertion_order(client, tracker):
+    await _store(tracker, "llama", 1, first=30)
+    since = _lines(await client.get("/api/benchmarks", params={"model": "llama"}))[0]["cursor"]
+    # 측정 시각은 더 이르지만 나중에 저장된 결과
+    for minute in (5, 1, 3):
+        await _store(tracker, "llama", 1, first=minute)
+
+    page = _lines(await client.get("/api/benchmarks", params={"model": "llama", "since": since, "limit": 2}))
+    rest = _lines(await client.get("/api/benchmarks", params={"model": "llama", "since": page[-1]["cursor"]}))
+
+    assert [record["github_commit_sha"] for record in page + rest] == ["sha5", "sha1", "sha3"]
+
+
+async def test_stream_pushes_stored_results(client, tracker):
+    request = asyncio.create_task(client.get("/api/benchmarks/stream", params={"model": "llama"}))
+    while tracker.broadcaster.subscriber_count == 0:
+        await asyncio.sleep(0.01)
+
+    await _store(tracker, "mistral", 1)
+    await _store(tracker, "llama", 1, first=7)
+    # 구독을 끊으면 dropped 이벤트 뒤 스트림이 끝남 (ASGITransport는 응답 전체를 모아서 반환)
+    await tracker.broadcaster.stop()
+    response = await asyncio.wait_for(request, timeout=5.0)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert len(frames) == 2
+    event_id, event_type, data = frames[0].split("\n")
+    event = json.loads(data.removeprefix("data: "))
+    assert event_type == "event: benchmark"
+    assert event_id == f"id: {event['cursor']}"
+    assert event["github_commit_sha"] == "sha7"
+    assert "histograms" not in event
+    assert frames[1] == "event: dropped\ndata: {}"
+
+
+def test_app_mounts_routers():
+    import main
+
+    paths = set(main.app.openapi()["paths"])
+    assert {"/api/benchmarks", "/pipelines/run", "/health", "/ready"} <= paths
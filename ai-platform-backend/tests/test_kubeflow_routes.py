@@ -0,0 +1,252 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from kubernetes import config
+from kubernetes.client.rest import ApiException
+
+from api.routes import kubeflow
+
+
+def _workflow(name: str, phase: str = "Running", labels=None, annotations=None, entrypoint: str = "train") -> dict:
+    return {
+        "metadata": {"name": name, "namespace": "kubeflow", "labels": labels or {}, "annotations": annotations or {}},
+        "spec": {"entrypoint": entrypoint},
+        "status": {
+            "phase": phase,
+            "startedAt": "2024-01-01T00:00:00Z",
+            "finishedAt": "2024-01-01T00:10:00Z" if phase == "Succeeded" else None,
+            "outputs": {"parameters": [{"name": "accuracy", "value": "0.9"}]} if phase == "Succeeded" else None,
+        },
+    }
+
+
+def _api_exception(status: int, headers=None) -> ApiException:
+    error = ApiException(status=status, reason="error")
+    error.headers = headers
+    return error
+
+
+@pytest.fixture
+def k8s_api():
+    api = MagicMock()
+    api.list_namespaced_custom_object.return_value = {"items": [], "metadata": {"resourceVersion": "1"}}
+    api.create_namespaced_custom_object.side_effect = (
+        lambda group, version, namespace, plural, body, **kwargs: {
+            "metadata": {"name": body["metadata"].get("name") or body["metadata"]["generateName"] + "abcde"}
+        }
+    )
+    return api
+
+
+@pytest.fixture
+def informer(monkeypatch, k8s_api):
+    """watch 스레드 없이 list 결과만으로 채운 informer"""
+    informer = kubeflow.WorkflowInformer(k8s_api, ["kubeflow"])
+
+    def populate(*workflows):
+        k8s_api.list_namespaced_custom_object.return_value = {
+            "items": list(workflows), "metadata": {"resourceVersion": "2"}
+        }
+        informer._list("kubeflow")
+
+    informer.populate = populate
+    monkeypatch.setattr(kubeflow, "_workflow_informer", informer)
+    return informer
+
+
+@pytest.fixture
+def client(monkeypatch, k8s_api, informer):
+    monkeypatch.setattr(kubeflow, "_submit_limiter", None)
+    app = FastAPI()
+    app.include_router(kubeflow.router)
+    app.dependency_overrides[kubeflow.get_k8s_client] = lambda: k8s_api
+    # with 없이 사용해 실제 클러스터에 연결하는 lifespan은 실행하지 않음
+    return TestClient(app)
+
+
+def test_client_created_per_request_when_startup_init_fails(monkeypatch, k8s_api):
+    for name in ("_api_client", "_custom_objects", "_k8s_executor", "_workflow_informer"):
+        monkeypatch.setattr(kubeflow, name, None)
+
+    def no_cluster():
+        raise config.ConfigException("no kubeconfig")
+
+    monkeypatch.setattr(kubeflow, "_load_k8s_configuration", no_cluster)
+    app = FastAPI()
+    app.include_router(kubeflow.router)
+    k8s_api.get_namespaced_custom_object.return_value = _workflow("train-new", phase="Pending")
+
+    with TestClient(app) as test_client:
+        unavailable = test_client.get("/pipelines/train-new/status")
+        # 클러스터 설정이 복구되면 다음 요청에서 클라이언트 생성
+        monkeypatch.setattr(kubeflow, "_load_k8s_configuration", kubeflow.client.Configuration)
+        monkeypatch.setattr(kubeflow.client, "CustomObjectsApi", lambda api_client: k8s_api)
+        recovered = test_client.get("/pipelines/train-new/status")
+
+    assert unavailable.status_code == 503
+    assert recovered.status_code == 200
+    assert recovered.json()["status"] == "Pending"
+
+
+def test_status_served_from_informer(client, k8s_api, informer):
+    informer.populate(_workflow("train-running"))
+
+    response = client.get("/pipelines/train-running/status")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "Running"
+    k8s_api.get_namespaced_custom_object.assert_not_called()
+
+
+def test_status_falls_back_to_get_on_cache_miss(client, k8s_api):
+    k8s_api.get_namespaced_custom_object.return_value = _workflow("train-new", phase="Pending")
+
+    found = client.get("/pipelines/train-new/status")
+    k8s_api.get_namespaced_custom_object.side_effect = _api_exception(404)
+    missing = client.get("/pipelines/train-gone/status")
+
+    assert found.status_code == 200
+    assert found.json()["status"] == "Pending"
+    assert missing.status_code == 404
+
+
+def test_batch_reports_counts_per_outcome(client, k8s_api, informer, monkeypatch):
+    monkeypatch.setattr(kubeflow, "RUN_CACHE_TTL_S", 10 ** 10)
+    informer.populate(_workflow(
+        "train-done", phase="Succeeded",
+        annotations={kubeflow.REQUEST_HASH_ANNOTATION: kubeflow._request_hash("train", {"lr": 0.1})},
+    ))
+    create = k8s_api.create_namespaced_custom_object.side_effect
+
+    def create_or_fail(group, version, namespace, plural, body, **kwargs):
+        if body["spec"]["arguments"]["parameters"] == [{"name": "lr", "value": "0.3"}]:
+            raise _api_exception(500)
+        return create(group, version, namespace, plural, body, **kwargs)
+
+    k8s_api.create_namespaced_custom_object.side_effect = create_or_fail
+    response = client.post("/pipelines/run/batch", json={
+        "pipeline_name": "train",
+        "runs": [{"parameters": {"lr": lr}} for lr in (0.1, 0.2, 0.3)],
+    })
+
+    body = response.json()
+    assert (body["submitted"], body["existing"], body["cached"], body["failed"]) == (1, 0, 1, 1)
+    assert [result["status"] for result in body["results"]] == ["cached", "running", "failed"]
+    assert client.post("/pipelines/run/batch", json={"pipeline_name": "train", "runs": []}).status_code == 400
+
+
+def test_run_without_key_uses_generate_name(client, k8s_api):
+    response = client.post("/pipelines/run", json={"pipeline_name": "Train_Model", "parameters": {"epochs": 3}})
+
+    assert response.status_code == 200
+    assert response.json()["pipeline_id"] == "train-model-abcde"
+    assert response.json()["status"] == "running"
+    body = k8s_api.create_namespaced_custom_object.call_args.kwargs["body"]
+    assert body["metadata"]["generateName"] == "train-model-"
+    assert body["spec"]["arguments"]["parameters"] == [{"name": "epochs", "value": "3"}]
+
+
+def test_idempotent_retry_returns_existing_workflow(client, k8s_api):
+    request = {"pipeline_name": "train", "parameters": {"epochs": 3}}
+    first = client.post("/pipelines/run", json=request, headers={"Idempotency-Key": "run-1"})
+    created = k8s_api.create_namespaced_custom_object.call_args.kwargs["body"]
+
+    # 다른 레플리카가 먼저 만들어 이름이 충돌한 경우
+    k8s_api.create_namespaced_custom_object.side_effect = _api_exception(409)
+    k8s_api.get_namespaced_custom_object.return_value = created
+    retry = client.post("/pipelines/run", json=request, headers={"Idempotency-Key": "run-1"})
+    conflict = client.post("/pipelines/run", json={"pipeline_name": "train", "parameters": {"epochs": 5}},
+                           headers={"Idempotency-Key": "run-1"})
+
+    assert first.json()["status"] == "running"
+    assert retry.status_code == 200
+    assert retry.json()["pipeline_id"] == first.json()["pipeline_id"]
+    assert retry.json()["status"] == "existing"
+    assert conflict.status_code == 409
+
+
+def test_idempotency_key_resolved_from_informer(client, k8s_api, informer):
+    request_hash = kubeflow._request_hash("train", {"epochs": 3})
+    informer.populate(_workflow(
+        "train-existing",
+        labels={kubeflow.IDEMPOTENCY_KEY_LABEL: kubeflow._idempotency_hash("run-1")},
+        annotations={kubeflow.REQUEST_HASH_ANNOTATION: request_hash},
+    ))
+
+    response = client.post("/pipelines/run", json={"pipeline_name": "train", "parameters": {"epochs": 3}},
+                           headers={"Idempotency-Key": "run-1"})
+
+    assert response.json()["pipeline_id"] == "train-existing"
+    assert response.json()["status"] == "existing"
+    k8s_api.create_namespaced_custom_object.assert_not_called()
+
+
+def test_throttled_submission_is_retried(client, k8s_api):
+    k8s_api.create_namespaced_custom_object.side_effect = [
+        _api_exception(429, {"Retry-After": "0"}),
+        {"metadata": {"name": "train-abcde"}},
+    ]
+
+    response = client.post("/pipelines/run", json={"pipeline_name": "train", "parameters": {}})
+
+    assert response.status_code == 200
+    assert response.json()["pipeline_id"] == "train-abcde"
+    assert k8s_api.create_namespaced_custom_object.call_count == 2
+
+
+def test_cache_hit_matches_submitted_parameter_values(client, k8s_api, informer, monkeypatch):
+    monkeypatch.setattr(kubeflow, "RUN_CACHE_TTL_S", 10 ** 10)
+    # 이전 실행은 문자열 "1"로 제출됨
+    informer.populate(_workflow(
+        "train-done", phase="Succeeded",
+        annotations={kubeflow.REQUEST_HASH_ANNOTATION: kubeflow._request_hash("train", {"epochs": "1"})},
+    ))
+
+    hit = client.post("/pipelines/run", json={"pipeline_name": "train", "parameters": {"epochs": 1}})
+    bypass = client.post("/pipelines/run", json={"pipeline_name": "train", "parameters": {"epochs": 1},
+                                                 "use_cache": False})
+
+    assert hit.json()["status"] == "cached"
+    assert hit.json()["cache"] == "hit"
+    assert hit.json()["pipeline_id"] == "train-done"
+    assert hit.json()["outputs"] == {"parameters": [{"name": "accuracy", "value": "0.9"}]}
+    assert bypass.json()["status"] == "running"
+    assert k8s_api.create_namespaced_custom_object.call_count == 1
+
+
+def test_request_hash_ignores_dict_key_order(client, k8s_api):
+    assert kubeflow._request_hash("train", {"config": {"lr": 0.1, "layers": [2, 4]}}) == \
+        kubeflow._request_hash("train", {"config": {"layers": [2, 4], "lr": 0.1}})
+    assert kubeflow._request_hash("train", {"epochs": 1}) == kubeflow._request_hash("train", {"epochs": "1"})
+
+    client.post("/pipelines/run", json={"pipeline_name": "train", "parameters": {"config": {"lr": 0.1, "b": True}}})
+
+    body = k8s_api.create_namespaced_custom_object.call_args.kwargs["body"]
+    assert body["spec"]["arguments"]["parameters"] == [{"name": "config", "value": '{"b":true,"lr":0.1}'}]
+
+
+def test_replayed_key_returns_original_run_over_cache(client, k8s_api, informer, monkeypatch):
+    monkeypatch.setattr(kubeflow, "RUN_CACHE_TTL_S", 10 ** 10)
+    request_hash = kubeflow._request_hash("train", {"epochs": 3})
+    # 키로 만든 실행이 진행 중인 사이 같은 파라미터의 다른 실행이 먼저 성공해 캐시에 들어간 경우
+    informer.populate(
+        _workflow("train-first", labels={kubeflow.IDEMPOTENCY_KEY_LABEL: kubeflow._idempotency_hash("run-1")},
+                  annotations={kubeflow.REQUEST_HASH_ANNOTATION: request_hash}),
+        _workflow("train-done", phase="Succeeded", annotations={kubeflow.REQUEST_HASH_ANNOTATION: request_hash}),
+    )
+    request = {"pipeline_name": "train", "parameters": {"epochs": 3}}
+
+    replay = client.post("/pipelines/run", json=request, headers={"Idempotency-Key": "run-1"})
+    batch = client.post("/pipelines/run/batch", json={
+        "pipeline_name": "train", "runs": [{"parameters": {"epochs": 3}, "idempotency_key": "run-1"}],
+    })
+    fresh = client.post("/pipelines/run", json=request)
+
+    assert replay.json()["pipeline_id"] == "train-first"
+    assert replay.json()["status"] == "existing"
+    assert batch.json()["results"][0]["pipeline_id"] == "train-first"
+    assert batch.json()["results"][0]["status"] == "existing"
+    assert fresh.json()["status"] == "cached"
+    k8s_api.create_namespaced_custom_object.assert_not_called()
@@ -7,8 +7,64 @@ interface BenchmarkMetrics {
   memoryUsage: number;
   timestamp: string;
   commitSha: string;
+  cursor: string;
 }
 
+// /api/benchmarks NDJSON 한 줄의 형태
+interface BenchmarkRecord {
+  model_name: string;
+  throughput_tokens_per_sec: number;
+  latency_ms: number;
+  memory_usage_gb: number;
+  timestamp: string;
+  github_commit_sha: string;
+  inserted_at?: string;
+  cursor: string;
+}
+
+const toBenchmarkMetrics = (record: BenchmarkRecord): BenchmarkMetrics => ({
+  modelName: record.model_name,
+  throughput: record.throughput_tokens_per_sec,
+  latency: record.latency_ms,
+  memoryUsage: record.memory_usage_gb,
+  timestamp: record.timestamp,
+  commitSha: record.github_commit_sha,
+  cursor: record.cursor
+});
+
+// 다음 since로 넘길 cursor: 저장 시각(inserted_at)이 가장 늦은 결과
+// (since 응답은 저장 순이라 마지막 줄, inserted_at이 없는 이전 결과만 있으면 측정 시각이 가장 최신인 첫 줄)
+const nextSinceCursor = (records: BenchmarkRecord[], incremental: boolean): string => {
+  if (incremental) {
+    return records[records.length - 1].cursor;
+  }
+  const inserted = records.filter((record) => record.inserted_at);
+  if (inserted.length === 0) {
+    return records[0].cursor;
+  }
+  return inserted.reduce((latest, record) => (
+    Date.parse(record.inserted_at as string) > Date.parse(latest.inserted_at as string) ? record : latest
+  )).cursor;
+};
+
+// 증분 결과를 기존 목록에 합쳐 측정 시각 최신순으로 maxResults개 유지
+// (같은 저장 시각의 결과가 since 경계에서 다시 올 수 있으므로 cursor로 중복 제거)
+const mergeBenchmarkData = (
+  newData: BenchmarkMetrics[],
+  prev: BenchmarkMetrics[],
+  maxResults: number
+): BenchmarkMetrics[] => {
+  const byCursor = new Map<string, BenchmarkMetrics>();
+  [...newData, ...prev].forEach((item) => {
+    if (!byCursor.has(item.cursor)) {
+      byCursor.set(item.cursor, item);
+    }
+  });
+  return Array.from(byCursor.values())
+    .sort((a, b) => Date.parse(b.timestamp) - Date.parse(a.timestamp))
+    .slice(0, maxResults);
+};
+
 interface UseBenchmarkDataOptions {
   refreshInterval?: number;
   maxResults?: number;
@@ -59,8 +115,12 @@ export const useBenchmarkData = ({
   const abortControllerRef = useRef<AbortController | null>(null);
   const intervalRef = useRef<NodeJS.Timeout | null>(null);
 
-  // API 호출 함수
-  const fetchBenchmarkData = useCallback(async (): Promise<BenchmarkMetrics[]> => {
+  // 증분 폴링 상태: 마지막 응답의 ETag와 가장 늦게 저장된 결과의 cursor
+  const etagRef = useRef<string | null>(null);
+  const sinceRef = useRef<string | null>(null);
+
+  // API 호출 함수 (변경이 없으면 null)
+  const fetchBenchmarkData = useCallback(async (): Promise<{ records: BenchmarkRecord[]; incremental: boolean } | null> => {
     // 이전 요청 취소
     if (abortControllerRef.current) {
       abortControllerRef.current.abort();
@@ -68,24 +128,48 @@ export const useBenchmarkData = ({
     
     abortControllerRef.current = new AbortController();
     
+    const incremental = sinceRef.current !== null;
     const params = new URLSearchParams({
       limit: maxResults.toString(),
-      ...(modelFilter && { model: modelFilter })
+      ...(modelFilter && { model: modelFilter }),
+      ...(sinceRef.current && { since: sinceRef.current })
     });
     
+    const headers: Record<string, string> = {
+      'Accept': 'application/x-ndjson',
+    };
+    if (etagRef.current) {
+      headers['If-None-Match'] = etagRef.current;
+    }
+    
     const response = await fetch(`/api/benchmarks?${params}`, {
       signal: abortControllerRef.current.signal,
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers,
     });
     
+    // 304: 서버가 하이워터마크만 비교하고 본문 없이 응답 (새 결과 없음)
+    if (response.status === 304) {
+      return null;
+    }
+    
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
     
-    const result = await response.json();
-    return result.data || [];
+    etagRef.current = response.headers.get('ETag');
+    
+    // NDJSON: 한 줄에 결과 하나 (전체 조회는 측정 시각 최신순, since 조회는 저장 순)
+    const text = await response.text();
+    const records = text
+      .split('\n')
+      .filter((line) => line.trim() !== '')
+      .map((line) => JSON.parse(line) as BenchmarkRecord);
+    
+    if (records.length > 0) {
+      sinceRef.current = nextSinceCursor(records, incremental);
+    }
+    
+    return { records, incremental };
   }, [maxResults, modelFilter]);
 
   // 데이터 새로고침 함수
@@ -94,8 +178,14 @@ export const useBenchmarkData = ({
     setError(null);
     
     try {
-      const newData = await fetchBenchmarkData();
-      setData(newData);
+      const result = await fetchBenchmarkData();
+      if (result !== null) {
+        const newData = result.records.map(toBenchmarkMetrics);
+        // 증분 응답은 기존 목록과 합쳐 최신순으로 maxResults개만 유지
+        setData((prev) => (
+          result.incremental && prev ? mergeBenchmarkData(newData, prev, maxResults) : newData
+        ));
+      }
       setLastUpdated(new Date());
     } catch (err) {
       // AbortError는 무시 (정상적인 취소)
@@ -105,7 +195,13 @@ export const useBenchmarkData = ({
     } finally {
       setLoading(false);
     }
-  }, [fetchBenchmarkData]);
+  }, [fetchBenchmarkData, maxResults]);
+
+  // 필터/개수가 바뀌면 증분 상태 초기화 (전체 목록부터 다시 조회)
+  useEffect(() => {
+    etagRef.current = null;
+    sinceRef.current = null;
+  }, [maxResults, modelFilter]);
 
   // 컴포넌트 마운트 시 초기 데이터 로드
   useEffect(() => {
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from benchmark.dataset_loader import DatasetSpec
+
+# 지표별 방향: True면 값이 클수록 좋음
+BISECT_METRICS = {
+    "throughput_tokens_per_sec": True,
+    "latency_ms": False,
+}
+
+
+@dataclass
+class BisectRequest:
+    """벤치마크 큐에 넣는 커밋 구간 bisect 요청"""
+    model_name: str
+    good_sha: str
+    bad_sha: str
+    test_dataset: Union[List[str], DatasetSpec]
+    repo_path: str
+    hardware: str = "unknown"
+    metric: str = "throughput_tokens_per_sec"
+
+
+@dataclass
+class BisectStep:
+    github_commit_sha: str
+    value: float
+    is_bad: bool
+    cached: bool
+
+
+@dataclass
+class BisectResult:
+    model_name: str
+    metric: str
+    good_sha: str
+    bad_sha: str
+    first_bad_sha: str
+    good_value: float
+    bad_value: float
+    steps: List[BisectStep] = field(default_factory=list)
+
+    @property
+    def runs_executed(self) -> int:
+        return sum(1 for step in self.steps if not step.cached)
+
+
+async def _git(repo_path: str, *args: str) -> str:
+    process = await asyncio.create_subprocess_exec(
+        "git", "-C", repo_path, *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise Exception(f"git {args[0]} failed: {stderr.decode().strip()}")
+    return stdout.decode()
+
+
+async def resolve_commit(repo_path: str, ref: str) -> str:
+    """브랜치/태그/축약 SHA를 전체 커밋 SHA로 변환"""
+    return (await _git(repo_path, "rev-parse", "--verify", f"{ref}^{{commit}}")).strip()
+
+
+async def list_commits(repo_path: str, good_sha: str, bad_sha: str) -> List[str]:
+    """good(미포함)..bad(포함) 구간의 first-parent 커밋을 오래된 순으로 조회"""
+    output = await _git(repo_path, "rev-list", "--first-parent", "--reverse", f"{good_sha}..{bad_sha}")
+    return output.split()
+
+
+class CommitBisector:
+    """
+    처리량/지연 회귀를 일으킨 커밋을 이분 탐색으로 찾는다.
+
+    good/bad 커밋의 측정값 중간값을 기준으로 각 중간 커밋을 good/bad로 분류하므로
+    구간 내 커밋이 N개면 O(log N)번의 벤치마크만 실행한다. 이미 같은 모델/하드웨어와
+    같은 데이터셋/부하 설정(config_hash)으로 측정된 커밋은 저장된 결과를 재사용한다.
+    """
+
+    def __init__(self, tracker, prepare_commit: Optional[Callable[[str], Awaitable[None]]] = None,
+                 min_relative_change: float = 0.05):
+        """
+        Args:
+            tracker: PerformanceTracker
+            prepare_commit: 해당 커밋의 vLLM 서버를 준비하는 훅 (빌드/재배포 등)
+            min_relative_change: good/bad 간 최소 상대 차이 (이보다 작으면 회귀 없음으로 판단)
+        """
+        self.tracker = tracker
+        self.prepare_commit = prepare_commit
+        self.min_relative_change = min_relative_change
+
+    async def _cached_value(self, request: BisectRequest, commit_sha: str) -> Optional[float]:
+        cursor = self.tracker.collection.find(
+            {
+                "metadata.model_name": request.model_name,
+                "metadata.hardware": request.hardware,
+                "metadata.github_commit_sha": commit_sha,
+                "config_hash": self.tracker.benchmark_config_hash(request.test_dataset),
+            },
+            {request.metric: 1, "_id": 0},
+        )
+        values = [document[request.metric] async for document in cursor]
+        return sum(values) / len(values) if values else None
+
+    async def _measure(self, request: BisectRequest, commit_sha: str, memo: Dict[str, BisectStep],
+                       threshold: Optional[float] = None) -> BisectStep:
+        if commit_sha in memo:
+            return memo[commit_sha]
+
+        value = await self._cached_value(request, commit_sha)
+        cached = value is not None
+        if not cached:
+            if self.prepare_commit is not None:
+                await self.prepare_commit(commit_sha)
+            result = await self.tracker.run_benchmark(
+                request.model_name,
+                request.test_dataset,
+                hardware=request.hardware,
+                github_commit_sha=commit_sha,
+                # 중간 커밋 측정값이 회귀 베이스라인을 오염시키지 않도록
+                evaluate_regression=False,
+            )
+            value = getattr(result, request.metric)
+
+        higher_is_better = BISECT_METRICS[request.metric]
+        is_bad = threshold is not None and (value < threshold if higher_is_better else value > threshold)
+        step = BisectStep(github_commit_sha=commit_sha, value=value, is_bad=is_bad, cached=cached)
+        memo[commit_sha] = step
+        return step
+
+    async def run(self, request: BisectRequest) -> BisectResult:
+        """
+        bisect 실행
+
+        Returns:
+            BisectResult: 처음으로 나빠진 커밋과 측정 이력
+
+        Raises:
+            Exception: 지원하지 않는 지표이거나 good/bad 간 유의미한 차이가 없는 경우
+        """
+        if request.metric not in BISECT_METRICS:
+            raise Exception(f"Unsupported bisect metric: {request.metric}")
+
+        commits = await list_commits(request.repo_path, request.good_sha, request.bad_sha)
+        if not commits:
+            raise Exception(f"No commits between {request.good_sha} and {request.bad_sha}")
+
+        memo: Dict[str, BisectStep] = {}
+        good = await self._measure(request, await resolve_commit(request.repo_path, request.good_sha), memo)
+        bad = await self._measure(request, commits[-1], memo)
+
+        relative_change = abs(bad.value - good.value) / good.value if good.value else 0.0
+        worse = bad.value < good.value if BISECT_METRICS[request.metric] else bad.value > good.value
+        if not worse or relative_change < self.min_relative_change:
+            raise Exception(
+                f"No {request.metric} regression between {request.good_sha} ({good.value:.2f}) "
+                f"and {request.bad_sha} ({bad.value:.2f})"
+            )
+
+        threshold = (good.value + bad.value) / 2
+        bad.is_bad = True
+
+        # 불변식: commits[lo]까지는 good (lo=-1은 good_sha), commits[hi]는 bad
+        lo, hi = -1, len(commits) - 1
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            step = await self._measure(request, commits[mid], memo, threshold)
+            logging.info(
+                f"Bisect {request.model_name}: {commits[mid][:12]} {request.metric}={step.value:.2f} "
+                f"-> {'bad' if step.is_bad else 'good'}"
+            )
+            if step.is_bad:
+                hi = mid
+            else:
+                lo = mid
+
+        result = BisectResult(
+            model_name=request.model_name,
+            metric=request.metric,
+            good_sha=request.good_sha,
+            bad_sha=request.bad_sha,
+            first_bad_sha=commits[hi],
+            good_value=good.value,
+            bad_value=bad.value,
+            steps=list(memo.values()),
+        )
+        await self.tracker.db.benchmark_bisections.insert_one({
+            "model_name": result.model_name,
+            "hardware": request.hardware,
+            "metric": result.metric,
+            "good_sha": result.good_sha,
+            "bad_sha": result.bad_sha,
+            "first_bad_sha": result.first_bad_sha,
+            "good_value": result.good_value,
+            "bad_value": result.bad_value,
+            "steps": [asdict(step) for step in result.steps],
+            "runs_executed": result.runs_executed,
+            "timestamp": datetime.now(),
+        })
+        return result
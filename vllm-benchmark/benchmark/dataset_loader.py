@@ -0,0 +1,228 @@
+import asyncio
+import codecs
+import json
+import random
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import aiohttp
+
+DATASET_FORMATS = ("jsonl", "parquet", "sharegpt")
+SHAREGPT_USER_ROLES = ("human", "user")
+
+
+@dataclass
+class DatasetSpec:
+    """
+    큐/워커 간에 전달하는 데이터셋 참조 (프롬프트 자체는 실행 시점에 스트리밍으로 읽음)
+
+    처리 순서: 샤드 선택 → 길이 필터 → 샘플링 → 셔플 → max_prompts 제한
+    shuffle_seed가 같으면 같은 순서가 재현된다 (shuffle_buffer_size 크기의 버퍼 셔플).
+    """
+    uri: str
+    format: Optional[str] = None  # None이면 확장자로 추정
+    prompt_field: str = "prompt"
+    sample_rate: Optional[float] = None
+    max_prompts: Optional[int] = None
+    min_length: int = 0  # 문자 수 기준 길이 버킷
+    max_length: Optional[int] = None
+    shuffle_seed: Optional[int] = None
+    shuffle_buffer_size: int = 10000
+    shard_index: int = 0
+    num_shards: int = 1
+
+    def resolved_format(self) -> str:
+        if self.format:
+            if self.format not in DATASET_FORMATS:
+                raise Exception(f"Unsupported dataset format: {self.format}")
+            return self.format
+        path = self.uri.split("?", 1)[0].lower()
+        if path.endswith(".parquet"):
+            return "parquet"
+        if path.endswith(".json"):
+            return "sharegpt"
+        return "jsonl"
+
+
+class _JsonArrayDecoder:
+    """최상위 JSON 배열을 조각 단위로 받아 완성된 원소만 반환 (ShareGPT .json을 전부 올리지 않기 위함)"""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+
+    def feed(self, text: str) -> List:
+        buffer = self._buffer + text
+        items = []
+        position = 0
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] in ",[]"):
+                position += 1
+            if position >= len(buffer):
+                break
+            try:
+                item, position = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # 원소가 아직 다 들어오지 않음
+            items.append(item)
+        self._buffer = buffer[position:]
+        return items
+
+    def close(self):
+        if self._buffer.strip():
+            raise Exception("Truncated JSON dataset")
+
+
+def _prompt_from_record(record: Dict, spec: DatasetSpec, dataset_format: str) -> Optional[str]:
+    if dataset_format == "sharegpt":
+        turns = record.get("conversations") or record.get("messages") or []
+        for turn in turns:
+            if turn.get("from", turn.get("role")) in SHAREGPT_USER_ROLES:
+                return turn.get("value", turn.get("content"))
+        return None
+    return record.get(spec.prompt_field)
+
+
+def _read_local_batches(path: str, spec: DatasetSpec, dataset_format: str, batch_size: int) -> Iterator[List[Dict]]:
+    if dataset_format == "parquet":
+        import pyarrow.parquet as pq  # Parquet 데이터셋에서만 필요한 의존성
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=[spec.prompt_field]):
+            yield batch.to_pylist()
+        return
+
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == "[":
+            decoder = _JsonArrayDecoder()
+            decoder.feed(first)
+            for chunk in iter(lambda: f.read(1 << 16), ""):
+                items = decoder.feed(chunk)
+                if items:
+                    yield items
+            decoder.close()
+            return
+
+        batch = []
+        for line in _prepend(first, f):
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _prepend(first: str, f) -> Iterator[str]:
+    line = first + f.readline()
+    yield line
+    yield from f
+
+
+async def _iter_local_records(path: str, spec: DatasetSpec, dataset_format: str,
+                              batch_size: int = 512) -> AsyncIterator[Dict]:
+    """파일 읽기/파싱은 스레드에서 배치 단위로 수행해 이벤트 루프를 막지 않음"""
+    batches = _read_local_batches(path, spec, dataset_format, batch_size)
+    reading: Optional[asyncio.Future] = None
+    try:
+        while True:
+            # 취소돼도 스레드의 next()는 멈추지 않으므로 읽기 태스크 자체는 취소하지 않음
+            reading = asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+            batch = await asyncio.shield(reading)
+            reading = None
+            if batch is None:
+                return
+            for record in batch:
+                yield record
+    finally:
+        if reading is not None:
+            # 실행 중인 제너레이터는 닫을 수 없으므로 진행 중인 읽기가 끝난 뒤 닫음
+            await asyncio.gather(reading, return_exceptions=True)
+        batches.close()
+
+
+async def _iter_remote_records(url: str, dataset_format: str) -> AsyncIterator[Dict]:
+    if dataset_format == "parquet":
+        raise Exception("Parquet datasets must be local files")
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=300)) as session:
+        async with session.get(url) as response:
+            if response.status != 200:
+                raise Exception(f"Dataset download failed: {response.status}")
+            text_decoder = codecs.getincrementaldecoder("utf-8")()
+            array_decoder = None
+            pending = ""
+            async for chunk in response.content.iter_chunked(1 << 16):
+                text = text_decoder.decode(chunk)
+                if array_decoder is None and not pending.strip() and text.lstrip().startswith("["):
+                    array_decoder = _JsonArrayDecoder()
+                if array_decoder is not None:
+                    for record in array_decoder.feed(text):
+                        yield record
+                    continue
+                lines = (pending + text).split("\n")
+                pending = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if array_decoder is not None:
+                array_decoder.close()
+            elif pending.strip():
+                yield json.loads(pending)
+
+
+async def iter_dataset(spec: DatasetSpec) -> AsyncIterator[str]:
+    """
+    데이터셋 프롬프트를 지연 로딩하는 비동기 이터레이터
+
+    메모리 사용량은 셔플 버퍼 크기로 제한되며 데이터셋 크기와 무관하다.
+    """
+    dataset_format = spec.resolved_format()
+    if spec.uri.startswith(("http://", "https://")):
+        records = _iter_remote_records(spec.uri, dataset_format)
+    else:
+        path = spec.uri[len("file://"):] if spec.uri.startswith("file://") else spec.uri
+        records = _iter_local_records(path, spec, dataset_format)
+
+    sample_rng = random.Random(spec.shuffle_seed)
+    shuffle_rng = random.Random(spec.shuffle_seed)
+    buffer: List[str] = []
+    emitted = 0
+    index = -1
+
+    try:
+        async for record in records:
+            index += 1
+            if index % spec.num_shards != spec.shard_index:
+                continue
+            prompt = _prompt_from_record(record, spec, dataset_format)
+            if not prompt or len(prompt) < spec.min_length:
+                continue
+            if spec.max_length is not None and len(prompt) >= spec.max_length:
+                continue
+            if spec.sample_rate is not None and sample_rng.random() >= spec.sample_rate:
+                continue
+
+            if spec.shuffle_seed is None:
+                yield prompt
+                emitted += 1
+            elif len(buffer) < spec.shuffle_buffer_size:
+                buffer.append(prompt)
+                continue
+            else:
+                slot = shuffle_rng.randrange(len(buffer))
+                yield buffer[slot]
+                buffer[slot] = prompt
+                emitted += 1
+            if spec.max_prompts is not None and emitted >= spec.max_prompts:
+                return
+    finally:
+        await records.aclose()
+
+    shuffle_rng.shuffle(buffer)
+    for prompt in buffer:
+        if spec.max_prompts is not None and emitted >= spec.max_prompts:
+            return
+        yield prompt
+        emitted += 1
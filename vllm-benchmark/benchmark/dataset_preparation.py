@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import re
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable, Callable, Deque, Dict, List, Optional, Sequence
+
+# 프로세스 풀 워커마다 한 번만 로드하는 토크나이저
+_tokenizer = None
+
+
+def _init_tokenizer(tokenizer_name: str):
+    global _tokenizer
+    from transformers import AutoTokenizer  # 데이터셋 준비 단계에서만 필요한 의존성
+    _tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+
+
+def _tokenize_chunk(prompts: List[str]) -> List[int]:
+    encoded = _tokenizer(prompts, add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def _update_dataset_hash(digest, prompt: str):
+    data = prompt.encode()
+    digest.update(len(data).to_bytes(8, "little"))
+    digest.update(data)
+
+
+def dataset_hash(prompts: Sequence[str]) -> str:
+    """프롬프트 순서/내용 기준 데이터셋 해시 (길이 접두로 경계가 섞이지 않게 함)"""
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        _update_dataset_hash(digest, prompt)
+    return digest.hexdigest()
+
+
+class TokenizedDataset:
+    """
+    토큰 수/문자 길이 캐시 파일의 메모리 맵 뷰
+
+    파일은 int32 2N개 (앞 N개 토큰 수, 뒤 N개 문자 길이)로 구성되며
+    필요한 페이지만 읽으므로 수백만 프롬프트도 즉시 열린다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._values = self._buffer.cast("i")
+        self._size = len(self._values) // 2
+        self.token_counts = self._values[:self._size]
+        self.char_lengths = self._values[self._size:]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.token_counts)
+
+    def token_length_summary(self) -> Dict[str, float]:
+        """프롬프트 토큰 길이 분포 요약 (결과 문서 저장용)"""
+        counts = sorted(self.token_counts)
+        if not counts:
+            return {}
+
+        def percentile(p: float) -> int:
+            return counts[min(len(counts) - 1, int(p / 100 * len(counts)))]
+
+        total = sum(counts)
+        return {
+            "count": len(counts),
+            "total": total,
+            "mean": total / len(counts),
+            "min": counts[0],
+            "p50": percentile(50),
+            "p90": percentile(90),
+            "p99": percentile(99),
+            "max": counts[-1],
+        }
+
+    def close(self):
+        # mmap은 파생된 memoryview가 모두 해제되어야 닫을 수 있음
+        for view in (self.token_counts, self.char_lengths, self._values, self._buffer):
+            view.release()
+        self._mmap.close()
+
+
+class DatasetPreparer:
+    """
+    벤치마크 데이터셋 준비 단계
+
+    모델의 실제 토크나이저(transformers)로 프롬프트 토큰 수를 프로세스 풀에서 계산하고,
+    결과를 (토크나이저, 데이터셋 해시) 키의 메모리 맵 파일로 캐시한다.
+    같은 데이터셋의 반복 실행은 토크나이저를 로드하지 않고 캐시 파일만 연다.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: Optional[int] = None,
+                 chunk_size: int = 2048):
+        self.cache_dir = os.path.expanduser(
+            cache_dir or os.getenv("BENCHMARK_CACHE_DIR", "~/.cache/vllm-benchmark")
+        )
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._executors: Dict[str, ProcessPoolExecutor] = {}
+
+    def _cache_path(self, tokenizer_name: str, key: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", tokenizer_name)
+        return os.path.join(self.cache_dir, "token_counts", f"{slug}-{key}.i32")
+
+    def _executor(self, tokenizer_name: str) -> ProcessPoolExecutor:
+        executor = self._executors.get(tokenizer_name)
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_tokenizer,
+                initargs=(tokenizer_name,),
+            )
+            self._executors[tokenizer_name] = executor
+        return executor
+
+    @staticmethod
+    def _write_cache(path: str, token_counts: List[int], char_lengths: List[int]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            array("i", token_counts).tofile(f)
+            array("i", char_lengths).tofile(f)
+        # 동시에 준비한 다른 프로세스와 경쟁해도 완성된 파일만 보이도록 원자적 교체
+        os.replace(tmp_path, path)
+
+    async def prepare(self, tokenizer_name: str, prompts: Sequence[str]) -> TokenizedDataset:
+        """
+        프롬프트별 토큰 수/문자 길이 계산 (캐시 우선)
+
+        Args:
+            tokenizer_name: HuggingFace 토크나이저 이름 또는 경로 (보통 모델명과 같음)
+            prompts: 데이터셋 프롬프트
+        """
+        if not prompts:
+            raise Exception("Cannot prepare an empty dataset")
+        key = await asyncio.to_thread(dataset_hash, prompts)
+        path = self._cache_path(tokenizer_name, key)
+        if os.path.exists(path):
+            return TokenizedDataset(path)
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor(tokenizer_name)
+        chunks = [list(prompts[i:i + self.chunk_size]) for i in range(0, len(prompts), self.chunk_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, _tokenize_chunk, chunk) for chunk in chunks
+        ))
+        token_counts = [count for chunk_counts in results for count in chunk_counts]
+        char_lengths = [len(prompt) for prompt in prompts]
+
+        await asyncio.to_thread(self._write_cache, path, token_counts, char_lengths)
+        logging.info(f"Tokenized {len(prompts)} prompts with {tokenizer_name}: {sum(token_counts)} tokens")
+        return TokenizedDataset(path)
+
+    async def prepare_stream(self, tokenizer_name: str,
+                             open_prompts: Callable[[], AsyncIterable[str]]) -> TokenizedDataset:
+        """
+        스트리밍 데이터셋(DatasetSpec)의 프롬프트별 토큰 수/문자 길이 계산 (캐시 우선)
+
+        한 번 읽어 prepare()와 같은 데이터셋 해시를 구하고, 캐시가 없을 때만 다시 읽으며 청크 단위로 토큰화한다.
+        메모리에는 진행 중인 청크와 int 배열만 두므로 데이터셋 크기와 무관하게 프롬프트를 모두 올리지 않는다.
+
+        Args:
+            tokenizer_name: HuggingFace 토크나이저 이름 또는 경로
+            open_prompts: 호출할 때마다 처음부터 프롬프트를 읽는 비동기 이터러블을 돌려주는 함수
+        """
+        digest = hashlib.sha256()
+        count = 0
+        async for prompt in open_prompts():
+            _update_dataset_hash(digest, prompt)
+            count += 1
+        if not count:
+            raise Exception("Cannot prepare an empty dataset")
+        path = self._cache_path(tokenizer_name, digest.hexdigest())
+        if os.path.exists(path):
+            return TokenizedDataset(path)
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor(tokenizer_name)
+        # 순서를 유지하면서 풀 크기의 두 배까지만 청크를 동시에 처리
+        max_in_flight = 2 * (self.max_workers or os.cpu_count() or 1)
+        in_flight: Deque[asyncio.Future] = deque()
+        token_counts = array("i")
+        char_lengths = array("i")
+        chunk: List[str] = []
+
+        async def submit(prompts: List[str]):
+            in_flight.append(loop.run_in_executor(executor, _tokenize_chunk, prompts))
+            char_lengths.extend(len(prompt) for prompt in prompts)
+            if len(in_flight) >= max_in_flight:
+                token_counts.extend(await in_flight.popleft())
+
+        async for prompt in open_prompts():
+            chunk.append(prompt)
+            if len(chunk) == self.chunk_size:
+                await submit(chunk)
+                chunk = []
+        if chunk:
+            await submit(chunk)
+        while in_flight:
+            token_counts.extend(await in_flight.popleft())
+        if len(token_counts) != count:
+            raise Exception(f"Dataset changed while preparing: expected {count} prompts, read {len(token_counts)}")
+
+        await asyncio.to_thread(self._write_cache, path, token_counts, char_lengths)
+        logging.info(f"Tokenized {count} streamed prompts with {tokenizer_name}: {sum(token_counts)} tokens")
+        return TokenizedDataset(path)
+
+    def close(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import logging
+import socket
+import uuid
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from benchmark.dataset_loader import DatasetSpec, iter_dataset
+from benchmark.durable_queue import DurableTaskQueue, LeasedTask
+from benchmark.load_generator import LoadGenerator, LoadGeneratorConfig, LoadTestReport
+
+SHARD_TASK_KIND = "benchmark_shard"
+
+
+def shard_dataset(test_dataset: List[str], num_shards: int) -> List[List[str]]:
+    """프롬프트를 번갈아 나눠 샤드별 길이 분포가 비슷하도록 분할 (빈 샤드 제외)"""
+    shards = [test_dataset[i::num_shards] for i in range(num_shards)]
+    return [shard for shard in shards if shard]
+
+
+def shard_dataset_spec(spec: DatasetSpec, num_shards: int) -> List[DatasetSpec]:
+    """데이터셋 참조를 레코드 순번 기준으로 분할 (각 워커가 자기 샤드만 스트리밍으로 읽음)"""
+    shards = []
+    for index in range(num_shards):
+        max_prompts = spec.max_prompts
+        if max_prompts is not None:
+            max_prompts = max_prompts // num_shards + (1 if index < max_prompts % num_shards else 0)
+        shards.append(replace(spec, shard_index=index, num_shards=num_shards, max_prompts=max_prompts))
+    return shards
+
+
+def _split(total: int, index: int, num_shards: int) -> int:
+    return total // num_shards + (1 if index < total % num_shards else 0)
+
+
+def shard_load_config(config: LoadGeneratorConfig, index: int, num_shards: int) -> Dict:
+    """
+    샤드 태스크에 실을 부하 설정 (전체 합이 코디네이터 설정과 같도록 요청률/동시성/워밍업 요청 수를 나눔)
+
+    base_url과 api_key는 워커 쪽 설정을 쓰므로 싣지 않는다 (MongoDB에 자격 증명을 남기지 않음).
+    """
+    settings = asdict(config)
+    for key in ("base_url", "api_key"):
+        settings.pop(key)
+    settings["concurrency"] = max(1, _split(config.concurrency, index, num_shards))
+    settings["warmup_requests"] = _split(config.warmup_requests, index, num_shards)
+    if config.request_rate:
+        settings["request_rate"] = config.request_rate / num_shards
+    if config.seed is not None:
+        # 샤드끼리 같은 도착 간격 시퀀스를 쓰지 않도록
+        settings["seed"] = config.seed + index
+    return settings
+
+
+def merge_shard_reports(documents: List[Dict]) -> LoadTestReport:
+    """
+    샤드 보고서 병합
+
+    샤드마다 시작/종료가 조금씩 어긋나므로 duration은 가장 이른 측정 시작부터 가장 늦은 측정 종료까지로 잡는다
+    (가장 오래 걸린 샤드 길이를 쓰면 어긋난 만큼 처리량이 부풀려짐). 측정 시각이 없는 이전 보고서가 섞이면
+    샤드별 duration의 최댓값을 쓴다.
+    """
+    report = LoadTestReport()
+    for document in documents:
+        report.merge(LoadTestReport.from_document(document["report"]))
+    starts = [document.get("measurement_started_at") for document in documents]
+    ends = [document.get("measurement_ended_at") for document in documents]
+    if documents and None not in starts and None not in ends:
+        report.duration_s = (max(ends) - min(starts)).total_seconds()
+    return report
+
+
+class BenchmarkShardWorker:
+    """
+    분산 벤치마크 워커
+
+    영속 큐에서 샤드 태스크만 lease해 지정된 시작 시각(start_at)에 맞춰 부하를 걸고,
+    LoadTestReport를 benchmark_shard_reports에 (run_id, shard) 키로 저장한다.
+    재시도로 같은 샤드가 다시 실행되어도 보고서는 덮어써지므로 중복 집계되지 않는다.
+    """
+
+    def __init__(self, db, durable_queue: DurableTaskQueue, load_config: Optional[LoadGeneratorConfig] = None,
+                 poll_interval_s: float = 1.0):
+        self.reports = db.benchmark_shard_reports
+        self.durable_queue = durable_queue
+        self.load_config = load_config or LoadGeneratorConfig()
+        self.poll_interval_s = poll_interval_s
+        self.owner = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.running = False
+
+    async def run_shard(self, leased: LeasedTask):
+        payload = leased.payload
+        # 모든 샤드가 같은 시각에 시작해야 합산 처리량이 동시 부하를 반영함 (노드 간 시계는 NTP 동기화 전제)
+        delay = (payload["start_at"] - datetime.now()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        config = self.load_config
+        if "load_config" in payload:
+            config = replace(config, **payload["load_config"])
+        elif payload.get("request_rate") is not None:
+            config = replace(config, request_rate=payload["request_rate"])
+        load_generator = LoadGenerator(config)
+        try:
+            if "dataset" in payload:
+                prompts = iter_dataset(DatasetSpec(**payload["dataset"]))
+            else:
+                prompts = payload["prompts"]
+            report = await load_generator.run(payload["model_name"], prompts)
+        finally:
+            await load_generator.close()
+        # 측정 구간은 실행 종료 직전에 끝나므로 종료 시각에서 duration만큼 거슬러 시작 시각을 구함
+        completed_at = datetime.now()
+
+        # 코디네이터가 시간 초과 등으로 취소한 샤드는 보고서를 남기지 않음
+        if not await self.durable_queue.heartbeat(leased, self.owner):
+            logging.warning(f"Shard {payload['shard_index']} of {payload['run_id']} was cancelled, discarding report")
+            return
+        await self.reports.replace_one(
+            {"_id": leased.task_id},
+            {
+                "run_id": payload["run_id"],
+                "shard_index": payload["shard_index"],
+                "worker": self.owner,
+                "report": report.to_document(),
+                "measurement_started_at": completed_at - timedelta(seconds=report.duration_s),
+                "measurement_ended_at": completed_at,
+                "completed_at": completed_at,
+            },
+            upsert=True
+        )
+        logging.info(
+            f"Shard {payload['shard_index']} of {payload['run_id']} done: "
+            f"{report.completed_requests}/{report.num_requests} requests, {report.throughput_tokens_per_sec:.2f} tokens/sec"
+        )
+
+    async def _heartbeat(self, leased: LeasedTask):
+        while True:
+            await asyncio.sleep(self.durable_queue.visibility_timeout_s / 3)
+            try:
+                await self.durable_queue.heartbeat(leased, self.owner)
+            except PyMongoError as e:
+                logging.error(f"Shard heartbeat failed: {e}")
+
+    async def run(self):
+        """stop()이 호출될 때까지 샤드 태스크를 하나씩 처리"""
+        self.running = True
+        while self.running:
+            try:
+                leased = await self.durable_queue.lease(self.owner, kinds=(SHARD_TASK_KIND,))
+            except PyMongoError as e:
+                logging.error(f"Shard lease failed: {e}")
+                leased = None
+            if leased is None:
+                await asyncio.sleep(self.poll_interval_s)
+                continue
+
+            heartbeat = asyncio.create_task(self._heartbeat(leased))
+            try:
+                await self.run_shard(leased)
+                await self.durable_queue.complete(leased, self.owner)
+            except Exception as e:
+                logging.error(f"Shard {leased.task_id} failed: {e}")
+                await self.durable_queue.fail(leased, self.owner, str(e))
+            finally:
+                heartbeat.cancel()
+
+    def stop(self):
+        self.running = False
+
+
+class DistributedBenchmarkCoordinator:
+    """
+    분산 벤치마크 코디네이터
+
+    test_dataset을 num_shards개로 나눠 영속 큐에 샤드 태스크로 등록하고, 여러 노드/프로세스의
+    BenchmarkShardWorker가 동시에 부하를 건 결과를 모아 히스토그램과 토큰 수를 병합한다.
+    부하 설정(max_tokens, 동시성, 워밍업, 안정 상태 판정 등)은 tracker의 LoadGeneratorConfig를 샤드마다 실어 보낸다.
+    병합된 보고서의 duration은 가장 이른 샤드 측정 시작부터 가장 늦은 샤드 측정 종료까지이므로
+    처리량은 전체 동시 부하의 합이 된다. 시간 초과/실패 시에는 남은 샤드 태스크와 도착한 보고서를 정리한다.
+    """
+
+    def __init__(self, tracker, durable_queue: DurableTaskQueue, num_shards: int,
+                 start_delay_s: float = 10.0, timeout_s: float = 3600.0, poll_interval_s: float = 2.0):
+        """
+        Args:
+            tracker: PerformanceTracker (병합 결과 저장)
+            start_delay_s: 샤드 등록 후 워커들이 lease할 시간을 두고 동시에 시작하기까지의 지연
+        """
+        self.tracker = tracker
+        self.durable_queue = durable_queue
+        self.reports = tracker.db.benchmark_shard_reports
+        self.num_shards = num_shards
+        self.start_delay_s = start_delay_s
+        self.timeout_s = timeout_s
+        self.poll_interval_s = poll_interval_s
+
+    async def _wait_for_reports(self, shard_ids: List[str]) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_s
+        while True:
+            reports = await self.reports.find({"_id": {"$in": shard_ids}}).to_list(length=len(shard_ids))
+            if len(reports) == len(shard_ids):
+                return reports
+
+            dead = await self.durable_queue.dead_letter.count_documents({"_id": {"$in": shard_ids}})
+            if dead:
+                raise Exception(f"Distributed benchmark failed: {dead} of {len(shard_ids)} shards dead-lettered")
+            if loop.time() >= deadline:
+                raise Exception(
+                    f"Distributed benchmark timed out: {len(reports)} of {len(shard_ids)} shards reported"
+                )
+            await asyncio.sleep(self.poll_interval_s)
+
+    async def _abort(self, shard_ids: List[str]):
+        """남은 샤드 태스크를 취소하고 일부만 도착한 보고서 삭제"""
+        try:
+            cancelled = await self.durable_queue.cancel(shard_ids)
+            await self.reports.delete_many({"_id": {"$in": shard_ids}})
+            logging.warning(f"Distributed benchmark aborted: cancelled {cancelled} of {len(shard_ids)} shard tasks")
+        except PyMongoError as e:
+            logging.error(f"Failed to clean up distributed benchmark shards: {e}")
+
+    async def run_benchmark(self, model_name: str, test_dataset: Union[List[str], DatasetSpec],
+                            hardware: str = "unknown", github_commit_sha: Optional[str] = None,
+                            evaluate_regression: bool = True):
+        """
+        샤드 분산 벤치마크 실행
+
+        Returns:
+            BenchmarkResult: 모든 샤드를 병합한 결과 (PerformanceTracker.run_benchmark와 동일하게 저장됨)
+        """
+        run_id = uuid.uuid4().hex
+        if isinstance(test_dataset, DatasetSpec):
+            shards = [{"dataset": asdict(spec)} for spec in shard_dataset_spec(test_dataset, self.num_shards)]
+        else:
+            shards = [{"prompts": prompts} for prompts in shard_dataset(test_dataset, self.num_shards)]
+        start_time = datetime.now()
+        start_at = start_time + timedelta(seconds=self.start_delay_s)
+        load_config = self.tracker.load_generator.config
+
+        shard_ids = []
+        for index, shard in enumerate(shards):
+            shard_ids.append(await self.durable_queue.enqueue(
+                SHARD_TASK_KIND,
+                {
+                    **shard,
+                    "run_id": run_id,
+                    "shard_index": index,
+                    "model_name": model_name,
+                    "start_at": start_at,
+                    "load_config": shard_load_config(load_config, index, len(shards)),
+                },
+                idempotency_key=f"{run_id}:{index}",
+            ))
+        logging.info(f"Distributed benchmark {run_id} for {model_name}: {len(shards)} shards queued")
+
+        # 서버 지표는 워커가 아닌 코디네이터가 한 곳에서 수집
+        sampler = self.tracker.create_metrics_sampler()
+        sampler.start()
+        try:
+            documents = await self._wait_for_reports(shard_ids)
+        except (Exception, asyncio.CancelledError):
+            await self._abort(shard_ids)
+            raise
+        finally:
+            server_metrics = await sampler.stop()
+
+        report = merge_shard_reports(documents)
+        await self.reports.delete_many({"_id": {"$in": shard_ids}})
+
+        if not report.completed_requests:
+            raise Exception(f"Benchmark failed: all {report.num_requests} requests to {model_name} failed")
+        return await self.tracker.record_load_report(model_name, report, start_time, hardware, github_commit_sha,
+                                                     server_metrics, evaluate_regression)
+
+
+async def _run_worker(args):
+    db = AsyncIOMotorClient(args.mongodb_url).vllm_benchmark
+    durable_queue = DurableTaskQueue(db)
+    config = LoadGeneratorConfig(base_url=args.base_url, concurrency=args.concurrency, max_tokens=args.max_tokens)
+    workers = [BenchmarkShardWorker(db, durable_queue, config) for _ in range(args.slots)]
+    await asyncio.gather(*(worker.run() for worker in workers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed vLLM benchmark shard worker")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    # 샤드 태스크에 코디네이터 부하 설정이 실려 있으면 아래 두 값은 무시됨
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--slots", type=int, default=1, help="이 프로세스에서 동시에 처리할 샤드 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_worker(args))
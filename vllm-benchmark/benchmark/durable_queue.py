@@ -0,0 +1,205 @@
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+
+
+@dataclass
+class LeasedTask:
+    """워커가 lease한 태스크 (lease가 만료되기 전에 complete/fail/heartbeat 해야 함)"""
+    task_id: Any
+    kind: str
+    payload: Dict
+    priority: int
+    attempts: int
+
+
+class DurableTaskQueue:
+    """
+    MongoDB 기반 영속 작업 큐
+
+    - lease: find_one_and_update로 원자적으로 가져가므로 여러 레플리카가 같은 태스크를 동시에 실행하지 않는다
+    - visibility timeout: heartbeat 없이 lease가 만료되면 (파드 재시작 등) 다른 워커가 다시 가져간다
+    - 실패 시 지수 백오프 후 재시도, max_attempts를 넘으면 dead-letter 컬렉션으로 이동
+    - idempotency_key를 _id로 사용해 같은 키의 중복 등록은 기존 태스크를 반환한다
+      (완료된 태스크는 completed_ttl_s 동안 보관해 그 사이의 재등록도 막는다)
+    """
+
+    def __init__(self, db, collection_name: str = "benchmark_tasks",
+                 dead_letter_collection_name: str = "benchmark_tasks_dead_letter",
+                 visibility_timeout_s: float = 900.0, max_attempts: int = 3,
+                 backoff_base_s: float = 30.0, backoff_max_s: float = 1800.0,
+                 completed_ttl_s: int = 7 * 24 * 3600):
+        self.collection = db[collection_name]
+        self.dead_letter = db[dead_letter_collection_name]
+        self.visibility_timeout_s = visibility_timeout_s
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.completed_ttl_s = completed_ttl_s
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([
+            ("status", ASCENDING),
+            ("priority", DESCENDING),
+            ("available_at", ASCENDING)
+        ])
+        await self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        # completed_at은 완료된 태스크에만 있으므로 대기 중인 태스크는 만료되지 않음
+        await self.collection.create_index("completed_at", expireAfterSeconds=self.completed_ttl_s)
+        await self.dead_letter.create_index([("kind", ASCENDING), ("failed_at", DESCENDING)])
+
+    async def enqueue(self, kind: str, payload: Dict, idempotency_key: Optional[str] = None,
+                      priority: int = 0, delay_s: float = 0.0) -> Any:
+        """
+        태스크 등록
+
+        Returns:
+            태스크 ID (같은 idempotency_key가 이미 있으면 기존 태스크 ID)
+        """
+        now = datetime.now()
+        document = {
+            "_id": idempotency_key if idempotency_key is not None else ObjectId(),
+            "kind": kind,
+            "payload": payload,
+            "priority": priority,
+            "status": PENDING,
+            "attempts": 0,
+            "available_at": now + timedelta(seconds=delay_s),
+            "created_at": now,
+            "updated_at": now,
+        }
+        try:
+            await self.collection.insert_one(document)
+        except DuplicateKeyError:
+            logging.info(f"Benchmark task {idempotency_key} already queued, skipping duplicate")
+        return document["_id"]
+
+    async def lease(self, owner: str, kinds: Optional[Iterable[str]] = None) -> Optional[LeasedTask]:
+        """실행 가능한 태스크 하나를 owner 이름으로 lease (kinds가 주어지면 해당 종류만, 없으면 None)"""
+        while True:
+            now = datetime.now()
+            query = {"$or": [
+                {"status": PENDING, "available_at": {"$lte": now}},
+                {"status": LEASED, "lease_expires_at": {"$lte": now}},
+            ]}
+            if kinds is not None:
+                query["kind"] = {"$in": list(kinds)}
+            document = await self.collection.find_one_and_update(
+                query,
+                {
+                    "$set": {
+                        "status": LEASED,
+                        "lease_owner": owner,
+                        "lease_expires_at": now + timedelta(seconds=self.visibility_timeout_s),
+                        "updated_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("priority", DESCENDING), ("available_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if document is None:
+                return None
+            if document["attempts"] > self.max_attempts:
+                # 실행 도중 워커가 죽어 lease 만료만 반복된 태스크
+                await self._dead_letter(document, owner, "lease expired too many times")
+                continue
+            return LeasedTask(
+                task_id=document["_id"],
+                kind=document["kind"],
+                payload=document["payload"],
+                priority=document.get("priority", 0),
+                attempts=document["attempts"],
+            )
+
+    def _owned(self, task: LeasedTask, owner: str) -> Dict:
+        return {"_id": task.task_id, "status": LEASED, "lease_owner": owner}
+
+    async def heartbeat(self, task: LeasedTask, owner: str) -> bool:
+        """lease 연장 (False면 이미 lease를 잃어 다른 워커가 가져갔을 수 있음)"""
+        now = datetime.now()
+        result = await self.collection.update_one(
+            self._owned(task, owner),
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.visibility_timeout_s), "updated_at": now}}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, task: LeasedTask, owner: str) -> bool:
+        now = datetime.now()
+        result = await self.collection.update_one(
+            self._owned(task, owner),
+            {
+                "$set": {"status": DONE, "completed_at": now, "updated_at": now},
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            }
+        )
+        return result.modified_count == 1
+
+    async def release(self, task: LeasedTask, owner: str) -> bool:
+        """시작하지 않은 태스크를 시도 횟수 차감 후 즉시 반환 (종료 시 사용)"""
+        now = datetime.now()
+        result = await self.collection.update_one(
+            self._owned(task, owner),
+            {
+                "$set": {"status": PENDING, "available_at": now, "updated_at": now},
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+                "$inc": {"attempts": -1},
+            }
+        )
+        return result.modified_count == 1
+
+    async def cancel(self, task_ids: Iterable[Any]) -> int:
+        """대기/실행 중인 태스크 삭제 (실행 중이던 워커는 heartbeat/complete가 False를 받음, 삭제한 수 반환)"""
+        result = await self.collection.delete_many(
+            {"_id": {"$in": list(task_ids)}, "status": {"$in": [PENDING, LEASED]}}
+        )
+        return result.deleted_count
+
+    def _backoff_s(self, attempts: int) -> float:
+        delay = min(self.backoff_max_s, self.backoff_base_s * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def fail(self, task: LeasedTask, owner: str, error: str) -> bool:
+        """실패 기록: 재시도 횟수가 남았으면 백오프 후 재등록, 아니면 dead-letter로 이동"""
+        if task.attempts >= self.max_attempts:
+            document = await self.collection.find_one(self._owned(task, owner))
+            if document is None:
+                return False
+            await self._dead_letter(document, owner, error)
+            return True
+
+        now = datetime.now()
+        result = await self.collection.update_one(
+            self._owned(task, owner),
+            {
+                "$set": {
+                    "status": PENDING,
+                    "available_at": now + timedelta(seconds=self._backoff_s(task.attempts)),
+                    "last_error": error,
+                    "updated_at": now,
+                },
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            }
+        )
+        return result.modified_count == 1
+
+    async def _dead_letter(self, document: Dict, owner: str, error: str):
+        dead = {key: value for key, value in document.items() if key not in ("lease_owner", "lease_expires_at")}
+        dead.update({"status": "dead", "last_error": error, "failed_at": datetime.now()})
+        try:
+            await self.dead_letter.insert_one(dead)
+        except DuplicateKeyError:
+            # 같은 idempotency_key가 이전에도 dead-letter된 경우 최신 실패로 교체
+            await self.dead_letter.replace_one({"_id": dead["_id"]}, dead)
+        await self.collection.delete_one({"_id": document["_id"], "lease_owner": owner})
+        logging.error(f"Benchmark task {document['_id']} moved to dead letter after {document['attempts']} attempts: {error}")
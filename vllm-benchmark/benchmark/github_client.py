@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import aiohttp
+from pymongo.errors import PyMongoError
+
+# 전체 40자리 SHA는 내용이 바뀌지 않으므로 만료 없이 캐시
+FULL_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+
+class GitHubCommitClient:
+    """
+    커넥션 풀과 캐시를 공유하는 GitHub 커밋 조회 클라이언트
+
+    - (repo, 전체 SHA): 불변 데이터이므로 메모리 LRU + MongoDB 영구 캐시
+    - 브랜치/태그/축약 SHA 등 가변 ref: ref_ttl_s 동안 메모리 캐시, 만료 후에는 ETag 조건부 요청
+      (304 응답은 GitHub rate limit에 포함되지 않음)
+    """
+
+    def __init__(self, token: str, api_url: str = "https://api.github.com", cache_collection=None,
+                 max_cache_entries: int = 1024, ref_ttl_s: float = 60.0, max_concurrency: int = 8):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.cache_collection = cache_collection
+        self.max_cache_entries = max_cache_entries
+        self.ref_ttl_s = ref_ttl_s
+        self.max_concurrency = max_concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._commits: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        # 가변 ref: (repo, ref) -> (만료 시각, ETag, 응답), 커밋 캐시와 같은 크기 상한의 LRU
+        self._refs: "OrderedDict[Tuple[str, str], Tuple[float, Optional[str], Dict]]" = OrderedDict()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                headers={
+                    "Authorization": f"token {self.token}",
+                    "Accept": "application/vnd.github.v3+json"
+                },
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _remember(self, key: Tuple[str, str], commit: Dict):
+        self._commits[key] = commit
+        self._commits.move_to_end(key)
+        while len(self._commits) > self.max_cache_entries:
+            self._commits.popitem(last=False)
+
+    def _remember_ref(self, key: Tuple[str, str], entry: Tuple[float, Optional[str], Dict]):
+        self._refs[key] = entry
+        self._refs.move_to_end(key)
+        while len(self._refs) > self.max_cache_entries:
+            self._refs.popitem(last=False)
+
+    async def _load_persisted(self, key: Tuple[str, str]) -> Optional[Dict]:
+        if self.cache_collection is None:
+            return None
+        try:
+            document = await self.cache_collection.find_one({"_id": f"{key[0]}@{key[1]}"})
+        except PyMongoError as e:
+            # 캐시 조회 실패는 GitHub API 조회로 대체
+            logging.warning(f"Failed to load GitHub commit cache for {key[0]}@{key[1]}: {e}")
+            return None
+        return document["commit"] if document else None
+
+    async def _persist(self, key: Tuple[str, str], commit: Dict):
+        if self.cache_collection is None:
+            return
+        try:
+            await self.cache_collection.replace_one(
+                {"_id": f"{key[0]}@{key[1]}"},
+                {"commit": commit},
+                upsert=True
+            )
+        except PyMongoError as e:
+            logging.warning(f"Failed to persist GitHub commit cache for {key[0]}@{key[1]}: {e}")
+
+    async def _fetch(self, repo: str, ref: str, etag: Optional[str] = None) -> Tuple[int, Optional[str], Optional[Dict]]:
+        session = await self._get_session()
+        headers = {"If-None-Match": etag} if etag else {}
+        url = f"{self.api_url}/repos/{repo}/commits/{ref}"
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                return 304, etag, None
+            if response.status == 200:
+                return 200, response.headers.get("ETag"), await response.json()
+            raise Exception(f"GitHub API error: {response.status}")
+
+    async def get_commit(self, repo: str, ref: str) -> Dict:
+        """커밋 정보 조회 (캐시 우선)"""
+        key = (repo, ref)
+        if FULL_SHA_PATTERN.match(ref):
+            commit = self._commits.get(key)
+            if commit is not None:
+                self._commits.move_to_end(key)
+                return commit
+            commit = await self._load_persisted(key)
+            if commit is None:
+                _, _, commit = await self._fetch(repo, ref)
+                await self._persist(key, commit)
+            self._remember(key, commit)
+            return commit
+
+        cached = self._refs.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            self._refs.move_to_end(key)
+            return cached[2]
+
+        status, etag, commit = await self._fetch(repo, ref, cached[1] if cached else None)
+        if status == 304:
+            commit = cached[2]
+        else:
+            # ref가 가리키는 커밋 자체는 불변이므로 전체 SHA 키로도 캐시
+            sha = commit.get("sha")
+            if sha:
+                self._remember((repo, sha), commit)
+                await self._persist((repo, sha), commit)
+        self._remember_ref(key, (now + self.ref_ttl_s, etag, commit))
+        return commit
+
+    async def get_commits(self, repo: str, refs: Iterable[str]) -> Dict[str, Dict]:
+        """여러 커밋을 동시성 제한 하에 조회 (중복 제거, 실패한 항목은 결과에서 제외)"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        unique_refs = list(dict.fromkeys(refs))
+
+        async def fetch_one(ref: str):
+            async with semaphore:
+                return await self.get_commit(repo, ref)
+
+        responses = await asyncio.gather(*(fetch_one(ref) for ref in unique_refs), return_exceptions=True)
+        commits = {}
+        for ref, response in zip(unique_refs, responses):
+            if isinstance(response, Exception):
+                logging.warning(f"GitHub commit lookup failed for {repo}@{ref}: {response}")
+            else:
+                commits[ref] = response
+        return commits
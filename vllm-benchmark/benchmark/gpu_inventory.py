@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
+
+GPU_RESOURCE = "nvidia.com/gpu"
+# NVIDIA GPU Feature Discovery가 붙이는 GPU 모델 라벨
+GPU_PRODUCT_LABEL = "nvidia.com/gpu.product"
+TERMINAL_POD_PHASES = ("Succeeded", "Failed")
+ACTIVE_POD_SELECTOR = "status.phase!=Succeeded,status.phase!=Failed"
+
+
+@dataclass
+class NodeGpuInfo:
+    total_gpus: int
+    allocatable_gpus: int
+    gpu_type: str
+    schedulable: bool
+
+
+def _quantity(resources: Optional[Dict], name: str) -> int:
+    if not resources or name not in resources:
+        return 0
+    return int(resources[name])
+
+
+def pod_gpu_request(pod) -> int:
+    """파드가 점유하는 GPU 수 (컨테이너 합과 init 컨테이너 최댓값 중 큰 값)"""
+    def request(container) -> int:
+        resources = container.resources
+        if resources is None:
+            return 0
+        # 확장 리소스는 requests == limits, requests가 생략되면 limits 사용
+        return _quantity(resources.requests, GPU_RESOURCE) or _quantity(resources.limits, GPU_RESOURCE)
+
+    containers = sum(request(c) for c in pod.spec.containers or [])
+    init_containers = max((request(c) for c in pod.spec.init_containers or []), default=0)
+    return max(containers, init_containers)
+
+
+class GpuInventory:
+    """
+    Kubernetes 노드/파드 informer 방식 GPU 인벤토리 캐시
+
+    시작 시 노드와 파드를 한 번씩 list한 뒤, 백그라운드 스레드에서 각각 watch 이벤트로
+    메모리 상태를 갱신한다. 클러스터 전체/GPU 종류별 합계는 이벤트마다 증분 갱신되므로
+    조회는 API 서버 호출 없이 O(1)이다. watch가 만료(410 Gone)되면 다시 list부터 시작한다.
+    """
+
+    def __init__(self, api: Optional[client.CoreV1Api] = None, watch_timeout_s: int = 300):
+        self._api = api
+        self.watch_timeout_s = watch_timeout_s
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._synced = threading.Event()
+
+        self._nodes: Dict[str, NodeGpuInfo] = {}
+        self._pods: Dict[str, tuple] = {}  # uid -> (node_name, gpus)
+        self._used_by_node: Dict[str, int] = {}
+        self._total_gpus = 0
+        self._allocatable_gpus = 0
+        self._used_gpus = 0
+        self._by_type: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def api(self) -> client.CoreV1Api:
+        if self._api is None:
+            try:
+                config.load_incluster_config()
+            except config.ConfigException:
+                config.load_kube_config()
+            self._api = client.CoreV1Api()
+        return self._api
+
+    # ---- 상태 갱신 (lock 보유 상태에서 호출) ----
+
+    def _type_totals(self, gpu_type: str) -> Dict[str, int]:
+        return self._by_type.setdefault(gpu_type, {"total_gpus": 0, "allocatable_gpus": 0, "used_gpus": 0})
+
+    def _remove_node(self, name: str):
+        info = self._nodes.pop(name, None)
+        if info is None:
+            return
+        used = self._used_by_node.get(name, 0)
+        self._total_gpus -= info.total_gpus
+        self._allocatable_gpus -= info.allocatable_gpus
+        self._used_gpus -= used
+        totals = self._type_totals(info.gpu_type)
+        totals["total_gpus"] -= info.total_gpus
+        totals["allocatable_gpus"] -= info.allocatable_gpus
+        totals["used_gpus"] -= used
+
+    def _apply_node(self, event_type: str, node):
+        name = node.metadata.name
+        self._remove_node(name)
+        if event_type == "DELETED":
+            return
+        capacity = _quantity(node.status.capacity, GPU_RESOURCE)
+        if not capacity:
+            return
+        info = NodeGpuInfo(
+            total_gpus=capacity,
+            allocatable_gpus=_quantity(node.status.allocatable, GPU_RESOURCE),
+            gpu_type=(node.metadata.labels or {}).get(GPU_PRODUCT_LABEL, "unknown"),
+            schedulable=not node.spec.unschedulable,
+        )
+        used = self._used_by_node.get(name, 0)
+        self._nodes[name] = info
+        self._total_gpus += info.total_gpus
+        self._allocatable_gpus += info.allocatable_gpus
+        self._used_gpus += used
+        totals = self._type_totals(info.gpu_type)
+        totals["total_gpus"] += info.total_gpus
+        totals["allocatable_gpus"] += info.allocatable_gpus
+        totals["used_gpus"] += used
+
+    def _add_usage(self, node_name: str, gpus: int):
+        self._used_by_node[node_name] = self._used_by_node.get(node_name, 0) + gpus
+        info = self._nodes.get(node_name)
+        if info is not None:
+            # 합계는 GPU 노드로 알려진 노드의 사용량만 반영 (노드 추가/삭제 시 함께 보정)
+            self._used_gpus += gpus
+            self._type_totals(info.gpu_type)["used_gpus"] += gpus
+
+    def _apply_pod(self, event_type: str, pod):
+        uid = pod.metadata.uid
+        previous = self._pods.pop(uid, None)
+        if previous is not None:
+            self._add_usage(previous[0], -previous[1])
+        if event_type == "DELETED" or pod.status.phase in TERMINAL_POD_PHASES or not pod.spec.node_name:
+            return
+        gpus = pod_gpu_request(pod)
+        if gpus:
+            self._pods[uid] = (pod.spec.node_name, gpus)
+            self._add_usage(pod.spec.node_name, gpus)
+
+    def _reset_nodes(self, items):
+        for name in list(self._nodes):
+            self._remove_node(name)
+        for node in items:
+            self._apply_node("ADDED", node)
+
+    def _reset_pods(self, items):
+        for uid, (node_name, gpus) in list(self._pods.items()):
+            self._add_usage(node_name, -gpus)
+        self._pods.clear()
+        for pod in items:
+            self._apply_pod("ADDED", pod)
+
+    # ---- informer 루프 ----
+
+    def _list(self, list_func: Callable, list_kwargs: Dict, reset: Callable) -> str:
+        result = list_func(**list_kwargs)
+        with self._lock:
+            reset(result.items)
+        return result.metadata.resource_version
+
+    def _informer(self, list_func: Callable, list_kwargs: Dict, reset: Callable, apply: Callable,
+                  resource_version: Optional[str]):
+        while not self._stop.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list(list_func, list_kwargs, reset)
+                # list_func는 watch가 응답 타입을 알 수 있도록 클라이언트 메서드를 그대로 전달해야 함
+                stream = watch.Watch().stream(
+                    list_func,
+                    resource_version=resource_version,
+                    timeout_seconds=self.watch_timeout_s,
+                    allow_watch_bookmarks=True,
+                    **list_kwargs,
+                )
+                for event in stream:
+                    if self._stop.is_set():
+                        return
+                    if event["type"] == "ERROR":
+                        resource_version = None
+                        break
+                    obj = event["object"]
+                    if event["type"] != "BOOKMARK":
+                        with self._lock:
+                            apply(event["type"], obj)
+                    resource_version = obj.metadata.resource_version
+            except ApiException as e:
+                if e.status == 410:
+                    resource_version = None  # watch 만료: 다시 list
+                    continue
+                logging.error(f"GPU inventory watch failed: {e}")
+                time.sleep(1.0)
+            except Exception as e:
+                logging.error(f"GPU inventory watch failed: {e}")
+                time.sleep(1.0)
+
+    def start(self):
+        """최초 list 후 watch 스레드 시작 (블로킹 호출이므로 이벤트 루프에서는 스레드로 실행)"""
+        if self._threads:
+            return
+        api = self.api
+        informers = (
+            ("gpu-inventory-nodes", api.list_node, {}, self._reset_nodes, self._apply_node),
+            ("gpu-inventory-pods", api.list_pod_for_all_namespaces,
+             {"field_selector": ACTIVE_POD_SELECTOR}, self._reset_pods, self._apply_pod),
+        )
+        versions = [self._list(list_func, list_kwargs, reset) for _, list_func, list_kwargs, reset, _ in informers]
+        self._synced.set()
+
+        for (name, list_func, list_kwargs, reset, apply), version in zip(informers, versions):
+            thread = threading.Thread(
+                target=self._informer,
+                args=(list_func, list_kwargs, reset, apply, version),
+                name=name,
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """watch 스레드 종료 요청 (현재 watch 요청이 끝나면 종료)"""
+        self._stop.set()
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    # ---- 조회 (모두 메모리에서 응답) ----
+
+    def total_gpus(self) -> int:
+        return self._total_gpus
+
+    def allocatable_gpus(self) -> int:
+        return self._allocatable_gpus
+
+    def free_gpus(self) -> int:
+        return self._allocatable_gpus - self._used_gpus
+
+    def node_free_gpus(self, node_name: str) -> int:
+        with self._lock:
+            info = self._nodes.get(node_name)
+            if info is None or not info.schedulable:
+                return 0
+            return max(0, info.allocatable_gpus - self._used_by_node.get(node_name, 0))
+
+    def gpu_types(self) -> Dict[str, Dict[str, int]]:
+        """GPU 종류별 total/allocatable/used/free"""
+        with self._lock:
+            return {
+                gpu_type: {**totals, "free_gpus": totals["allocatable_gpus"] - totals["used_gpus"]}
+                for gpu_type, totals in self._by_type.items()
+                if totals["total_gpus"]
+            }
+
+    def nodes(self) -> Dict[str, Dict]:
+        """노드별 GPU 현황"""
+        with self._lock:
+            return {
+                name: {
+                    "total_gpus": info.total_gpus,
+                    "allocatable_gpus": info.allocatable_gpus,
+                    "free_gpus": max(0, info.allocatable_gpus - self._used_by_node.get(name, 0))
+                    if info.schedulable else 0,
+                    "gpu_type": info.gpu_type,
+                    "schedulable": info.schedulable,
+                }
+                for name, info in self._nodes.items()
+            }
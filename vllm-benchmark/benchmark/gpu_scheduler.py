@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ScheduledTask:
+    model_name: str
+    payload: Any
+    gpus: int
+    priority: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    seq: int = 0
+
+
+@dataclass
+class GpuReservation:
+    """
+    스케줄러가 태스크 시작 전에 확보한 노드 GPU
+
+    스케줄러 내부 장부일 뿐 Kubernetes에 파드를 배치하지는 않는다. 실제로 그 노드에서 측정하려면
+    BenchmarkQueue의 prepare_reservation 훅이 node_name의 서버 base URL을 돌려줘야 한다.
+    """
+    model_name: str
+    node_name: str
+    gpu_type: str
+    gpus: int
+
+
+class GpuScheduler:
+    """
+    GPU 요구량을 고려하는 벤치마크 태스크 스케줄러
+
+    - 태스크는 GPU를 예약한 뒤에만 시작된다 (노드 free GPU - 이미 예약한 GPU >= 요구량)
+    - 높은 priority가 먼저, 같은 priority에서는 현재 예약 GPU가 적은 모델이 먼저 (모델 간 공정성)
+    - 노드 선택은 best-fit(남는 GPU가 가장 적은 노드)으로 큰 모델을 위한 빈 노드를 남긴다
+    - 앞선 태스크가 자리가 없으면 뒤의 작은 태스크를 먼저 채우되(backfill),
+      starvation_timeout_s 이상 기다린 태스크가 있으면 그 뒤로는 backfill하지 않는다
+    - 어떤 노드로도 요구량을 채울 수 없는 태스크는 대기열에서 빼고 on_reject로 알린다
+    """
+
+    def __init__(self, free_gpus_provider: Callable[[], Awaitable[Dict[str, Dict]]],
+                 model_gpu_requirements: Optional[Dict[str, int]] = None,
+                 model_gpu_types: Optional[Dict[str, str]] = None,
+                 default_gpus: int = 1, starvation_timeout_s: float = 600.0,
+                 refresh_interval_s: float = 5.0,
+                 on_reject: Optional[Callable[[ScheduledTask, str], Awaitable[None]]] = None):
+        """
+        Args:
+            free_gpus_provider: 노드별 {"free_gpus", "allocatable_gpus", "gpu_type", ...}를 반환하는 함수
+                (PerformanceTracker.get_kubernetes_gpu_resources)
+            model_gpu_requirements: 모델별 필요 GPU 수
+            model_gpu_types: 모델별 필요 GPU 종류 (없으면 종류 무관)
+            on_reject: 배치할 수 없어 버린 태스크와 사유를 받는 함수 (영속 큐 실패 처리 등)
+        """
+        self.free_gpus_provider = free_gpus_provider
+        self.model_gpu_requirements = model_gpu_requirements or {}
+        self.model_gpu_types = model_gpu_types or {}
+        self.default_gpus = default_gpus
+        self.starvation_timeout_s = starvation_timeout_s
+        self.refresh_interval_s = refresh_interval_s
+        self.on_reject = on_reject
+
+        self._pending: Dict[str, Deque[ScheduledTask]] = {}
+        self._reserved_by_node: Dict[str, int] = {}
+        self._reserved_by_model: Dict[str, int] = {}
+        self._running = 0
+        self._rejected: List[Tuple[ScheduledTask, str]] = []
+        self._seq = itertools.count()
+        self._condition = asyncio.Condition()
+
+    def gpus_for(self, model_name: str) -> int:
+        return self.model_gpu_requirements.get(model_name, self.default_gpus)
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(tasks) for tasks in self._pending.values())
+
+    @property
+    def running_count(self) -> int:
+        return self._running
+
+    async def submit(self, model_name: str, payload: Any, priority: int = 0):
+        """태스크 등록"""
+        task = ScheduledTask(
+            model_name=model_name,
+            payload=payload,
+            gpus=self.gpus_for(model_name),
+            priority=priority,
+            seq=next(self._seq),
+        )
+        async with self._condition:
+            self._pending.setdefault(model_name, deque()).append(task)
+            self._condition.notify_all()
+
+    def _ordered_heads(self) -> List[ScheduledTask]:
+        heads = [tasks[0] for tasks in self._pending.values() if tasks]
+        return sorted(heads, key=lambda t: (-t.priority, self._reserved_by_model.get(t.model_name, 0), t.seq))
+
+    def _best_fit(self, task: ScheduledTask, nodes: Dict[str, Dict]) -> Optional[Tuple[str, Dict]]:
+        required_type = self.model_gpu_types.get(task.model_name)
+        best = None
+        for name, node in nodes.items():
+            if required_type and node.get("gpu_type") != required_type:
+                continue
+            available = node.get("free_gpus", 0) - self._reserved_by_node.get(name, 0)
+            if available >= task.gpus and (best is None or available < best[0]):
+                best = (available, name, node)
+        return (best[1], best[2]) if best else None
+
+    def _fits_anywhere(self, task: ScheduledTask, nodes: Dict[str, Dict]) -> bool:
+        required_type = self.model_gpu_types.get(task.model_name)
+        return any(
+            node.get("allocatable_gpus", 0) >= task.gpus
+            for node in nodes.values()
+            if not required_type or node.get("gpu_type") == required_type
+        )
+
+    def _reject_unplaceable(self, nodes: Dict[str, Dict]) -> bool:
+        """어떤 노드로도 요구량을 채울 수 없는 대기 태스크를 빼서 알림 대상으로 모음 (노드 정보가 없으면 보류)"""
+        if not nodes:
+            return False
+        for tasks in self._pending.values():
+            for task in [task for task in tasks if not self._fits_anywhere(task, nodes)]:
+                tasks.remove(task)
+                reason = f"no node can provide {task.gpus} GPUs"
+                logging.error(f"Dropping benchmark task for {task.model_name}: {reason}")
+                self._rejected.append((task, reason))
+        return bool(self._rejected)
+
+    def _pick(self, nodes: Dict[str, Dict]) -> Optional[Tuple[ScheduledTask, GpuReservation]]:
+        now = time.monotonic()
+        for task in self._ordered_heads():
+            placement = self._best_fit(task, nodes)
+            if placement is not None:
+                node_name, node = placement
+                self._pending[task.model_name].popleft()
+                reservation = GpuReservation(
+                    model_name=task.model_name,
+                    node_name=node_name,
+                    gpu_type=node.get("gpu_type", "unknown"),
+                    gpus=task.gpus,
+                )
+                self._reserved_by_node[node_name] = self._reserved_by_node.get(node_name, 0) + task.gpus
+                self._reserved_by_model[task.model_name] = self._reserved_by_model.get(task.model_name, 0) + task.gpus
+                self._running += 1
+                return task, reservation
+
+            if now - task.enqueued_at >= self.starvation_timeout_s:
+                break  # 오래 기다린 큰 태스크를 위해 뒤의 태스크는 채우지 않음
+        return None
+
+    async def _wait_for_pick(self) -> Optional[Tuple[ScheduledTask, GpuReservation]]:
+        """락 보유 상태에서 예약할 태스크를 기다림 (배치 불가 태스크가 생기면 예약 없이 None 반환)"""
+        while True:
+            if self.pending_count:
+                nodes = await self.free_gpus_provider()
+                if self._reject_unplaceable(nodes):
+                    return None
+                picked = self._pick(nodes)
+                if picked is not None:
+                    return picked
+            try:
+                # 외부 파드 종료 등 클러스터 쪽 변화도 반영하도록 주기적으로 재평가
+                await asyncio.wait_for(self._condition.wait(), timeout=self.refresh_interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+    async def acquire(self) -> Tuple[ScheduledTask, GpuReservation]:
+        """
+        GPU가 예약된 다음 태스크를 반환할 때까지 대기
+
+        예약은 마지막 대기 지점 이후에만 일어나고 on_reject 알림은 예약 전에 락 밖에서 보내므로,
+        어느 시점에 취소돼도 예약이 남지 않는다.
+        """
+        while True:
+            async with self._condition:
+                picked = await self._wait_for_pick()
+            if picked is not None:
+                return picked
+            # 취소돼도 이미 대기열에서 뺀 태스크의 알림은 끝까지 보냄
+            await asyncio.shield(self._notify_rejected())
+
+    async def _notify_rejected(self):
+        rejected, self._rejected = self._rejected, []
+        if self.on_reject is None:
+            return
+        for task, reason in rejected:
+            try:
+                await self.on_reject(task, reason)
+            except Exception as e:
+                logging.error(f"Reject callback failed for {task.model_name}: {e}")
+
+    async def release(self, reservation: GpuReservation):
+        """태스크 종료 후 예약 반환"""
+        async with self._condition:
+            self._reserved_by_node[reservation.node_name] -= reservation.gpus
+            self._reserved_by_model[reservation.model_name] -= reservation.gpus
+            self._running -= 1
+            self._condition.notify_all()
+
+    async def wait_idle(self):
+        """대기/실행 중인 태스크가 모두 끝날 때까지 대기"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self.pending_count and not self._running)
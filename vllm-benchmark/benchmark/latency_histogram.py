@@ -0,0 +1,154 @@
+"""
+HDR 히스토그램 방식의 병합 가능한 지연 분포
+
+값은 마이크로초 정수로 기록하며, 2의 거듭제곱 구간마다 2^(precision_bits-1)개의 하위 버킷을 둔다.
+precision_bits=8이면 상대 오차 0.4% 이내로 모든 분위수를 고정 메모리로 계산할 수 있고,
+같은 precision_bits끼리는 버킷 카운트를 더하는 것만으로 워커/실행 간 병합이 된다.
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+def percentile_key(percentile: float) -> str:
+    """MongoDB 필드명으로 쓸 수 있는 분위수 키 (99.9 -> 'p99_9')"""
+    return "p" + f"{percentile:g}".replace(".", "_")
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varints(data: bytes) -> Iterable[int]:
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+class LatencyHistogram:
+    """밀리초 지연을 기록하는 로그-선형 버킷 히스토그램"""
+
+    def __init__(self, precision_bits: int = 8):
+        self.precision_bits = precision_bits
+        self._sub_bucket_count = 1 << precision_bits
+        self._half_count = self._sub_bucket_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    def _index_for(self, value_us: int) -> int:
+        if value_us < self._sub_bucket_count:
+            return value_us
+        shift = value_us.bit_length() - self.precision_bits
+        top = value_us >> shift
+        return self._sub_bucket_count + (shift - 1) * self._half_count + (top - self._half_count)
+
+    def _value_for(self, index: int) -> float:
+        """버킷의 대표값(구간 중앙, 마이크로초)"""
+        if index < self._sub_bucket_count:
+            return float(index)
+        offset = index - self._sub_bucket_count
+        shift = offset // self._half_count + 1
+        top = offset % self._half_count + self._half_count
+        return ((top << shift) + (1 << (shift - 1))) - 0.5
+
+    def record(self, value_ms: float, count: int = 1):
+        """지연값(ms) 기록"""
+        value_us = max(0, int(round(value_ms * 1000)))
+        index = self._index_for(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.sum_us += value_us * count
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """다른 히스토그램의 카운트를 합산 (in-place, self 반환)"""
+        if other.precision_bits != self.precision_bits:
+            raise ValueError(
+                f"Cannot merge histograms with precision_bits {self.precision_bits} and {other.precision_bits}"
+            )
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        if other.max_us is not None:
+            self.max_us = other.max_us if self.max_us is None else max(self.max_us, other.max_us)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.total_count
+
+    @property
+    def mean_ms(self) -> float:
+        return self.sum_us / self.total_count / 1000 if self.total_count else 0.0
+
+    @property
+    def min_ms(self) -> float:
+        return self.min_us / 1000 if self.min_us is not None else 0.0
+
+    @property
+    def max_ms(self) -> float:
+        return self.max_us / 1000 if self.max_us is not None else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """분위수(0~100)에 해당하는 지연(ms)"""
+        if not self.total_count:
+            return 0.0
+        rank = max(1, math.ceil(percentile / 100 * self.total_count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value_us = min(max(self._value_for(index), self.min_us), self.max_us)
+                return value_us / 1000
+        return self.max_ms
+
+    def percentiles(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """{'p50': ..., 'p99_9': ...} 형태의 분위수 요약"""
+        return {percentile_key(p): self.percentile(p) for p in percentiles}
+
+    def to_document(self) -> Dict:
+        """MongoDB 저장용 압축 표현 (인덱스 델타 + 카운트를 varint 바이트열로 인코딩)"""
+        encoded = bytearray()
+        previous = 0
+        for index in sorted(self.counts):
+            _encode_varint(index - previous, encoded)
+            _encode_varint(self.counts[index], encoded)
+            previous = index
+        return {
+            "precision_bits": self.precision_bits,
+            "count": self.total_count,
+            "sum_us": self.sum_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "buckets": bytes(encoded),
+        }
+
+    @classmethod
+    def from_document(cls, document: Dict) -> "LatencyHistogram":
+        histogram = cls(precision_bits=document["precision_bits"])
+        values = iter(_decode_varints(document["buckets"]))
+        index = 0
+        for delta, count in zip(values, values):
+            index += delta
+            histogram.counts[index] = count
+        histogram.total_count = document["count"]
+        histogram.sum_us = document["sum_us"]
+        histogram.min_us = document["min_us"]
+        histogram.max_us = document["max_us"]
+        return histogram
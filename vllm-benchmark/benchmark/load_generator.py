@@ -0,0 +1,441 @@
+import asyncio
+import json
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Union
+import logging
+
+import aiohttp
+
+from benchmark.latency_histogram import LatencyHistogram
+
+
+@dataclass
+class LoadGeneratorConfig:
+    """부하 생성기 설정
+
+    request_rate가 None이면 closed-loop(동시성 수만큼 클라이언트가 응답을 받는 즉시 다음 요청),
+    값이 있으면 해당 초당 요청 수의 Poisson 도착 과정을 따르는 open-loop로 동작한다.
+    open-loop에서도 concurrency는 동시 진행 요청 수의 상한으로 사용되지만, 상한 때문에 늦게 보낸 요청도
+    지연은 예정 도착 시각부터 측정하고 대기 시간은 queue_delay로 따로 기록한다 (coordinated omission 방지).
+
+    처음 warmup_requests개 요청/warmup_s초는 측정하지 않으며 그 사이에 보낸 요청도 제외한다 (CUDA graph 캡처, KV 캐시 할당 등).
+    steady_state_window_s가 있으면 측정 구간을 해당 길이의 윈도우로 나눠 최근 steady_state_windows개의
+    윈도우 처리량 변동계수(CV)가 steady_state_cv 미만이 되는 즉시 종료하고, 그 안정 구간만 결과로 사용한다.
+    """
+    base_url: str = "http://localhost:8000"
+    concurrency: int = 16
+    request_rate: Optional[float] = None
+    max_tokens: int = 128
+    temperature: float = 0.0
+    request_timeout_s: float = 300.0
+    api_key: Optional[str] = None
+    seed: Optional[int] = None
+    warmup_requests: int = 0
+    warmup_s: float = 0.0
+    steady_state_window_s: Optional[float] = None
+    steady_state_windows: int = 5
+    steady_state_cv: float = 0.05
+
+    def __post_init__(self):
+        # 변동계수는 표본 표준편차(n-1)로 계산하므로 윈도우가 최소 2개 필요
+        if self.steady_state_windows < 2:
+            raise ValueError(f"steady_state_windows must be at least 2, got {self.steady_state_windows}")
+
+
+@dataclass
+class RequestMetrics:
+    """단일 스트리밍 요청의 측정값"""
+    success: bool
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    ttft_ms: float = 0.0
+    e2e_latency_ms: float = 0.0
+    inter_token_latencies_ms: List[float] = field(default_factory=list)
+    queue_delay_ms: float = 0.0  # open-loop: 예정 도착 시각부터 실제 전송까지 클라이언트 측 대기
+    error: Optional[str] = None
+    # 지연 측정 기준 시각 (time.perf_counter, open-loop는 예정 도착 시각): 측정 구간 시작 전에 보낸 요청 판별용
+    started_at: float = 0.0
+
+
+@dataclass
+class LoadTestReport:
+    """한 번의 부하 테스트 집계 결과
+
+    요청별 원시 샘플은 보관하지 않고 병합 가능한 히스토그램에 바로 기록한다.
+    """
+    duration_s: float = 0.0
+    num_requests: int = 0
+    failed_requests: int = 0
+    total_output_tokens: int = 0
+    total_prompt_tokens: int = 0
+    e2e_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ttft: LatencyHistogram = field(default_factory=LatencyHistogram)
+    inter_token_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queue_delay: LatencyHistogram = field(default_factory=LatencyHistogram)
+    warmup_requests: int = 0
+    steady_state_reached: bool = False
+
+    def add(self, metrics: RequestMetrics):
+        self.num_requests += 1
+        if not metrics.success:
+            self.failed_requests += 1
+            return
+        self.total_output_tokens += metrics.output_tokens
+        self.total_prompt_tokens += metrics.prompt_tokens
+        self.e2e_latency.record(metrics.e2e_latency_ms)
+        self.ttft.record(metrics.ttft_ms)
+        self.queue_delay.record(metrics.queue_delay_ms)
+        for itl in metrics.inter_token_latencies_ms:
+            self.inter_token_latency.record(itl)
+
+    def merge(self, other: "LoadTestReport") -> "LoadTestReport":
+        """다른 워커/실행의 결과를 합산 (duration은 더 긴 쪽 기준, 안정 상태는 모두 도달해야 True)"""
+        if self.num_requests or self.warmup_requests:
+            self.steady_state_reached = self.steady_state_reached and other.steady_state_reached
+        else:
+            self.steady_state_reached = other.steady_state_reached
+        self.warmup_requests += other.warmup_requests
+        self.duration_s = max(self.duration_s, other.duration_s)
+        self.num_requests += other.num_requests
+        self.failed_requests += other.failed_requests
+        self.total_output_tokens += other.total_output_tokens
+        self.total_prompt_tokens += other.total_prompt_tokens
+        self.e2e_latency.merge(other.e2e_latency)
+        self.ttft.merge(other.ttft)
+        self.inter_token_latency.merge(other.inter_token_latency)
+        self.queue_delay.merge(other.queue_delay)
+        return self
+
+    def to_document(self) -> Dict:
+        """워커 간 전달/저장용 직렬화"""
+        return {
+            "duration_s": self.duration_s,
+            "num_requests": self.num_requests,
+            "failed_requests": self.failed_requests,
+            "total_output_tokens": self.total_output_tokens,
+            "total_prompt_tokens": self.total_prompt_tokens,
+            "e2e_latency": self.e2e_latency.to_document(),
+            "ttft": self.ttft.to_document(),
+            "inter_token_latency": self.inter_token_latency.to_document(),
+            "queue_delay": self.queue_delay.to_document(),
+            "warmup_requests": self.warmup_requests,
+            "steady_state_reached": self.steady_state_reached,
+        }
+
+    @classmethod
+    def from_document(cls, document: Dict) -> "LoadTestReport":
+        return cls(
+            duration_s=document["duration_s"],
+            num_requests=document["num_requests"],
+            failed_requests=document["failed_requests"],
+            total_output_tokens=document["total_output_tokens"],
+            total_prompt_tokens=document["total_prompt_tokens"],
+            e2e_latency=LatencyHistogram.from_document(document["e2e_latency"]),
+            ttft=LatencyHistogram.from_document(document["ttft"]),
+            inter_token_latency=LatencyHistogram.from_document(document["inter_token_latency"]),
+            queue_delay=LatencyHistogram.from_document(document["queue_delay"])
+            if "queue_delay" in document else LatencyHistogram(),
+            warmup_requests=document.get("warmup_requests", 0),
+            steady_state_reached=document.get("steady_state_reached", False),
+        )
+
+    @property
+    def completed_requests(self) -> int:
+        return self.num_requests - self.failed_requests
+
+    @property
+    def throughput_tokens_per_sec(self) -> float:
+        if self.duration_s <= 0:
+            return 0.0
+        return self.total_output_tokens / self.duration_s
+
+
+PromptSource = Union[Iterable[str], AsyncIterable[str]]
+
+
+class _MeasurementWindow:
+    """
+    워밍업 제외와 안정 상태 판정을 담당하는 측정기
+
+    측정 구간은 워밍업이 끝난 시각(워밍업이 없으면 실행 시작 시각)부터이며, 그 이후에 보낸 요청만 집계한다.
+    워밍업 중에 보내 측정 구간에 끝난 요청까지 넣으면 구간 길이에 비해 토큰이 많아져 처리량이 부풀려진다.
+    요청은 완료 시각 기준으로 윈도우에 배정되며, 윈도우별 LoadTestReport를 최근 N개만 보관하므로
+    안정 상태에 도달하면 그 N개 윈도우만 병합해 결과로 사용한다.
+    """
+
+    def __init__(self, config: LoadGeneratorConfig, start: float):
+        self.config = config
+        self.warmup_end = start + config.warmup_s
+        self.warmup_requests = 0
+        self.measure_start: Optional[float] = None
+        self.total = LoadTestReport()
+        self.windows: Deque[LoadTestReport] = deque(maxlen=config.steady_state_windows)
+        self.current = LoadTestReport()
+        self.current_start = 0.0
+        self.converged = asyncio.Event()
+        if not config.warmup_requests:
+            self._start_measurement(self.warmup_end)
+
+    def _start_measurement(self, at: float):
+        self.measure_start = at
+        self.current_start = at
+
+    def _roll_windows(self, now: float):
+        window_s = self.config.steady_state_window_s
+        while now >= self.current_start + window_s:
+            self.current.duration_s = window_s
+            self.windows.append(self.current)
+            self.current = LoadTestReport()
+            self.current_start += window_s
+            if len(self.windows) == self.windows.maxlen and self._coefficient_of_variation() < self.config.steady_state_cv:
+                self.converged.set()
+                return
+
+    def _coefficient_of_variation(self) -> float:
+        values = [window.total_output_tokens for window in self.windows]
+        mean = sum(values) / len(values)
+        if mean <= 0:
+            return float("inf")
+        variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+        return math.sqrt(variance) / mean
+
+    def add(self, metrics: RequestMetrics):
+        if self.converged.is_set():
+            return  # 안정 구간 종료 후 끝난 요청은 제외
+        now = time.perf_counter()
+        if self.measure_start is None:
+            # 요청 수 기준 워밍업: N번째 완료 시각과 warmup_s 중 늦은 쪽에서 측정 시작
+            self.warmup_requests += 1
+            if self.warmup_requests >= self.config.warmup_requests:
+                self._start_measurement(max(now, self.warmup_end))
+            return
+        if metrics.started_at < self.measure_start:
+            self.warmup_requests += 1
+            return
+        self.total.add(metrics)
+        if self.config.steady_state_window_s:
+            self._roll_windows(now)
+            if not self.converged.is_set():
+                self.current.add(metrics)
+
+    def report(self) -> LoadTestReport:
+        if self.converged.is_set():
+            report = LoadTestReport()
+            for window in self.windows:
+                report.merge(window)
+            report.duration_s = self.config.steady_state_window_s * len(self.windows)
+            report.steady_state_reached = True
+        else:
+            report = self.total
+            report.duration_s = 0.0
+            if self.measure_start is not None:
+                report.duration_s = max(0.0, time.perf_counter() - self.measure_start)
+        report.warmup_requests = self.warmup_requests
+        return report
+
+
+async def _iterate(prompts: Iterable[str]) -> AsyncIterator[str]:
+    for prompt in prompts:
+        yield prompt
+
+
+def _as_async_iterator(prompts: PromptSource) -> AsyncIterator[str]:
+    if hasattr(prompts, "__aiter__"):
+        return prompts.__aiter__()
+    return _iterate(prompts)
+
+
+class LoadGenerator:
+    """OpenAI 호환 vLLM 엔드포인트(/v1/completions)에 스트리밍 요청을 보내는 비동기 부하 생성기"""
+
+    def __init__(self, config: LoadGeneratorConfig):
+        self.config = config
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """동시성 수에 맞춘 커넥션 풀을 가진 세션을 재사용"""
+        if self._session is None or self._session.closed:
+            headers = {"Content-Type": "application/json"}
+            if self.config.api_key:
+                headers["Authorization"] = f"Bearer {self.config.api_key}"
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config.concurrency, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout_s),
+                headers=headers,
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def run(self, model_name: str, prompts: PromptSource) -> LoadTestReport:
+        """
+        프롬프트 전체를 엔드포인트에 보내고 측정 결과를 반환
+
+        Args:
+            model_name: 요청에 사용할 모델명
+            prompts: 전송할 프롬프트 (리스트 또는 데이터셋 로더의 비동기 이터레이터)
+
+        Returns:
+            LoadTestReport: 지연 히스토그램과 전체 소요 시간
+        """
+        session = await self._get_session()
+        measurement = _MeasurementWindow(self.config, time.perf_counter())
+
+        if self.config.request_rate:
+            runner = asyncio.create_task(self._run_open_loop(session, model_name, prompts, measurement.add))
+        else:
+            runner = asyncio.create_task(self._run_closed_loop(session, model_name, prompts, measurement.add))
+        converged = asyncio.create_task(measurement.converged.wait())
+        await asyncio.wait({runner, converged}, return_when=asyncio.FIRST_COMPLETED)
+        # 안정 상태에 도달하면 남은 프롬프트와 진행 중인 요청을 취소해 GPU 시간을 아낌
+        for task in (runner, converged):
+            task.cancel()
+        runner_result, _ = await asyncio.gather(runner, converged, return_exceptions=True)
+        if isinstance(runner_result, Exception):
+            raise runner_result
+
+        report = measurement.report()
+        if self.config.steady_state_window_s and not report.steady_state_reached:
+            logging.warning(f"{model_name}: steady state not reached, reporting the whole post-warmup run")
+        if report.failed_requests:
+            logging.warning(f"{model_name}: {report.failed_requests}/{report.num_requests} requests failed")
+        return report
+
+    async def _run_closed_loop(self, session: aiohttp.ClientSession, model_name: str,
+                               prompts: PromptSource, record: Callable[[RequestMetrics], None]):
+        """concurrency개의 가상 클라이언트가 하나의 이터레이터를 공유하며 순차 요청"""
+        iterator = _as_async_iterator(prompts)
+        # 비동기 제너레이터는 여러 코루틴에서 동시에 __anext__를 호출할 수 없으므로 직렬화
+        lock = asyncio.Lock()
+
+        async def client():
+            while True:
+                async with lock:
+                    try:
+                        prompt = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                record(await self._send_request(session, model_name, prompt))
+
+        await asyncio.gather(*(client() for _ in range(self.config.concurrency)))
+
+    async def _run_open_loop(self, session: aiohttp.ClientSession, model_name: str,
+                             prompts: PromptSource, record: Callable[[RequestMetrics], None]):
+        """
+        지수분포 간격(Poisson 도착)으로 요청을 발사, 응답 대기와 무관하게 도착률 유지
+
+        도착 시각은 미리 정한 일정(누적 지수분포 간격)을 따르며, 진행 중 요청이 concurrency에 도달하면
+        슬롯이 날 때까지 전송을 미루되 지연은 예정 도착 시각부터 측정한다. 따라서 서버가 도착률을 따라가지
+        못하면 밀린 시간이 지연에 그대로 반영되고, 대기 중인 태스크는 concurrency개를 넘지 않는다.
+        """
+        rng = random.Random(self.config.seed)
+        slots = asyncio.Semaphore(self.config.concurrency)
+
+        async def fire(prompt: str, scheduled_at: float):
+            try:
+                record(await self._send_request(session, model_name, prompt, scheduled_at))
+            finally:
+                slots.release()
+
+        # 끝난 태스크는 바로 버려 데이터셋 크기와 무관하게 진행 중인 요청만 보관
+        tasks = set()
+        next_arrival = time.perf_counter()
+        try:
+            async for prompt in _as_async_iterator(prompts):
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await slots.acquire()
+                task = asyncio.create_task(fire(prompt, next_arrival))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                next_arrival += rng.expovariate(self.config.request_rate)
+
+            await asyncio.gather(*tasks)
+        finally:
+            # 취소(안정 상태 도달) 시 이미 발사한 요청도 함께 취소
+            for task in list(tasks):
+                task.cancel()
+
+    async def _send_request(self, session: aiohttp.ClientSession, model_name: str,
+                            prompt: str, scheduled_at: Optional[float] = None) -> RequestMetrics:
+        """
+        스트리밍 요청 1건을 보내고 TTFT, 토큰 간 지연, 종단 지연을 측정
+
+        scheduled_at(open-loop 예정 도착 시각)이 있으면 TTFT/종단 지연은 그 시각부터 측정한다.
+        """
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        url = f"{self.config.base_url.rstrip('/')}/v1/completions"
+
+        sent_at = time.perf_counter()
+        start = sent_at if scheduled_at is None else min(scheduled_at, sent_at)
+        first_token_at: Optional[float] = None
+        last_token_at = sent_at
+        chunk_tokens = 0
+        usage_tokens: Optional[int] = None
+        prompt_tokens = 0
+        inter_token_latencies: List[float] = []
+
+        try:
+            async with session.post(url, json=payload) as response:
+                if response.status != 200:
+                    body = await response.text()
+                    return RequestMetrics(success=False, error=f"HTTP {response.status}: {body[:200]}",
+                                          started_at=start)
+
+                async for raw_line in response.content:
+                    line = raw_line.strip()
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage")
+                    if usage:
+                        usage_tokens = usage.get("completion_tokens", usage_tokens)
+                        prompt_tokens = usage.get("prompt_tokens", prompt_tokens)
+
+                    choices = chunk.get("choices") or []
+                    if not choices or not choices[0].get("text"):
+                        continue
+
+                    now = time.perf_counter()
+                    if first_token_at is None:
+                        first_token_at = now
+                    else:
+                        inter_token_latencies.append((now - last_token_at) * 1000)
+                    last_token_at = now
+                    chunk_tokens += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+            return RequestMetrics(success=False, error=str(e) or type(e).__name__, started_at=start)
+
+        if first_token_at is None:
+            return RequestMetrics(success=False, error="no tokens received", started_at=start)
+
+        return RequestMetrics(
+            success=True,
+            prompt_tokens=prompt_tokens,
+            # 서버가 usage를 내려주면 실제 토큰 수, 아니면 청크 수(vLLM은 청크당 1토큰)
+            output_tokens=usage_tokens if usage_tokens is not None else chunk_tokens,
+            ttft_ms=(first_token_at - start) * 1000,
+            e2e_latency_ms=(time.perf_counter() - start) * 1000,
+            inter_token_latencies_ms=inter_token_latencies,
+            queue_delay_ms=(sent_at - start) * 1000,
+            started_at=start,
+        )
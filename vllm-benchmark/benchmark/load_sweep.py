@@ -0,0 +1,181 @@
+import logging
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from typing import List, Optional, Union
+
+from benchmark.dataset_loader import DatasetSpec, iter_dataset
+from benchmark.load_generator import LoadGenerator, LoadGeneratorConfig, LoadTestReport
+
+# 스윕 축: 동시 요청 수(closed-loop) 또는 초당 요청 수(open-loop)
+SWEEP_MODES = ("concurrency", "request_rate")
+SLO_METRICS = ("e2e_latency", "ttft", "inter_token_latency")
+
+
+@dataclass
+class SweepPoint:
+    load: float
+    throughput_tokens_per_sec: float
+    requests_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    num_requests: int
+    failed_requests: int
+    meets_slo: bool
+
+
+@dataclass
+class SweepResult:
+    model_name: str
+    mode: str
+    slo_metric: str
+    slo_p99_ms: float
+    points: List[SweepPoint] = field(default_factory=list)
+    # SLO를 만족한 최대 부하 (최소 부하부터 위반이면 None)
+    max_sustainable_load: Optional[float] = None
+    max_sustainable_requests_per_sec: Optional[float] = None
+    # 최대 부하까지 SLO를 만족해 상한을 찾지 못한 경우
+    saturated: bool = False
+
+
+class LoadSweep:
+    """
+    처리량/지연 곡선 탐색
+
+    최소/최대 부하를 먼저 측정한 뒤 SLO 만족(lo)과 위반(hi) 사이를 이분 탐색해
+    p99 지연이 SLO 이내인 최대 동시성/요청률을 찾는다. 격자 탐색 대비 O(log(범위/허용오차))번만 실행한다.
+
+    요청률 모드에서는 기본 동시성 상한이 제공 부하를 깎지 않도록 상한을 open_loop_concurrency로 올리고,
+    완료 처리율이 제공 요청률의 min_achieved_rate_ratio 미만이면 서버가 따라오지 못한 것으로 보고 SLO 위반으로 판단한다.
+    """
+
+    def __init__(self, tracker, slo_p99_ms: float, slo_metric: str = "e2e_latency",
+                 max_failure_rate: float = 0.01, tolerance: float = 0.05, max_runs: int = 12,
+                 open_loop_concurrency: int = 1024, min_achieved_rate_ratio: float = 0.8):
+        """
+        Args:
+            tracker: PerformanceTracker (부하 생성기 설정과 DB 사용)
+            slo_p99_ms: 지연 SLO (slo_metric의 p99 기준)
+            max_failure_rate: 이 비율을 넘게 실패하면 SLO 위반으로 판단
+            tolerance: 요청률 탐색 종료 기준 상대 구간 폭 (동시성은 1 단위까지)
+            open_loop_concurrency: 요청률 모드의 동시 진행 요청 상한 (기본 설정보다 작으면 기본 설정 사용)
+            min_achieved_rate_ratio: 요청률 모드에서 완료 처리율/제공 요청률 하한 (마지막 응답 대기 구간 여유 포함)
+        """
+        if slo_metric not in SLO_METRICS:
+            raise Exception(f"Unsupported SLO metric: {slo_metric}")
+        self.tracker = tracker
+        self.collection = tracker.db.benchmark_sweeps
+        self.slo_p99_ms = slo_p99_ms
+        self.slo_metric = slo_metric
+        self.max_failure_rate = max_failure_rate
+        self.tolerance = tolerance
+        self.max_runs = max_runs
+        self.open_loop_concurrency = open_loop_concurrency
+        self.min_achieved_rate_ratio = min_achieved_rate_ratio
+
+    def _config_for(self, mode: str, load: float) -> LoadGeneratorConfig:
+        config = self.tracker.load_generator.config
+        if mode == "concurrency":
+            return replace(config, concurrency=int(load), request_rate=None)
+        return replace(config, request_rate=load, concurrency=max(config.concurrency, self.open_loop_concurrency))
+
+    def _to_point(self, mode: str, load: float, report: LoadTestReport) -> SweepPoint:
+        histogram = getattr(report, self.slo_metric)
+        p99_ms = histogram.percentile(99)
+        failure_rate = report.failed_requests / report.num_requests if report.num_requests else 1.0
+        requests_per_sec = report.completed_requests / report.duration_s if report.duration_s else 0.0
+        # 서버가 제공 요청률을 처리하지 못하면 지연이 SLO 이내로 보여도 지속 가능한 부하가 아님
+        keeps_up = mode != "request_rate" or requests_per_sec >= load * self.min_achieved_rate_ratio
+        return SweepPoint(
+            load=load,
+            throughput_tokens_per_sec=report.throughput_tokens_per_sec,
+            requests_per_sec=requests_per_sec,
+            p50_ms=histogram.percentile(50),
+            p99_ms=p99_ms,
+            num_requests=report.num_requests,
+            failed_requests=report.failed_requests,
+            meets_slo=report.completed_requests > 0 and p99_ms <= self.slo_p99_ms
+            and failure_rate <= self.max_failure_rate and keeps_up,
+        )
+
+    async def _measure(self, model_name: str, test_dataset: Union[List[str], DatasetSpec],
+                       mode: str, load: float) -> SweepPoint:
+        # 동시성에 맞춘 커넥션 풀이 필요하므로 측정점마다 별도 부하 생성기 사용
+        load_generator = LoadGenerator(self._config_for(mode, load))
+        prompts = iter_dataset(test_dataset) if isinstance(test_dataset, DatasetSpec) else test_dataset
+        try:
+            report = await load_generator.run(model_name, prompts)
+        finally:
+            await load_generator.close()
+        point = self._to_point(mode, load, report)
+        logging.info(
+            f"Sweep {model_name} {mode}={load:g}: {point.throughput_tokens_per_sec:.1f} tokens/sec, "
+            f"{self.slo_metric} p99={point.p99_ms:.1f}ms ({'ok' if point.meets_slo else 'violates SLO'})"
+        )
+        return point
+
+    def _converged(self, mode: str, lo: float, hi: float) -> bool:
+        if mode == "concurrency":
+            return hi - lo <= 1
+        return (hi - lo) / lo <= self.tolerance
+
+    async def run(self, model_name: str, test_dataset: Union[List[str], DatasetSpec],
+                  mode: str = "request_rate", min_load: float = 1.0, max_load: float = 64.0,
+                  hardware: str = "unknown", github_commit_sha: Optional[str] = None) -> SweepResult:
+        """
+        스윕 실행 후 benchmark_sweeps에 곡선과 최대 지속 가능 부하를 저장
+
+        Returns:
+            SweepResult: 부하 오름차순 측정점과 SLO 내 최대 부하
+        """
+        if mode not in SWEEP_MODES:
+            raise Exception(f"Unsupported sweep mode: {mode}")
+        if not 0 < min_load < max_load:
+            raise Exception(f"Invalid sweep range: {min_load}..{max_load}")
+
+        result = SweepResult(
+            model_name=model_name,
+            mode=mode,
+            slo_metric=self.slo_metric,
+            slo_p99_ms=self.slo_p99_ms
+        )
+        best: Optional[SweepPoint] = None
+
+        low = await self._measure(model_name, test_dataset, mode, min_load)
+        result.points.append(low)
+        if low.meets_slo:
+            best = low
+            high = await self._measure(model_name, test_dataset, mode, max_load)
+            result.points.append(high)
+            if high.meets_slo:
+                best = high
+                result.saturated = True
+            else:
+                lo, hi = min_load, max_load
+                while not self._converged(mode, lo, hi) and len(result.points) < self.max_runs:
+                    mid = (lo + hi) // 2 if mode == "concurrency" else (lo + hi) / 2
+                    point = await self._measure(model_name, test_dataset, mode, mid)
+                    result.points.append(point)
+                    if point.meets_slo:
+                        lo, best = mid, point
+                    else:
+                        hi = mid
+
+        result.points.sort(key=lambda point: point.load)
+        if best is not None:
+            result.max_sustainable_load = best.load
+            result.max_sustainable_requests_per_sec = best.requests_per_sec
+
+        await self.collection.insert_one({
+            "model_name": model_name,
+            "hardware": hardware,
+            "github_commit_sha": github_commit_sha,
+            "mode": mode,
+            "slo_metric": self.slo_metric,
+            "slo_p99_ms": self.slo_p99_ms,
+            "points": [asdict(point) for point in result.points],
+            "max_sustainable_load": result.max_sustainable_load,
+            "max_sustainable_requests_per_sec": result.max_sustainable_requests_per_sec,
+            "saturated": result.saturated,
+            "timestamp": datetime.now(),
+        })
+        return result
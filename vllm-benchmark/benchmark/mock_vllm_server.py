@@ -0,0 +1,142 @@
+"""
+로컬 테스트용 OpenAI 호환 mock vLLM 서버
+
+지정한 TTFT 이후 tokens_per_sec 속도로 토큰을 SSE 스트리밍한다.
+/metrics는 진행 중인 요청 수로 계산한 vLLM/DCGM 형식 지표를 노출한다 (샘플러 테스트용).
+prefix caching은 단어 16개 블록 단위로 흉내 내며, 캐시되지 않은 prompt 토큰만 prefill 시간에 반영한다.
+
+    python -m benchmark.mock_vllm_server --port 8000 --tokens-per-sec 50
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+from aiohttp import web
+
+
+PREFIX_BLOCK_SIZE = 16
+
+
+def create_app(tokens_per_sec: float = 50.0, ttft_ms: float = 20.0, prefill_ms_per_token: float = 0.0,
+               enable_prefix_caching: bool = True) -> web.Application:
+    """mock 서버 애플리케이션 생성"""
+    state = {"running": 0, "prefix_cache_queries": 0, "prefix_cache_hits": 0}
+    cached_blocks = set()
+
+    def cached_prompt_tokens(words: list) -> int:
+        # vLLM처럼 앞에서부터 연속으로 일치하는 완전한 블록만 재사용 (블록 해시는 이전 블록 해시를 포함)
+        digest = hashlib.sha256()
+        hits = 0
+        matching = enable_prefix_caching
+        for start in range(0, len(words) - PREFIX_BLOCK_SIZE + 1, PREFIX_BLOCK_SIZE):
+            digest.update(" ".join(words[start:start + PREFIX_BLOCK_SIZE]).encode())
+            key = digest.hexdigest()
+            if matching and key in cached_blocks:
+                hits += PREFIX_BLOCK_SIZE
+            else:
+                matching = False
+                if enable_prefix_caching:
+                    cached_blocks.add(key)
+        state["prefix_cache_queries"] += len(words)
+        state["prefix_cache_hits"] += hits
+        return hits
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        state["running"] += 1
+        try:
+            return await generate(request)
+        finally:
+            state["running"] -= 1
+
+    async def generate(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        max_tokens = int(body.get("max_tokens", 16))
+        words = str(body.get("prompt", "")).split()
+        prompt_tokens = len(words)
+        prefill_s = (prompt_tokens - cached_prompt_tokens(words)) * prefill_ms_per_token / 1000
+        created = int(time.time())
+
+        def chunk(payload: dict) -> bytes:
+            return f"data: {json.dumps(payload)}\n\n".encode()
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft_ms / 1000 + prefill_s + max_tokens / tokens_per_sec)
+            return web.json_response({
+                "object": "text_completion",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "text": " tok" * max_tokens, "finish_reason": "length"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": max_tokens,
+                          "total_tokens": prompt_tokens + max_tokens},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        try:
+            await asyncio.sleep(ttft_ms / 1000 + prefill_s)
+            for i in range(max_tokens):
+                if i:
+                    await asyncio.sleep(1 / tokens_per_sec)
+                await response.write(chunk({
+                    "object": "text_completion",
+                    "created": created,
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "text": f" tok{i}",
+                                 "finish_reason": "length" if i == max_tokens - 1 else None}],
+                }))
+
+            if (body.get("stream_options") or {}).get("include_usage"):
+                await response.write(chunk({
+                    "object": "text_completion",
+                    "created": created,
+                    "model": body.get("model"),
+                    "choices": [],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": max_tokens,
+                              "total_tokens": prompt_tokens + max_tokens},
+                }))
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except ConnectionResetError:
+            pass  # 클라이언트가 요청을 취소하면 vLLM처럼 생성 중단
+        return response
+
+    async def models(request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": []})
+
+    async def metrics(request: web.Request) -> web.Response:
+        running = state["running"]
+        lines = [
+            "# TYPE vllm:num_requests_running gauge",
+            f'vllm:num_requests_running{{model_name="mock"}} {running}',
+            f'vllm:num_requests_waiting{{model_name="mock"}} 0',
+            f'vllm:gpu_cache_usage_perc{{model_name="mock"}} {min(1.0, running / 256)}',
+            f'vllm:prefix_cache_queries_total{{model_name="mock"}} {state["prefix_cache_queries"]}',
+            f'vllm:prefix_cache_hits_total{{model_name="mock"}} {state["prefix_cache_hits"]}',
+            # DCGM exporter 형식 (MiB, %)
+            f'DCGM_FI_DEV_FB_USED{{gpu="0"}} {20480 + running * 64}',
+            f'DCGM_FI_DEV_GPU_UTIL{{gpu="0"}} {min(100, running * 10)}',
+        ]
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_post("/v1/completions", completions)
+    app.router.add_get("/v1/models", models)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible vLLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--ttft-ms", type=float, default=20.0)
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--no-prefix-caching", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app(args.tokens_per_sec, args.ttft_ms, args.prefill_ms_per_token, not args.no_prefix_caching)
+    web.run_app(app, host=args.host, port=args.port)
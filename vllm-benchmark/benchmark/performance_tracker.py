@@ -1,181 +1,947 @@
 import asyncio
-from datetime import datetime
-import aiohttp
+import base64
+import hashlib
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import ASCENDING, DESCENDING
-from kubernetes import client, config
-from typing import Dict, List, Optional
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from bson import ObjectId
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field, replace
+
+from benchmark.latency_histogram import LatencyHistogram
+from benchmark.load_generator import LoadGenerator, LoadGeneratorConfig, LoadTestReport
+from benchmark.load_sweep import LoadSweep, SweepResult
+from benchmark.prefix_scenarios import PrefixCacheBenchmark, ScenarioSpec
+from benchmark.commit_bisector import BisectRequest, CommitBisector
+from benchmark.dataset_loader import DatasetSpec, iter_dataset
+from benchmark.dataset_preparation import DatasetPreparer
+from benchmark.distributed_benchmark import DistributedBenchmarkCoordinator
+from benchmark.durable_queue import DurableTaskQueue, LeasedTask
+from benchmark.github_client import GitHubCommitClient
+from benchmark.gpu_inventory import GpuInventory
+from benchmark.gpu_scheduler import GpuReservation, GpuScheduler, ScheduledTask
+from benchmark.regression_detector import RegressionDetector
+from benchmark.result_broadcaster import ResultBroadcaster
+from benchmark.result_writer import BufferedResultWriter
+from benchmark.rollups import BenchmarkRollupJob
+from benchmark.server_metrics import ServerMetrics, ServerMetricsSampler
+
+# time-series metaField 아래에 저장되는 필드 (조회 시 최상위로 펼쳐서 반환)
+METADATA_FIELDS = ("model_name", "github_commit_sha", "hardware")
+
+# 모델 필터 없는 조회용 하이워터마크 키
+ALL_MODELS_WATERMARK = "__all__"
+
+def encode_history_cursor(timestamp: datetime, document_id: ObjectId,
+                          inserted_at: Optional[datetime] = None) -> str:
+    """(timestamp, _id, inserted_at) 키셋 페이지네이션 커서를 URL-safe 문자열로 인코딩"""
+    raw = f"{timestamp.isoformat()}|{document_id}"
+    if inserted_at is not None:
+        raw += f"|{inserted_at.isoformat()}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, ObjectId, Optional[datetime]]:
+    """커서 디코딩 (inserted_at이 없는 이전 형식 커서는 inserted_at=None)"""
+    try:
+        timestamp, document_id, *inserted_at = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(inserted_at) > 1:
+            raise ValueError(cursor)
+        return (
+            datetime.fromisoformat(timestamp),
+            ObjectId(document_id),
+            datetime.fromisoformat(inserted_at[0]) if inserted_at else None
+        )
+    except Exception:
+        raise ValueError(f"Invalid history cursor: {cursor}")
+
+def flatten_result_document(document: Dict) -> Dict:
+    """저장 문서를 API 응답 형태로 변환 (metadata 펼침 + 이어보기 cursor 추가)"""
+    record = {key: value for key, value in document.items() if key != "metadata"}
+    record.update(document.get("metadata", {}))
+    record["cursor"] = encode_history_cursor(document["timestamp"], document["_id"], document.get("inserted_at"))
+    return record
 
 @dataclass
 class BenchmarkResult:
     model_name: str
     throughput_tokens_per_sec: float
     latency_ms: float
-    memory_usage_gb: float
+    # DCGM 지표가 없어 측정하지 못했으면 None
+    memory_usage_gb: Optional[float]
     timestamp: datetime
     github_commit_sha: str
+    hardware: str = "unknown"
+    ttft_ms: float = 0.0
+    inter_token_latency_ms: float = 0.0
+    num_requests: int = 0
+    failed_requests: int = 0
+    latency_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ttft_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    inter_token_latency_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queue_delay_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    measurement_duration_s: float = 0.0
+    warmup_requests: int = 0
+    steady_state_reached: bool = False
+    server_metrics: Optional[ServerMetrics] = None
+    # tokenizer_name으로 준비한 데이터셋의 프롬프트 토큰 길이 분포
+    prompt_token_stats: Optional[Dict[str, float]] = None
+    # 데이터셋 + 부하 설정 해시 (같은 조건의 측정끼리만 재사용/비교)
+    config_hash: Optional[str] = None
+
+    @property
+    def latency_percentiles(self) -> Dict[str, float]:
+        return self.latency_histogram.percentiles()
+
+    @property
+    def ttft_percentiles(self) -> Dict[str, float]:
+        return self.ttft_histogram.percentiles()
+
+    @property
+    def inter_token_latency_percentiles(self) -> Dict[str, float]:
+        return self.inter_token_latency_histogram.percentiles()
 
 class PerformanceTracker:
-    def __init__(self, mongodb_url: str, github_token: str):
+    def __init__(self, mongodb_url: str, github_token: str,
+                 load_config: Optional[LoadGeneratorConfig] = None,
+                 replicate_live_events: bool = False,
+                 metrics_urls: Optional[List[str]] = None, metrics_interval_s: float = 1.0,
+                 metrics_gpu_pod: Optional[str] = None):
         self.mongodb_client = AsyncIOMotorClient(mongodb_url)
         self.db = self.mongodb_client.vllm_benchmark
         self.collection = self.db.benchmark_results
         self.github_token = github_token
+        self.github = GitHubCommitClient(github_token, cache_collection=self.db.github_commits)
+        self.gpu_inventory = GpuInventory()
+        self._gpu_inventory_start: Optional[asyncio.Future] = None
+        self.load_generator = LoadGenerator(load_config or LoadGeneratorConfig())
+        self.dataset_preparer = DatasetPreparer()
+        # 실행 중 수집할 Prometheus 엔드포인트 (기본: vLLM /metrics + 있으면 DCGM exporter)
+        if metrics_urls is None:
+            metrics_urls = [f"{self.load_generator.config.base_url.rstrip('/')}/metrics"]
+            if os.getenv("DCGM_EXPORTER_URL"):
+                metrics_urls.append(os.getenv("DCGM_EXPORTER_URL"))
+        self.metrics_urls = metrics_urls
+        self.metrics_interval_s = metrics_interval_s
+        # DCGM exporter는 노드의 모든 GPU를 노출하므로 vLLM 파드의 GPU만 집계 (기본: VLLM_POD_NAME)
+        self.metrics_gpu_pod = metrics_gpu_pod or os.getenv("VLLM_POD_NAME")
+        self.watermarks = self.db.benchmark_watermarks
+        self.events = self.db.benchmark_result_events
+        self.result_writer = BufferedResultWriter(self.collection, on_flush=self._on_results_flushed,
+                                                  time_field="timestamp", insert_time_field="inserted_at")
+        self._watermark_cache: Dict[str, Tuple[float, int]] = {}
+        self.broadcaster = ResultBroadcaster()
+        # True면 저장한 결과를 이벤트 컬렉션에도 기록해 다른 레플리카의 실시간 구독자에게 전달
+        self.replicate_live_events = replicate_live_events
+        self.instance_id = uuid.uuid4().hex
+        self.rollup_job = BenchmarkRollupJob(self.db, self.collection)
+        self.regression_detector = RegressionDetector(self.collection, self.db.benchmark_regressions)
         
-        # MongoDB 인덱스 최적화
-        asyncio.create_task(self._ensure_indexes())
+        # MongoDB 인덱스 최적화 (첫 저장 전에 time-series 컬렉션이 만들어지도록 태스크 보관)
+        self._setup_task = asyncio.create_task(self._ensure_indexes())
+    
+    async def _ensure_timeseries_collection(self):
+        """benchmark_results를 model_name/커밋 메타데이터 기준 time-series 컬렉션으로 생성"""
+        try:
+            await self.db.create_collection(
+                "benchmark_results",
+                timeseries={
+                    "timeField": "timestamp",
+                    "metaField": "metadata",
+                    "granularity": "hours"
+                }
+            )
+        except CollectionInvalid:
+            # 이미 존재: time-series 도입 전에 만든 일반 컬렉션이면 문서 구조만 맞춤
+            timeseries = await self.db.list_collection_names(
+                filter={"name": "benchmark_results", "type": "timeseries"}
+            )
+            if not timeseries:
+                logging.warning("benchmark_results is a regular collection, migrating legacy documents")
+                await self._migrate_legacy_layout()
+        except OperationFailure as e:
+            # MongoDB 5.0 미만: 일반 컬렉션으로 동작
+            logging.warning(f"Time-series collection unavailable, using regular collection: {e}")
+            await self._migrate_legacy_layout()
+    
+    async def _migrate_legacy_layout(self):
+        """최상위 model_name/github_commit_sha/hardware로 저장된 이전 문서를 metadata 아래로 옮김 (반복 실행해도 안전)"""
+        result = await self.collection.update_many(
+            {"metadata": {"$exists": False}, "model_name": {"$exists": True}},
+            [
+                {"$set": {"metadata": {
+                    "model_name": "$model_name",
+                    "github_commit_sha": "$github_commit_sha",
+                    "hardware": {"$ifNull": ["$hardware", "unknown"]}
+                }}},
+                {"$unset": list(METADATA_FIELDS)}
+            ]
+        )
+        if result.modified_count:
+            logging.info(f"Migrated {result.modified_count} legacy benchmark results to the metadata layout")
+    
+    async def _ensure_events_collection(self):
+        """레플리카 간 실시간 결과 전달용 capped 컬렉션 (time-series 컬렉션은 change stream 미지원)"""
+        try:
+            await self.db.create_collection(
+                "benchmark_result_events",
+                capped=True,
+                size=16 * 1024 * 1024
+            )
+        except CollectionInvalid:
+            pass  # 이미 존재
     
     async def _ensure_indexes(self):
+        """
+        컬렉션/인덱스 준비 (단계별로 실패를 로그만 남기고 계속 진행)
+        
+        _setup_task는 모든 저장 경로가 기다리므로 여기서 예외가 새면 이후 저장이 전부 같은 예외로 실패한다.
+        """
+        for step in (self._ensure_timeseries_collection, self._ensure_events_collection, self._create_indexes):
+            try:
+                await step()
+            except Exception as e:
+                logging.error(f"Benchmark collection setup step {step.__name__} failed: {e}")
+    
+    async def _create_indexes(self):
         """MongoDB 쿼리 최적화를 위한 인덱스 생성"""
         await self.collection.create_index([
-            ("model_name", ASCENDING),
+            ("metadata.model_name", ASCENDING),
             ("timestamp", DESCENDING)
         ])
         await self.collection.create_index([
-            ("github_commit_sha", ASCENDING)
+            ("metadata.github_commit_sha", ASCENDING)
         ])
         await self.collection.create_index([
             ("throughput_tokens_per_sec", DESCENDING)
         ])
+        await self.collection.create_index([
+            ("inserted_at", ASCENDING)
+        ])
+        # 모델별 since 증분 조회 (저장 순 정렬)
+        await self.collection.create_index([
+            ("metadata.model_name", ASCENDING),
+            ("inserted_at", ASCENDING)
+        ])
+        await self.db.benchmark_sweeps.create_index([
+            ("model_name", ASCENDING),
+            ("timestamp", DESCENDING)
+        ])
+        await self.db.benchmark_prefix_cache.create_index([
+            ("model_name", ASCENDING),
+            ("scenario", ASCENDING),
+            ("timestamp", DESCENDING)
+        ])
+        await self.rollup_job.ensure_indexes()
+        await self.regression_detector.ensure_indexes()
     
     async def get_github_commit_info(self, repo: str, commit_sha: str) -> Dict:
-        """GitHub API 통합으로 커밋 정보 조회"""
-        headers = {
-            "Authorization": f"token {self.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
-        url = f"https://api.github.com/repos/{repo}/commits/{commit_sha}"
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    raise Exception(f"GitHub API error: {response.status}")
+        """GitHub API 통합으로 커밋 정보 조회 (공유 세션 + 커밋 캐시)"""
+        return await self.github.get_commit(repo, commit_sha)
     
-    async def get_kubernetes_gpu_resources(self) -> Dict:
-        """Kubernetes API 호출로 GPU 리소스 현황 확인"""
-        try:
-            config.load_incluster_config()
-        except:
-            config.load_kube_config()
-        
-        v1 = client.CoreV1Api()
-        
-        nodes = v1.list_node()
-        gpu_resources = {}
-        
-        for node in nodes.items:
-            if 'nvidia.com/gpu' in node.status.capacity:
-                gpu_resources[node.metadata.name] = {
-                    'total_gpus': int(node.status.capacity['nvidia.com/gpu']),
-                    'allocatable_gpus': int(node.status.allocatable['nvidia.com/gpu'])
+    async def annotate_with_commit_info(self, repo: str, documents: List[Dict]) -> List[Dict]:
+        """결과 문서들에 커밋 메시지/작성자/시각을 붙임 (커밋별 1회, 동시성 제한 조회)"""
+        commits = await self.github.get_commits(
+            repo, (document["github_commit_sha"] for document in documents)
+        )
+        for document in documents:
+            commit = commits.get(document["github_commit_sha"])
+            if commit is not None:
+                document["commit"] = {
+                    "message": commit["commit"]["message"],
+                    "author": commit["commit"]["author"]["name"],
+                    "date": commit["commit"]["author"]["date"],
+                    "html_url": commit.get("html_url")
                 }
-        
-        return gpu_resources
+        return documents
+    
+    async def _ensure_gpu_inventory(self) -> GpuInventory:
+        """최초 호출 시 GPU 인벤토리 informer 시작 (초기 list는 스레드에서 실행)"""
+        start = self._gpu_inventory_start
+        if start is None or (start.done() and not start.cancelled() and start.exception() is not None):
+            self._gpu_inventory_start = asyncio.ensure_future(asyncio.to_thread(self.gpu_inventory.start))
+        await asyncio.shield(self._gpu_inventory_start)
+        return self.gpu_inventory
     
-    async def run_benchmark(self, model_name: str, test_dataset: List[str]) -> BenchmarkResult:
+    async def get_kubernetes_gpu_resources(self) -> Dict:
+        """Kubernetes GPU 리소스 현황 확인 (watch로 갱신되는 메모리 캐시에서 응답)"""
+        inventory = await self._ensure_gpu_inventory()
+        return inventory.nodes()
+    
+    async def get_gpu_resources_by_type(self) -> Dict[str, Dict[str, int]]:
+        """GPU 종류별 total/allocatable/used/free 현황"""
+        inventory = await self._ensure_gpu_inventory()
+        return inventory.gpu_types()
+    
+    def benchmark_config_hash(self, test_dataset: Union[List[str], DatasetSpec]) -> str:
+        """데이터셋과 부하 설정의 해시 (엔드포인트/인증 정보는 측정 조건이 아니므로 제외)"""
+        dataset = asdict(test_dataset) if isinstance(test_dataset, DatasetSpec) else list(test_dataset)
+        load_config = {
+            key: value for key, value in asdict(self.load_generator.config).items()
+            if key not in ("base_url", "api_key")
+        }
+        payload = json.dumps({"dataset": dataset, "load_config": load_config}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    async def run_benchmark(self, model_name: str, test_dataset: Union[List[str], DatasetSpec],
+                            hardware: str = "unknown",
+                            github_commit_sha: Optional[str] = None,
+                            tokenizer_name: Optional[str] = None,
+                            evaluate_regression: bool = True,
+                            base_url: Optional[str] = None) -> BenchmarkResult:
         """
         벤치마크 실행 및 정확성 검증
         
         Args:
             model_name: 테스트할 모델명
-            test_dataset: 테스트 데이터셋
+            test_dataset: 테스트 데이터셋 (프롬프트 리스트 또는 스트리밍으로 읽을 DatasetSpec)
+            hardware: GPU 종류 등 하드웨어 식별자 (회귀 비교 기준)
+            github_commit_sha: 측정 대상 커밋 (없으면 GITHUB_SHA 환경변수)
+            tokenizer_name: 지정하면 측정 전에 실제 토크나이저로 프롬프트 토큰 수를 준비 (DatasetSpec은 스트리밍으로, 캐시됨)
+            evaluate_regression: False면 회귀 판정을 건너뛰고 회귀 베이스라인에서도 제외 (bisect/임시 실행)
+            base_url: 기본 엔드포인트 대신 부하를 걸 vLLM 서버 (GPU 예약 노드의 서버 등)
             
         Returns:
             BenchmarkResult: 벤치마크 결과
         """
+        # 토큰화와 길이 분포 계산은 측정 구간 밖에서 수행 (프로세스 풀 + mmap 캐시)
+        prompt_token_stats = None
+        if tokenizer_name:
+            if isinstance(test_dataset, DatasetSpec):
+                prepared = await self.dataset_preparer.prepare_stream(tokenizer_name, lambda: iter_dataset(test_dataset))
+            else:
+                prepared = await self.dataset_preparer.prepare(tokenizer_name, test_dataset)
+            try:
+                prompt_token_stats = prepared.token_length_summary()
+            finally:
+                prepared.close()
+        prompts = iter_dataset(test_dataset) if isinstance(test_dataset, DatasetSpec) else test_dataset
         start_time = datetime.now()
         
-        # 더미 벤치마크 로직 (실제로는 vLLM 엔진 사용)
-        total_tokens = sum(len(text.split()) for text in test_dataset)
-        processing_time_ms = total_tokens * 0.1  # 더미 계산
+        # vLLM 엔드포인트에 실제 스트리밍 부하를 걸어 측정 (서버 지표는 백그라운드로 함께 수집)
+        load_generator = self.load_generator
+        if base_url is not None:
+            load_generator = LoadGenerator(replace(self.load_generator.config, base_url=base_url))
+        sampler = self.create_metrics_sampler(base_url)
+        sampler.start()
+        try:
+            report = await load_generator.run(model_name, prompts)
+        finally:
+            server_metrics = await sampler.stop()
+            if load_generator is not self.load_generator:
+                await load_generator.close()
+        if not report.completed_requests:
+            raise Exception(f"Benchmark failed: all {report.num_requests} requests to {model_name} failed")
+        if prompt_token_stats and not report.total_prompt_tokens:
+            # 서버가 usage를 보내지 않는 경우 토크나이저 기준 프롬프트 토큰 수 사용
+            report.total_prompt_tokens = prompt_token_stats["total"]
         
-        throughput = total_tokens / (processing_time_ms / 1000)
-        latency = processing_time_ms / len(test_dataset)
-        memory_usage = 12.5  # 더미 메모리 사용량 (GB)
+        return await self.record_load_report(model_name, report, start_time, hardware, github_commit_sha,
+                                             server_metrics, evaluate_regression, prompt_token_stats,
+                                             self.benchmark_config_hash(test_dataset))
+    
+    def create_metrics_sampler(self, base_url: Optional[str] = None) -> ServerMetricsSampler:
+        """실행마다 새 샘플러 사용 (동시에 도는 워커끼리 시계열이 섞이지 않도록, base_url이 있으면 그 서버의 /metrics)"""
+        metrics_urls = [f"{base_url.rstrip('/')}/metrics"] if base_url is not None else self.metrics_urls
+        return ServerMetricsSampler(metrics_urls, self.metrics_interval_s, gpu_pod=self.metrics_gpu_pod)
+    
+    async def record_load_report(self, model_name: str, report: LoadTestReport, start_time: datetime,
+                                 hardware: str = "unknown",
+                                 github_commit_sha: Optional[str] = None,
+                                 server_metrics: Optional[ServerMetrics] = None,
+                                 evaluate_regression: bool = True,
+                                 prompt_token_stats: Optional[Dict[str, float]] = None,
+                                 config_hash: Optional[str] = None) -> BenchmarkResult:
+        """부하 테스트 집계(단일 또는 분산 워커 병합 결과)를 BenchmarkResult로 변환해 저장"""
+        # 실행 중 GPU 메모리 최대 사용량 (DCGM 지표가 없으면 None: 0으로 저장하면 실제 측정값처럼 보임)
+        memory_usage = server_metrics.peak("gpu_memory_used_gb") if server_metrics else None
         
-        # 현재 GitHub 커밋 SHA 조회 (실제 환경에서는 환경변수에서)
-        github_sha = "abc123def456"
+        # 현재 GitHub 커밋 SHA 조회 (bisect 등에서 명시하지 않으면 환경변수에서)
+        github_sha = github_commit_sha or os.getenv("GITHUB_SHA", "abc123def456")
         
         result = BenchmarkResult(
             model_name=model_name,
-            throughput_tokens_per_sec=throughput,
-            latency_ms=latency,
+            throughput_tokens_per_sec=report.throughput_tokens_per_sec,
+            latency_ms=report.e2e_latency.mean_ms,
             memory_usage_gb=memory_usage,
             timestamp=start_time,
-            github_commit_sha=github_sha
+            github_commit_sha=github_sha,
+            hardware=hardware,
+            ttft_ms=report.ttft.mean_ms,
+            inter_token_latency_ms=report.inter_token_latency.mean_ms,
+            num_requests=report.num_requests,
+            failed_requests=report.failed_requests,
+            latency_histogram=report.e2e_latency,
+            ttft_histogram=report.ttft,
+            inter_token_latency_histogram=report.inter_token_latency,
+            queue_delay_histogram=report.queue_delay,
+            measurement_duration_s=report.duration_s,
+            warmup_requests=report.warmup_requests,
+            steady_state_reached=report.steady_state_reached,
+            server_metrics=server_metrics,
+            prompt_token_stats=prompt_token_stats,
+            config_hash=config_hash
         )
         
         # MongoDB에 결과 저장 (쿼리 최적화)
-        await self.store_benchmark_result(result)
+        await self.store_benchmark_result(result, evaluate_regression)
         
         return result
     
-    async def store_benchmark_result(self, result: BenchmarkResult):
-        """벤치마크 결과를 MongoDB에 저장"""
+    async def store_benchmark_result(self, result: BenchmarkResult, evaluate_regression: bool = True):
+        """
+        벤치마크 결과를 write-behind 버퍼를 통해 MongoDB에 배치 저장
+        
+        evaluate_regression=False인 결과(bisect 중간 커밋, 임시 실행)는 회귀 판정을 하지 않고
+        baseline_eligible=False로 저장되어 이후 실행의 베이스라인에도 들어가지 않는다.
+        """
         document = {
-            "model_name": result.model_name,
+            # time-series metaField: 같은 모델/커밋의 측정값이 한 버킷에 묶임
+            "metadata": {
+                "model_name": result.model_name,
+                "github_commit_sha": result.github_commit_sha,
+                "hardware": result.hardware
+            },
             "throughput_tokens_per_sec": result.throughput_tokens_per_sec,
             "latency_ms": result.latency_ms,
             "memory_usage_gb": result.memory_usage_gb,
             "timestamp": result.timestamp,
-            "github_commit_sha": result.github_commit_sha
+            "ttft_ms": result.ttft_ms,
+            "inter_token_latency_ms": result.inter_token_latency_ms,
+            "num_requests": result.num_requests,
+            "failed_requests": result.failed_requests,
+            # 워밍업 제외 후 실제 측정 구간 (안정 상태 도달 시 안정 윈도우만)
+            "measurement_duration_s": result.measurement_duration_s,
+            "warmup_requests": result.warmup_requests,
+            "steady_state_reached": result.steady_state_reached,
+            "baseline_eligible": evaluate_regression,
+            # 대시보드용 분위수 요약과 병합 가능한 압축 히스토그램을 함께 저장
+            "latency_percentiles": result.latency_percentiles,
+            "ttft_percentiles": result.ttft_percentiles,
+            "inter_token_latency_percentiles": result.inter_token_latency_percentiles,
+            # open-loop에서 동시성 상한 때문에 예정 도착 시각보다 늦게 보낸 클라이언트 측 대기 (지연에 포함됨)
+            "queue_delay_percentiles": result.queue_delay_histogram.percentiles(),
+            "histograms": {
+                "e2e_latency": result.latency_histogram.to_document(),
+                "ttft": result.ttft_histogram.to_document(),
+                "inter_token_latency": result.inter_token_latency_histogram.to_document(),
+                "queue_delay": result.queue_delay_histogram.to_document()
+            }
         }
+        if result.server_metrics is not None:
+            # KV 캐시/대기열/GPU 메모리 시계열과 peak/mean 요약
+            document["server_metrics"] = result.server_metrics.to_document()
+        if result.prompt_token_stats:
+            document["prompt_tokens"] = result.prompt_token_stats
+        if result.config_hash is not None:
+            document["config_hash"] = result.config_hash
         
-        await self.collection.insert_one(document)
+        await self._setup_task
+        await self.result_writer.write(document)
+        if not evaluate_regression:
+            return
+        
+        # 같은 모델/하드웨어의 롤링 베이스라인과 비교해 회귀 판정 기록
+        try:
+            verdict = await self.regression_detector.evaluate(
+                model_name=result.model_name,
+                hardware=result.hardware,
+                github_commit_sha=result.github_commit_sha,
+                throughput=result.throughput_tokens_per_sec,
+                latency_histogram=result.latency_histogram,
+                timestamp=result.timestamp
+            )
+            if verdict["verdict"] == "regression":
+                logging.warning(f"Performance regression detected for {result.model_name} at {result.github_commit_sha}")
+        except Exception as e:
+            logging.error(f"Regression detection failed for {result.model_name}: {e}")
+    
+    async def flush_results(self):
+        """버퍼에 남은 결과를 모두 MongoDB에 저장"""
+        await self.result_writer.flush()
     
     async def get_performance_history(self, model_name: str, limit: int = 100) -> List[Dict]:
         """모델별 성능 히스토리 조회 (MongoDB 쿼리 최적화)"""
         cursor = self.collection.find(
-            {"model_name": model_name}
+            {"metadata.model_name": model_name}
         ).sort("timestamp", DESCENDING).limit(limit)
         
         return await cursor.to_list(length=limit)
+    
+    async def iter_performance_history(
+        self,
+        model_name: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+        after: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        """
+        성능 히스토리를 최신순으로 스트리밍 조회
+        
+        (timestamp, _id) 키셋 페이지네이션으로 page_size개씩 끊어 읽으므로 커서를 오래 붙잡거나
+        전체 결과를 메모리에 올리지 않는다. 각 문서에는 이어서 조회할 수 있는 "cursor"가 포함된다.
+        
+        since는 측정 시작 시각이 아니라 저장 시각(inserted_at) 기준이라, 오래 걸린 실행이 늦게
+        저장되어도 다음 증분 조회에서 빠지지 않는다. since 조회는 저장 순(inserted_at, _id 오름차순)으로
+        반환하므로 limit에서 잘려도 마지막 문서의 cursor를 다음 since로 넘기면 빠지는 결과가 없다.
+        
+        Args:
+            model_name: 모델명 필터 (None이면 전체)
+            start: 조회 시작 시각 (포함)
+            end: 조회 종료 시각 (미포함)
+            fields: 반환할 필드 목록 (None이면 전체)
+            after: 이전 조회의 마지막 문서 cursor (이보다 오래된 결과를 이어서 조회)
+            since: 이전 조회에서 inserted_at이 가장 큰 문서의 cursor (그 이후 저장된 결과만 저장 순으로 조회)
+            limit: 최대 반환 문서 수 (None이면 제한 없음)
+            page_size: MongoDB 한 번 조회당 문서 수
+        """
+        query: Dict = {}
+        if model_name:
+            query["metadata.model_name"] = model_name
+        if start is not None or end is not None:
+            query["timestamp"] = {}
+            if start is not None:
+                query["timestamp"]["$gte"] = start
+            if end is not None:
+                query["timestamp"]["$lt"] = end
+        # 페이지 키: 기본은 (timestamp, _id) 내림차순, since 조회는 (inserted_at, _id) 오름차순
+        key_field, direction, operator = "timestamp", DESCENDING, "$lt"
+        last_key = decode_history_cursor(after)[:2] if after else None
+        if since:
+            since_timestamp, since_id, since_inserted_at = decode_history_cursor(since)
+            if after:
+                timestamp, document_id = last_key
+                query["$and"] = [{"$or": [
+                    {"timestamp": {"$lt": timestamp}},
+                    {"timestamp": timestamp, "_id": {"$lt": document_id}}
+                ]}]
+            if since_inserted_at is not None:
+                key_field, direction, operator = "inserted_at", ASCENDING, "$gt"
+                last_key = (since_inserted_at, since_id)
+            else:
+                # inserted_at 도입 전 커서: 측정 시각 기준 (늦게 저장된 결과는 놓칠 수 있음)
+                key_field, direction, operator = "timestamp", ASCENDING, "$gt"
+                last_key = (since_timestamp, since_id)
+        
+        projection = None
+        if fields is not None:
+            projection = {
+                (f"metadata.{field}" if field in METADATA_FIELDS else field): 1
+                for field in fields
+            }
+            projection["timestamp"] = 1
+            projection["inserted_at"] = 1
+        
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            page_query = dict(query)
+            if last_key is not None:
+                value, document_id = last_key
+                page_query["$or"] = [
+                    {key_field: {operator: value}},
+                    {key_field: value, "_id": {operator: document_id}}
+                ]
+            batch = page_size if remaining is None else min(page_size, remaining)
+            
+            cursor = self.collection.find(page_query, projection).sort(
+                [(key_field, direction), ("_id", direction)]
+            ).limit(batch)
+            
+            count = 0
+            async for document in cursor:
+                count += 1
+                last_key = (document[key_field], document["_id"])
+                yield flatten_result_document(document)
+            
+            if remaining is not None:
+                remaining -= count
+            if count < batch:
+                break
+    
+    async def _on_results_flushed(self, batch: List[Dict]):
+        """배치가 MongoDB에 커밋된 뒤: 하이워터마크 갱신 후 실시간 구독자에게 발행"""
+        await self._update_watermarks(batch)
+        
+        events = []
+        for document in batch:
+            event = flatten_result_document(document)
+            event.pop("_id", None)
+            event.pop("histograms", None)
+            if "server_metrics" in event:
+                # 실시간 이벤트에는 요약만 전달
+                event["server_metrics"] = {"summary": event["server_metrics"]["summary"]}
+            events.append(event)
+            self.broadcaster.publish(event)
+        
+        if self.replicate_live_events:
+            await self.events.insert_many(
+                [{**event, "origin": self.instance_id} for event in events],
+                ordered=False
+            )
+    
+    def start_live_stream_replication(self):
+        """
+        멀티 레플리카 모드: 다른 프로세스가 이벤트 컬렉션에 기록한 결과를
+        change stream으로 받아 로컬 구독자에게 발행 (MongoDB 레플리카셋 필요)
+        """
+        self.replicate_live_events = True
+        self.broadcaster.start_change_stream(self.events, skip_origin=self.instance_id)
+    
+    async def _update_watermarks(self, batch: List[Dict]):
+        """저장된 배치로 모델별(+전체) 하이워터마크 버전을 올림"""
+        counts: Dict[str, int] = {}
+        latest: Dict[str, datetime] = {}
+        for document in batch:
+            for key in (document["metadata"]["model_name"], ALL_MODELS_WATERMARK):
+                counts[key] = counts.get(key, 0) + 1
+                latest[key] = max(latest.get(key, document["timestamp"]), document["timestamp"])
+        
+        for key, count in counts.items():
+            await self.watermarks.update_one(
+                {"_id": key},
+                {"$inc": {"version": count}, "$max": {"latest_timestamp": latest[key]}},
+                upsert=True
+            )
+    
+    async def get_history_version(self, model_name: Optional[str] = None,
+                                  max_age_s: float = 1.0) -> int:
+        """
+        모델별 결과 버전(저장된 결과 수 기반 하이워터마크) 조회
+        
+        폴링 응답의 ETag 계산용이며, 짧은 시간 동안 프로세스 내에 캐시해 유휴 폴링이
+        MongoDB 조회조차 거의 발생시키지 않도록 한다.
+        """
+        key = model_name or ALL_MODELS_WATERMARK
+        now = asyncio.get_running_loop().time()
+        cached = self._watermark_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        document = await self.watermarks.find_one({"_id": key}, {"version": 1})
+        version = document["version"] if document else 0
+        self._watermark_cache[key] = (now + max_age_s, version)
+        return version
+    
+    async def get_aggregate_latency_percentiles(self, model_name: str,
+                                                since: Optional[datetime] = None) -> Dict[str, Dict[str, float]]:
+        """저장된 히스토그램만 병합해 여러 실행에 걸친 꼬리 지연 분위수 계산"""
+        query = {"metadata.model_name": model_name, "histograms": {"$exists": True}}
+        if since is not None:
+            query["timestamp"] = {"$gte": since}
+        
+        merged = {
+            "e2e_latency": LatencyHistogram(),
+            "ttft": LatencyHistogram(),
+            "inter_token_latency": LatencyHistogram()
+        }
+        async for document in self.collection.find(query, {"histograms": 1, "_id": 0}):
+            for name, histogram in merged.items():
+                histogram.merge(LatencyHistogram.from_document(document["histograms"][name]))
+        
+        return {name: histogram.percentiles() for name, histogram in merged.items()}
+    
+    async def run_load_sweep(self, model_name: str, test_dataset: Union[List[str], DatasetSpec],
+                             slo_p99_ms: float, mode: str = "request_rate",
+                             min_load: float = 1.0, max_load: float = 64.0,
+                             slo_metric: str = "e2e_latency", hardware: str = "unknown",
+                             github_commit_sha: Optional[str] = None) -> SweepResult:
+        """
+        동시성/요청률 스윕으로 처리량-p99 곡선과 SLO 내 최대 부하를 측정
+        
+        Args:
+            slo_p99_ms: slo_metric p99 지연 SLO
+            mode: "request_rate"(open-loop 초당 요청 수) 또는 "concurrency"(closed-loop 동시 요청 수)
+            min_load, max_load: 탐색 범위
+        """
+        await self._setup_task
+        sweep = LoadSweep(self, slo_p99_ms, slo_metric)
+        return await sweep.run(model_name, test_dataset, mode, min_load, max_load, hardware,
+                               github_commit_sha or os.getenv("GITHUB_SHA", "abc123def456"))
+    
+    async def get_latest_sweep(self, model_name: str, hardware: Optional[str] = None) -> Optional[Dict]:
+        """모델의 가장 최근 스윕 결과 (용량 계획용)"""
+        query = {"model_name": model_name}
+        if hardware is not None:
+            query["hardware"] = hardware
+        return await self.db.benchmark_sweeps.find_one(query, {"_id": 0}, sort=[("timestamp", DESCENDING)])
+    
+    async def run_prefix_cache_benchmark(self, model_name: str, scenario: ScenarioSpec,
+                                         hardware: str = "unknown", no_cache_base_url: Optional[str] = None,
+                                         github_commit_sha: Optional[str] = None) -> Dict:
+        """
+        prefix 겹침을 통제한 시나리오로 prefix caching 효과 측정
+        
+        Args:
+            scenario: shared_system_prompt / multi_turn_conversation / rag_long_context 와 생성 파라미터
+            no_cache_base_url: prefix caching을 끈 같은 모델 서버 (없으면 salt로 prefix를 깬 대조군 사용)
+        """
+        await self._setup_task
+        benchmark = PrefixCacheBenchmark(self)
+        return await benchmark.run(model_name, scenario, hardware, no_cache_base_url,
+                                   github_commit_sha or os.getenv("GITHUB_SHA", "abc123def456"))
+    
+    async def get_prefix_cache_results(self, model_name: str, scenario: Optional[str] = None,
+                                       limit: int = 20) -> List[Dict]:
+        """모델의 최근 prefix cache 측정 결과 (시나리오별 적중률/처리량 변화)"""
+        query = {"model_name": model_name}
+        if scenario is not None:
+            query["scenario"] = scenario
+        cursor = self.db.benchmark_prefix_cache.find(query, {"_id": 0}).sort("timestamp", DESCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    def start_rollup_job(self, interval_s: float = 300.0):
+        """시간/일 단위 롤업 백그라운드 작업 시작"""
+        self.rollup_job.start(interval_s)
+    
+    async def get_performance_trend(self, model_name: str, days: int = 7,
+                                    hardware: Optional[str] = None) -> List[Dict]:
+        """대시보드용 장기 추세 조회 (원본 대신 롤업을 읽음, 2일 이하면 시간 단위, 구간은 하드웨어별)"""
+        granularity = "hour" if days <= 2 else "day"
+        start = datetime.now() - timedelta(days=days)
+        return await self.rollup_job.get_rollups(model_name, granularity, start, hardware=hardware)
+    
+    async def close(self):
+        """결과 버퍼를 비우고 부하 생성기 세션과 MongoDB 연결 정리"""
+        await self.rollup_job.stop()
+        await self.result_writer.close()
+        await self.broadcaster.stop()
+        await self.github.close()
+        self.gpu_inventory.stop()
+        await self.load_generator.close()
+        self.dataset_preparer.close()
+        self.mongodb_client.close()
 
 class BenchmarkQueue:
     """비동기 처리 패턴을 위한 큐 관리 로직"""
     
-    def __init__(self):
+    def __init__(self, prepare_commit: Optional[Callable[[str], Awaitable[None]]] = None,
+                 scheduler: Optional[GpuScheduler] = None,
+                 durable_queue: Optional[DurableTaskQueue] = None, poll_interval_s: float = 2.0,
+                 prepare_reservation: Optional[Callable[[str, GpuReservation], Awaitable[str]]] = None,
+                 distributed_shards: Optional[int] = None):
         self.queue = asyncio.Queue()
         self.workers = []
         self.running = False
+        self.tracker: Optional[PerformanceTracker] = None
+        # bisect 모드에서 커밋별 vLLM 서버를 준비하는 훅
+        self.prepare_commit = prepare_commit
+        # 지정하면 태스크는 GPU를 예약한 뒤에만 시작 (우선순위/모델 간 공정성 적용)
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.on_reject = self._on_scheduler_reject
+        # 예약한 노드에 모델 서버를 띄우거나 찾아 그 base URL을 돌려주는 훅
+        # (없으면 예약은 동시 실행 수를 GPU 여유에 맞추는 admission control로만 동작하고 기본 엔드포인트로 측정)
+        self.prepare_reservation = prepare_reservation
+        # 지정하면 벤치마크 태스크를 샤드로 나눠 영속 큐를 통해 BenchmarkShardWorker들에게 분산 실행
+        if distributed_shards is not None and durable_queue is None:
+            raise Exception("distributed_shards requires a durable_queue for shard tasks")
+        self.distributed_shards = distributed_shards
+        # 지정하면 태스크를 MongoDB에 저장하고 lease한 만큼만 이 레플리카에서 실행
+        self.durable_queue = durable_queue
+        self.poll_interval_s = poll_interval_s
+        self.owner = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self._leased: Dict[object, LeasedTask] = {}
+        self._background: List[asyncio.Task] = []
     
-    async def add_benchmark_task(self, model_name: str, test_data: List[str]):
-        """벤치마크 태스크를 큐에 추가"""
-        await self.queue.put((model_name, test_data))
+    async def add_benchmark_task(self, model_name: str, test_data: Union[List[str], DatasetSpec],
+                                 priority: int = 0, idempotency_key: Optional[str] = None,
+                                 evaluate_regression: bool = True):
+        """
+        벤치마크 태스크를 큐에 추가 (priority는 스케줄러/영속 큐 사용 시에만 적용, 클수록 먼저)
+        
+        DatasetSpec을 넘기면 큐에는 데이터셋 참조만 저장되고 워커가 실행 시점에 스트리밍으로 읽는다.
+        임시 실행은 evaluate_regression=False로 넣어 회귀 베이스라인에 섞이지 않게 한다.
+        """
+        if self.durable_queue is not None:
+            if isinstance(test_data, DatasetSpec):
+                payload = {"model_name": model_name, "dataset": asdict(test_data)}
+            else:
+                payload = {"model_name": model_name, "test_data": test_data}
+            payload["evaluate_regression"] = evaluate_regression
+            return await self.durable_queue.enqueue("benchmark", payload, idempotency_key, priority)
+        await self._dispatch(model_name, (model_name, test_data, evaluate_regression), priority)
+    
+    async def add_bisect_task(self, request: BisectRequest, priority: int = 0,
+                              idempotency_key: Optional[str] = None):
+        """good/bad 커밋 구간 bisect 태스크를 큐에 추가 (한 워커가 순차적으로 중간 커밋을 측정)"""
+        if self.durable_queue is not None:
+            return await self.durable_queue.enqueue("bisect", asdict(request), idempotency_key, priority)
+        await self._dispatch(request.model_name, request, priority)
+    
+    async def _dispatch(self, model_name: str, task, priority: int):
+        if self.scheduler is not None:
+            await self.scheduler.submit(model_name, task, priority)
+        else:
+            await self.queue.put(task)
+    
+    @staticmethod
+    def _decode(leased: LeasedTask):
+        if leased.kind == "bisect":
+            request = BisectRequest(**leased.payload)
+            if isinstance(request.test_dataset, dict):
+                request.test_dataset = DatasetSpec(**request.test_dataset)
+            return request
+        evaluate_regression = leased.payload.get("evaluate_regression", True)
+        if "dataset" in leased.payload:
+            return leased.payload["model_name"], DatasetSpec(**leased.payload["dataset"]), evaluate_regression
+        return leased.payload["model_name"], leased.payload["test_data"], evaluate_regression
+    
+    async def _lease_loop(self, capacity: int):
+        """영속 큐에서 워커 수만큼만 lease해 로컬 큐/스케줄러로 전달"""
+        while self.running:
+            if len(self._leased) >= capacity:
+                await asyncio.sleep(self.poll_interval_s)
+                continue
+            try:
+                leased = await self.durable_queue.lease(self.owner, kinds=("benchmark", "bisect"))
+            except PyMongoError as e:
+                logging.error(f"Benchmark task lease failed: {e}")
+                leased = None
+            if leased is None:
+                await asyncio.sleep(self.poll_interval_s)
+                continue
+            self._leased[leased.task_id] = leased
+            await self._dispatch(leased.payload["model_name"], leased, leased.priority)
+    
+    async def _heartbeat_loop(self):
+        """보유 중인 lease를 visibility timeout 전에 연장 (GPU 대기 중인 태스크 포함, stop_workers가 워커 종료 후 취소)"""
+        interval = self.durable_queue.visibility_timeout_s / 3
+        while True:
+            await asyncio.sleep(interval)
+            for leased in list(self._leased.values()):
+                try:
+                    if not await self.durable_queue.heartbeat(leased, self.owner):
+                        logging.warning(f"Lost lease on benchmark task {leased.task_id}")
+                except PyMongoError as e:
+                    logging.error(f"Benchmark task heartbeat failed: {e}")
+    
+    async def _acknowledge(self, leased: LeasedTask, error: Optional[Exception]):
+        try:
+            if error is None:
+                await self.durable_queue.complete(leased, self.owner)
+            else:
+                await self.durable_queue.fail(leased, self.owner, str(error))
+        except PyMongoError as e:
+            # lease가 만료되면 다른 워커가 다시 실행하므로 태스크는 유실되지 않음
+            logging.error(f"Failed to acknowledge benchmark task {leased.task_id}: {e}")
+        finally:
+            self._leased.pop(leased.task_id, None)
+    
+    async def _on_scheduler_reject(self, task: ScheduledTask, reason: str):
+        """배치 불가로 버려진 태스크: lease한 태스크면 실패 처리해 lease와 슬롯을 돌려줌"""
+        if isinstance(task.payload, LeasedTask):
+            await self._acknowledge(task.payload, Exception(f"GPU scheduling rejected: {reason}"))
+    
+    async def _next_task(self) -> Tuple[object, Optional[GpuReservation]]:
+        if self.scheduler is None:
+            return await asyncio.wait_for(self.queue.get(), timeout=1.0), None
+        task, reservation = await asyncio.wait_for(self.scheduler.acquire(), timeout=1.0)
+        return task.payload, reservation
+    
+    async def _run_task(self, worker_id: int, tracker: PerformanceTracker, task,
+                        reservation: Optional[GpuReservation]):
+        if isinstance(task, BisectRequest):
+            logging.info(f"Worker {worker_id} bisecting {task.model_name} {task.good_sha}..{task.bad_sha}")
+            bisect_result = await CommitBisector(tracker, self.prepare_commit).run(task)
+            logging.info(f"Worker {worker_id} bisected {task.model_name}: first bad commit {bisect_result.first_bad_sha} ({bisect_result.runs_executed} runs)")
+            return
+        
+        model_name, test_data, evaluate_regression = task
+        if self.distributed_shards is not None:
+            logging.info(f"Worker {worker_id} distributing {model_name} over {self.distributed_shards} shards")
+            coordinator = DistributedBenchmarkCoordinator(tracker, self.durable_queue, self.distributed_shards)
+            result = await coordinator.run_benchmark(
+                model_name, test_data,
+                hardware=reservation.gpu_type if reservation is not None else "unknown",
+                evaluate_regression=evaluate_regression
+            )
+        elif reservation is not None:
+            logging.info(f"Worker {worker_id} processing {model_name} on {reservation.node_name} ({reservation.gpus}x {reservation.gpu_type})")
+            base_url = None
+            if self.prepare_reservation is not None:
+                base_url = await self.prepare_reservation(model_name, reservation)
+            result = await tracker.run_benchmark(model_name, test_data, hardware=reservation.gpu_type,
+                                                 evaluate_regression=evaluate_regression, base_url=base_url)
+        else:
+            logging.info(f"Worker {worker_id} processing {model_name}")
+            result = await tracker.run_benchmark(model_name, test_data, evaluate_regression=evaluate_regression)
+        logging.info(f"Worker {worker_id} completed {model_name}: {result.throughput_tokens_per_sec:.2f} tokens/sec")
     
     async def worker(self, worker_id: int, tracker: PerformanceTracker):
         """워커 프로세스: 큐에서 태스크를 가져와 처리"""
         while self.running:
             try:
-                model_name, test_data = await asyncio.wait_for(
-                    self.queue.get(), timeout=1.0
-                )
-                
-                logging.info(f"Worker {worker_id} processing {model_name}")
-                result = await tracker.run_benchmark(model_name, test_data)
-                logging.info(f"Worker {worker_id} completed {model_name}: {result.throughput_tokens_per_sec:.2f} tokens/sec")
-                
-                self.queue.task_done()
-                
+                task, reservation = await self._next_task()
             except asyncio.TimeoutError:
                 continue
             except Exception as e:
+                # GPU 현황 조회 실패 등: 워커를 잃지 않도록 잠시 쉬었다가 다시 시도
+                logging.error(f"Worker {worker_id} failed to get next task: {e}")
+                await asyncio.sleep(self.poll_interval_s)
+                continue
+            
+            leased = task if isinstance(task, LeasedTask) else None
+            error = None
+            try:
+                await self._run_task(worker_id, tracker, self._decode(leased) if leased else task, reservation)
+            except Exception as e:
+                error = e
                 logging.error(f"Worker {worker_id} error: {e}")
+            finally:
+                if reservation is not None:
+                    await self.scheduler.release(reservation)
+                else:
+                    self.queue.task_done()
+            if leased is not None:
+                await self._acknowledge(leased, error)
+    
+    async def join(self):
+        """등록된 태스크가 모두 끝날 때까지 대기 (영속 큐는 이 레플리카가 lease한 태스크 기준)"""
+        if self.scheduler is not None:
+            await self.scheduler.wait_idle()
+        else:
+            await self.queue.join()
     
     async def start_workers(self, num_workers: int, tracker: PerformanceTracker):
         """워커들을 시작"""
         self.running = True
+        self.tracker = tracker
+        if self.durable_queue is not None:
+            await self.durable_queue.ensure_indexes()
+            self._background = [
+                asyncio.create_task(self._lease_loop(num_workers)),
+                asyncio.create_task(self._heartbeat_loop()),
+            ]
         self.workers = [
             asyncio.create_task(self.worker(i, tracker)) 
             for i in range(num_workers)
         ]
     
     async def stop_workers(self):
-        """워커들을 정지"""
+        """워커들을 정지하고 버퍼에 남은 결과를 저장"""
         self.running = False
+        # 실행 중인 태스크가 끝날 때까지 heartbeat로 lease를 유지한 뒤 백그라운드 루프 정지
         await asyncio.gather(*self.workers, return_exceptions=True)
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        self._background = []
+        # lease만 하고 시작하지 않은 태스크는 즉시 다른 레플리카가 가져갈 수 있도록 반환
+        for leased in list(self._leased.values()):
+            try:
+                await self.durable_queue.release(leased, self.owner)
+            except PyMongoError as e:
+                logging.error(f"Failed to release benchmark task {leased.task_id}: {e}")
+        self._leased.clear()
+        if self.tracker is not None:
+            await self.tracker.flush_results()
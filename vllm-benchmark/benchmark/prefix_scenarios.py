@@ -0,0 +1,179 @@
+import logging
+import random
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmark.load_generator import LoadGenerator, LoadTestReport
+from benchmark.server_metrics import ServerMetrics, ServerMetricsSampler
+
+# 단어 1개 ≈ 토큰 1개가 되도록 짧은 일반 단어로 구성
+_VOCABULARY = (
+    "the model server request token cache prefix block memory layer batch query answer context "
+    "document section table result value system user data time number report index window "
+    "signal vector matrix kernel stream engine worker policy metric update state event"
+).split()
+
+
+def _text(rng: random.Random, num_words: int) -> str:
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(num_words))
+
+
+def _salt(rng: random.Random, salted: bool) -> str:
+    # 프롬프트 맨 앞에 고유 문자열을 붙이면 길이는 거의 같고 공유 prefix만 사라짐 (캐시 미적중 대조군)
+    return f"[{rng.getrandbits(64):016x}] " if salted else ""
+
+
+def shared_system_prompt(num_prompts: int = 512, system_prompt_words: int = 1024, user_words: int = 64,
+                         num_system_prompts: int = 1, seed: int = 0, salted: bool = False) -> List[str]:
+    """num_system_prompts개의 긴 시스템 프롬프트를 공유하고 질문만 다른 요청"""
+    rng = random.Random(seed)
+    system_prompts = [_text(rng, system_prompt_words) for _ in range(num_system_prompts)]
+    salt_rng = random.Random(seed + 1)
+    return [
+        f"{_salt(salt_rng, salted)}{system_prompts[i % num_system_prompts]}\n\nUser: {_text(rng, user_words)}\nAssistant:"
+        for i in range(num_prompts)
+    ]
+
+
+def multi_turn_conversation(num_conversations: int = 64, turns: int = 6, turn_words: int = 128,
+                            seed: int = 0, salted: bool = False) -> List[str]:
+    """
+    대화 턴마다 이전 대화 전체를 prefix로 다시 보내는 요청
+
+    여러 대화를 턴 단위로 번갈아 보내므로 캐시가 동시에 num_conversations개의 대화를 유지해야 적중한다.
+    """
+    rng = random.Random(seed)
+    salt_rng = random.Random(seed + 1)
+    histories = ["" for _ in range(num_conversations)]
+    prompts = []
+    for _ in range(turns):
+        for index in range(num_conversations):
+            histories[index] += f"User: {_text(rng, turn_words)}\nAssistant: {_text(rng, turn_words // 2)}\n"
+            prompts.append(f"{_salt(salt_rng, salted)}{histories[index]}User: {_text(rng, turn_words)}\nAssistant:")
+    return prompts
+
+
+def rag_long_context(num_prompts: int = 256, num_documents: int = 32, document_words: int = 1024,
+                     documents_per_prompt: int = 4, question_words: int = 48, seed: int = 0,
+                     salted: bool = False) -> List[str]:
+    """
+    문서 풀에서 뽑은 긴 문서 여러 개 + 질문으로 구성된 RAG 형태 요청
+
+    문서를 ID 순으로 배치하므로 앞쪽 문서가 같은 요청끼리만 prefix를 공유한다 (부분 겹침).
+    """
+    rng = random.Random(seed)
+    salt_rng = random.Random(seed + 1)
+    documents = [_text(rng, document_words) for _ in range(num_documents)]
+    prompts = []
+    for _ in range(num_prompts):
+        chosen = sorted(rng.sample(range(num_documents), documents_per_prompt))
+        context = "\n\n".join(f"[Document {i}]\n{documents[i]}" for i in chosen)
+        prompts.append(f"{_salt(salt_rng, salted)}{context}\n\nQuestion: {_text(rng, question_words)}\nAnswer:")
+    return prompts
+
+
+SCENARIOS: Dict[str, Callable[..., List[str]]] = {
+    "shared_system_prompt": shared_system_prompt,
+    "multi_turn_conversation": multi_turn_conversation,
+    "rag_long_context": rag_long_context,
+}
+
+
+@dataclass
+class ScenarioSpec:
+    name: str
+    params: Dict = field(default_factory=dict)
+
+    def build(self, salted: bool = False) -> List[str]:
+        if self.name not in SCENARIOS:
+            raise Exception(f"Unknown prefix cache scenario: {self.name}")
+        return SCENARIOS[self.name](**self.params, salted=salted)
+
+
+def prefix_cache_hit_rate(server_metrics: ServerMetrics) -> Optional[float]:
+    """실행 구간의 prefix cache 적중률 (v1 카운터 증가분, 없으면 v0 적중률 게이지 평균)"""
+    queries = server_metrics.counter_delta("prefix_cache_queries")
+    hits = server_metrics.counter_delta("prefix_cache_hits")
+    # 적중 카운터가 한 번도 수집되지 않았으면 (스크레이프 실패 등) 게이지로 대체
+    if queries and hits is not None:
+        return hits / queries
+    summary = server_metrics.summary().get("prefix_cache_hit_rate")
+    return summary["mean"] if summary else None
+
+
+class PrefixCacheBenchmark:
+    """
+    prefix/KV 캐시 효율 측정
+
+    같은 시나리오를 캐시 적중 가능(원본)과 캐시 미적중(대조군)으로 한 번씩 실행해
+    처리량/TTFT 차이와 캐시 적중률을 benchmark_prefix_cache에 저장한다.
+    대조군은 no_cache_base_url(prefix caching을 끈 서버)이 있으면 같은 프롬프트를 그 서버로 보내고,
+    없으면 같은 서버에 프롬프트마다 고유 salt를 앞에 붙여 공유 prefix를 없앤 요청을 보낸다.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.collection = tracker.db.benchmark_prefix_cache
+
+    async def _run(self, model_name: str, prompts: List[str], base_url: str) -> Dict:
+        config = replace(self.tracker.load_generator.config, base_url=base_url)
+        load_generator = LoadGenerator(config)
+        sampler = ServerMetricsSampler([f"{base_url.rstrip('/')}/metrics"], self.tracker.metrics_interval_s)
+        sampler.start()
+        try:
+            report: LoadTestReport = await load_generator.run(model_name, prompts)
+        finally:
+            server_metrics = await sampler.stop()
+            await load_generator.close()
+        if not report.completed_requests:
+            raise Exception(f"Benchmark failed: all {report.num_requests} requests to {model_name} failed")
+        return {
+            "throughput_tokens_per_sec": report.throughput_tokens_per_sec,
+            "num_requests": report.num_requests,
+            "failed_requests": report.failed_requests,
+            "total_prompt_tokens": report.total_prompt_tokens,
+            "ttft_percentiles": report.ttft.percentiles(),
+            "latency_percentiles": report.e2e_latency.percentiles(),
+            "prefix_cache_hit_rate": prefix_cache_hit_rate(server_metrics),
+            "server_metrics": server_metrics.summary(),
+        }
+
+    async def run(self, model_name: str, scenario: ScenarioSpec, hardware: str = "unknown",
+                  no_cache_base_url: Optional[str] = None, github_commit_sha: Optional[str] = None) -> Dict:
+        """
+        시나리오 실행
+
+        Returns:
+            Dict: cached/uncached 측정값과 throughput_delta(상대 변화), ttft_p50_delta
+        """
+        base_url = self.tracker.load_generator.config.base_url
+        prompts = scenario.build()
+        cached = await self._run(model_name, prompts, base_url)
+        if no_cache_base_url:
+            uncached = await self._run(model_name, prompts, no_cache_base_url)
+        else:
+            uncached = await self._run(model_name, scenario.build(salted=True), base_url)
+
+        def relative(after: float, before: float) -> Optional[float]:
+            return (after - before) / before if before else None
+
+        result = {
+            "model_name": model_name,
+            "hardware": hardware,
+            "github_commit_sha": github_commit_sha,
+            "scenario": scenario.name,
+            "params": scenario.params,
+            "control": "no_cache_server" if no_cache_base_url else "salted_prefix",
+            "cached": cached,
+            "uncached": uncached,
+            "throughput_delta": relative(cached["throughput_tokens_per_sec"], uncached["throughput_tokens_per_sec"]),
+            "ttft_p50_delta": relative(cached["ttft_percentiles"]["p50"], uncached["ttft_percentiles"]["p50"]),
+            "timestamp": datetime.now(),
+        }
+        await self.collection.insert_one(dict(result))
+        logging.info(
+            f"Prefix cache {scenario.name} on {model_name}: hit rate {cached['prefix_cache_hit_rate']}, "
+            f"throughput delta {result['throughput_delta']}"
+        )
+        return result
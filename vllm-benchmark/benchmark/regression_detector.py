@@ -0,0 +1,177 @@
+import math
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from pymongo import DESCENDING
+
+from benchmark.latency_histogram import LatencyHistogram
+
+
+def mann_whitney_greater(sample: LatencyHistogram, baseline: LatencyHistogram) -> Tuple[float, float]:
+    """
+    히스토그램 두 개에 대한 단측 Mann-Whitney U 검정 (sample이 baseline보다 큰지)
+
+    같은 버킷의 값은 동순위(tie)로 처리하고 정규 근사 + tie 보정을 사용한다.
+    원시 샘플 없이 버킷 수에 비례하는 시간에 계산된다.
+
+    Returns:
+        (z 통계량, 단측 p-value)
+    """
+    n1, n2 = sample.count, baseline.count
+    if not n1 or not n2:
+        return 0.0, 1.0
+
+    u = 0.0
+    baseline_below = 0
+    tie_term = 0
+    for index in sorted(set(sample.counts) | set(baseline.counts)):
+        a = sample.counts.get(index, 0)
+        b = baseline.counts.get(index, 0)
+        u += a * (baseline_below + 0.5 * b)
+        baseline_below += b
+        t = a + b
+        tie_term += t ** 3 - t
+
+    total = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return 0.0, 1.0
+    z = (u - mean) / math.sqrt(variance)
+    return z, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class _BaselineWindow:
+    """(모델, 하드웨어)별 최근 window개 실행"""
+
+    def __init__(self, size: int):
+        self.runs: Deque[Tuple[str, float, LatencyHistogram]] = deque(maxlen=size)
+
+    def add(self, commit_sha: str, throughput: float, histogram: LatencyHistogram):
+        self.runs.append((commit_sha, throughput, histogram))
+
+
+class RegressionDetector:
+    """
+    커밋별 성능 회귀 감지기
+
+    새 결과를 같은 모델/하드웨어의 최근 window개 실행(롤링 베이스라인)과 비교한다.
+    지연은 요청 단위 히스토그램에 대한 Mann-Whitney U 검정, 처리량은 베이스라인 대비 z-score로 판정하며,
+    통계적으로 유의하고 상대 변화가 min_relative_change 이상일 때만 회귀로 기록한다.
+    베이스라인은 프로세스 내 메모리에 유지되어 결과 1건당 O(window)로 동작하고,
+    처음 보는 (모델, 하드웨어)에 대해서만 MongoDB에서 최근 window개를 한 번 읽어 온다.
+    """
+
+    def __init__(self, results_collection, verdicts_collection, window: int = 20,
+                 min_baseline_runs: int = 3, alpha: float = 0.01, min_relative_change: float = 0.05,
+                 throughput_z_threshold: float = 3.0):
+        self.results_collection = results_collection
+        self.verdicts_collection = verdicts_collection
+        self.window = window
+        self.min_baseline_runs = min_baseline_runs
+        self.alpha = alpha
+        self.min_relative_change = min_relative_change
+        self.throughput_z_threshold = throughput_z_threshold
+        self._baselines: Dict[Tuple[str, str], _BaselineWindow] = {}
+
+    async def ensure_indexes(self):
+        await self.verdicts_collection.create_index([
+            ("model_name", 1),
+            ("hardware", 1),
+            ("timestamp", DESCENDING)
+        ])
+        await self.verdicts_collection.create_index([("github_commit_sha", 1)])
+
+    async def _get_baseline(self, model_name: str, hardware: str) -> _BaselineWindow:
+        key = (model_name, hardware)
+        baseline = self._baselines.get(key)
+        if baseline is not None:
+            return baseline
+
+        baseline = _BaselineWindow(self.window)
+        cursor = self.results_collection.find(
+            # bisect/임시 실행 결과(baseline_eligible=False)는 베이스라인에서 제외
+            {"metadata.model_name": model_name, "metadata.hardware": hardware, "baseline_eligible": {"$ne": False}},
+            {"metadata.github_commit_sha": 1, "throughput_tokens_per_sec": 1, "histograms.e2e_latency": 1}
+        ).sort("timestamp", DESCENDING).limit(self.window)
+        documents = await cursor.to_list(length=self.window)
+        for document in reversed(documents):
+            histogram = (document.get("histograms") or {}).get("e2e_latency")
+            baseline.add(
+                document["metadata"]["github_commit_sha"],
+                document["throughput_tokens_per_sec"],
+                LatencyHistogram.from_document(histogram) if histogram else LatencyHistogram()
+            )
+        self._baselines[key] = baseline
+        return baseline
+
+    def _compare_latency(self, histogram: LatencyHistogram, runs: List) -> Dict:
+        merged = LatencyHistogram(histogram.precision_bits)
+        for _, _, run_histogram in runs:
+            merged.merge(run_histogram)
+
+        z, p_value = mann_whitney_greater(histogram, merged)
+        baseline_p50 = merged.percentile(50)
+        current_p50 = histogram.percentile(50)
+        relative_change = (current_p50 - baseline_p50) / baseline_p50 if baseline_p50 else 0.0
+        return {
+            "baseline_p50_ms": baseline_p50,
+            "current_p50_ms": current_p50,
+            "baseline_p99_ms": merged.percentile(99),
+            "current_p99_ms": histogram.percentile(99),
+            "relative_change": relative_change,
+            "z": z,
+            "p_value": p_value,
+            "regressed": p_value < self.alpha and relative_change >= self.min_relative_change,
+        }
+
+    def _compare_throughput(self, throughput: float, runs: List) -> Dict:
+        values = [run_throughput for _, run_throughput, _ in runs]
+        mean = sum(values) / len(values)
+        std = math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1)) if len(values) > 1 else 0.0
+        relative_change = (throughput - mean) / mean if mean else 0.0
+        # 베이스라인 편차가 0에 가까우면 상대 변화만으로 판정
+        z = (throughput - mean) / std if std > 0 else (-math.inf if relative_change < 0 else 0.0)
+        return {
+            "baseline_mean": mean,
+            "baseline_std": std,
+            "current": throughput,
+            "relative_change": relative_change,
+            "z": z if math.isfinite(z) else None,
+            "regressed": z <= -self.throughput_z_threshold and relative_change <= -self.min_relative_change,
+        }
+
+    async def evaluate(self, model_name: str, hardware: str, github_commit_sha: str,
+                       throughput: float, latency_histogram: LatencyHistogram,
+                       timestamp: Optional[datetime] = None) -> Dict:
+        """
+        새 결과를 베이스라인과 비교해 판정 문서를 저장하고, 결과를 베이스라인 윈도우에 추가
+
+        Returns:
+            Dict: 판정 문서 (verdict: regression / ok / insufficient_baseline)
+        """
+        baseline = await self._get_baseline(model_name, hardware)
+        # 같은 커밋의 반복 측정은 베이스라인에서 제외 (자기 자신과 비교 방지)
+        runs = [run for run in baseline.runs if run[0] != github_commit_sha]
+
+        verdict = {
+            "model_name": model_name,
+            "hardware": hardware,
+            "github_commit_sha": github_commit_sha,
+            "timestamp": timestamp or datetime.now(),
+            "baseline_runs": len(runs),
+            "baseline_commits": sorted({run[0] for run in runs}),
+        }
+
+        if len(runs) < self.min_baseline_runs:
+            verdict["verdict"] = "insufficient_baseline"
+        else:
+            verdict["latency"] = self._compare_latency(latency_histogram, runs)
+            verdict["throughput"] = self._compare_throughput(throughput, runs)
+            regressed = verdict["latency"]["regressed"] or verdict["throughput"]["regressed"]
+            verdict["verdict"] = "regression" if regressed else "ok"
+
+        baseline.add(github_commit_sha, throughput, latency_histogram)
+        await self.verdicts_collection.insert_one(dict(verdict))
+        return verdict
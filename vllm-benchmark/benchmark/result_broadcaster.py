@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+
+class ResultSubscription:
+    """구독자별 bounded 큐
+
+    큐가 가득 차면 가장 오래된 이벤트를 버리고 새 이벤트를 넣어(coalesce) 최신 상태를 유지한다.
+    연속으로 max_dropped개 이상 버려지면 따라오지 못하는 구독자로 보고 연결을 끊는다.
+    """
+
+    def __init__(self, model_name: Optional[str], max_queue_size: int, max_dropped: int):
+        self.model_name = model_name
+        self.max_dropped = max_dropped
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, event: Dict):
+        """이벤트를 대기 없이 넣음 (발행자를 절대 막지 않음)"""
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped >= self.max_dropped:
+                self.close()
+                return
+        else:
+            self.dropped = 0
+        self.queue.put_nowait(event)
+
+    def close(self):
+        """구독 종료 (대기 중인 이벤트를 비우고 종료 신호 None 전달)"""
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[Dict]:
+        """다음 이벤트, 구독이 끊기면 None"""
+        return await self.queue.get()
+
+
+class ResultBroadcaster:
+    """저장된 벤치마크 결과를 구독자들에게 팬아웃하는 프로세스 내 pub/sub"""
+
+    def __init__(self, max_queue_size: int = 100, max_dropped: int = 1000):
+        self.max_queue_size = max_queue_size
+        self.max_dropped = max_dropped
+        self._subscriptions: Set[ResultSubscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, model_name: Optional[str] = None) -> ResultSubscription:
+        subscription = ResultSubscription(model_name, self.max_queue_size, self.max_dropped)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ResultSubscription):
+        self._subscriptions.discard(subscription)
+        subscription.close()
+
+    def publish(self, event: Dict):
+        """모든 (모델 필터가 맞는) 구독자에게 이벤트 전달"""
+        for subscription in list(self._subscriptions):
+            if subscription.model_name and subscription.model_name != event.get("model_name"):
+                continue
+            subscription.offer(event)
+            if subscription.closed:
+                logging.warning(f"Dropping slow benchmark stream subscriber ({subscription.dropped} events behind)")
+                self._subscriptions.discard(subscription)
+
+    async def _tail(self, events_collection, skip_origin: Optional[str]):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        while True:
+            try:
+                async with events_collection.watch(pipeline) as stream:
+                    async for change in stream:
+                        event = change["fullDocument"]
+                        if skip_origin is not None and event.get("origin") == skip_origin:
+                            continue  # 이 프로세스가 저장한 결과는 이미 직접 발행됨
+                        event.pop("_id", None)
+                        event.pop("origin", None)
+                        self.publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Benchmark event change stream failed, reconnecting: {e}")
+                await asyncio.sleep(1.0)
+
+    def start_change_stream(self, events_collection, skip_origin: Optional[str] = None):
+        """다른 레플리카가 저장한 결과도 받도록 이벤트 컬렉션의 change stream을 구독"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._tail(events_collection, skip_origin))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for subscription in list(self._subscriptions):
+            self.unsubscribe(subscription)
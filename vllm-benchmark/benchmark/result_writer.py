@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class BufferedResultWriter:
+    """
+    MongoDB write-behind 버퍼
+
+    write()는 문서를 메모리 큐에 넣고 바로 반환하며, 백그라운드 플러셔가
+    max_batch_size개가 모이거나 flush_interval_s가 지나면 insert_many(ordered=False)로 한 번에 저장한다.
+    큐 크기가 max_pending으로 제한되어 있어 MongoDB가 느려지면 write()가 대기하며 생산자를 늦춘다.
+    on_flush가 주어지면 배치 중 실제로 저장된 문서만으로 호출된다.
+
+    time-series 컬렉션은 _id 유일성을 보장하지 않으므로, 결과가 불확실한 오류 뒤 재시도할 때는
+    미리 부여한 _id로 이미 저장된 문서를 확인하고 나머지만 다시 저장한다.
+    time_field를 주면 그 확인 조회를 배치의 시간 범위로 좁힌다.
+    insert_time_field를 주면 각 문서에 실제 저장을 시도한 시각을 기록한다 (저장 순서 기준 증분 조회용).
+    """
+
+    def __init__(self, collection, max_batch_size: int = 500, flush_interval_s: float = 1.0,
+                 max_pending: int = 10000, max_retries: int = 5,
+                 on_flush: Optional[Callable[[List[Dict]], Awaitable[None]]] = None,
+                 time_field: Optional[str] = None, insert_time_field: Optional[str] = None):
+        self.collection = collection
+        self.on_flush = on_flush
+        self.time_field = time_field
+        self.insert_time_field = insert_time_field
+        self.max_batch_size = max_batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_retries = max_retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, document: Dict):
+        """문서를 버퍼에 추가 (버퍼가 가득 차면 공간이 생길 때까지 대기)"""
+        self._ensure_started()
+        await self._queue.put(document)
+
+    async def flush(self):
+        """
+        현재까지 버퍼에 들어온 문서가 모두 저장될 때까지 대기
+
+        Raises:
+            Exception: 남은 문서가 있는데 플러셔가 종료된 경우 (무한 대기 대신 즉시 실패)
+        """
+        if self._task is None:
+            return
+        joined = asyncio.ensure_future(self._queue.join())
+        try:
+            await asyncio.wait({joined, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopped = not joined.done()
+            joined.cancel()
+        if stopped:
+            error = None if self._task.cancelled() else self._task.exception()
+            raise Exception(f"Benchmark result flusher stopped with {self._queue.qsize()} results pending") from error
+
+    async def close(self):
+        """남은 문서를 모두 저장한 뒤 플러셔 종료"""
+        try:
+            await self.flush()
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+                self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_s
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                stored = await self._insert_batch(batch)
+                if stored and self.on_flush is not None:
+                    try:
+                        await self.on_flush(stored)
+                    except Exception as e:
+                        logging.error(f"Benchmark result flush callback failed: {e}")
+            except Exception as e:
+                # 저장할 수 없는 문서(InvalidDocument 등) 때문에 플러셔가 죽지 않도록 해당 배치만 버림
+                logging.error(f"Dropping {len(batch)} benchmark results: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _already_stored(self, documents: List[Dict]) -> set:
+        """이전 시도에서 이미 저장된 문서의 _id"""
+        query: Dict = {"_id": {"$in": [document["_id"] for document in documents]}}
+        if self.time_field is not None:
+            times = [document[self.time_field] for document in documents]
+            query[self.time_field] = {"$gte": min(times), "$lte": max(times)}
+        return {document["_id"] async for document in self.collection.find(query, {"_id": 1})}
+
+    async def _insert_batch(self, batch: List[Dict]) -> List[Dict]:
+        """배치 저장, 일시적 오류는 지수 백오프로 재시도 (실제로 저장된 문서 리스트 반환)"""
+        for document in batch:
+            document.setdefault("_id", ObjectId())
+        pending = batch
+        stored: List[Dict] = []
+        for attempt in range(self.max_retries + 1):
+            try:
+                if attempt:
+                    # 직전 오류가 응답 유실 등으로 모호하면 일부/전체가 이미 저장됐을 수 있음
+                    existing = await self._already_stored(pending)
+                    stored.extend(document for document in pending if document["_id"] in existing)
+                    pending = [document for document in pending if document["_id"] not in existing]
+                    if not pending:
+                        return stored
+                if self.insert_time_field is not None:
+                    inserted_at = datetime.now()
+                    for document in pending:
+                        document[self.insert_time_field] = inserted_at
+                await self.collection.insert_many(pending, ordered=False)
+                return stored + pending
+            except BulkWriteError as e:
+                # ordered=False라 writeErrors에 없는 문서는 저장됨 (중복 키 등 개별 실패만 기록)
+                errors = e.details.get("writeErrors", [])
+                failed = {error["index"] for error in errors}
+                logging.error(f"Benchmark result batch partially failed: {len(failed)}/{len(pending)} documents")
+                return stored + [document for index, document in enumerate(pending) if index not in failed]
+            except PyMongoError as e:
+                if attempt == self.max_retries:
+                    logging.error(f"Dropping {len(pending)} benchmark results after {attempt + 1} attempts: {e}")
+                    return stored
+                delay = min(2 ** attempt * 0.1, 5.0)
+                logging.warning(f"Benchmark result batch insert failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return stored
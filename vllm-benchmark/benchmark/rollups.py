@@ -0,0 +1,267 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, ReplaceOne
+
+from benchmark.latency_histogram import LatencyHistogram
+
+ROLLUP_GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# 저장 시각이 커밋 순서와 어긋나는 경우(동시 플러시)를 흡수하도록 워터마크 이전을 다시 훑는 폭
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+# hardware 없이 (model_name, bucket_start)로 집계하던 이전 롤업의 유일 인덱스
+LEGACY_ROLLUP_INDEX = "model_name_1_bucket_start_1"
+
+
+def truncate_timestamp(timestamp: datetime, granularity: str) -> datetime:
+    """타임스탬프를 롤업 구간 시작 시각으로 내림"""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+
+def _contiguous_ranges(bucket_starts: List[datetime], step: timedelta) -> List[Tuple[datetime, datetime]]:
+    """정렬된 구간 시작 시각들을 연속된 [start, end) 범위로 묶음"""
+    ranges: List[Tuple[datetime, datetime]] = []
+    for bucket_start in bucket_starts:
+        if ranges and ranges[-1][1] == bucket_start:
+            ranges[-1] = (ranges[-1][0], bucket_start + step)
+        else:
+            ranges.append((bucket_start, bucket_start + step))
+    return ranges
+
+
+class _RollupAccumulator:
+    """
+    한 (모델, 하드웨어, 구간)에 대한 집계 상태
+
+    실행별 처리량은 개수와 무관하게 크기가 고정된 히스토그램에 기록한다
+    (LatencyHistogram을 값 단위만 tokens/sec로 바꿔 사용, 분위수 상대 오차 0.4% 이내).
+    """
+
+    def __init__(self):
+        self.run_count = 0
+        self.throughput_sum = 0.0
+        self.throughput_min: Optional[float] = None
+        self.throughput_max: Optional[float] = None
+        self.throughput_histogram = LatencyHistogram()
+        self.latency_sum = 0.0
+        self.latency_min: Optional[float] = None
+        self.latency_max: Optional[float] = None
+        self.latency_histogram = LatencyHistogram()
+
+    def add_run(self, document: Dict):
+        latency = document["latency_ms"]
+        throughput = document["throughput_tokens_per_sec"]
+        self.run_count += 1
+        self._add_throughput(throughput, throughput, throughput)
+        self.throughput_histogram.record(throughput)
+        self._add_latency(latency, latency, latency)
+        histogram = (document.get("histograms") or {}).get("e2e_latency")
+        if histogram:
+            self.latency_histogram.merge(LatencyHistogram.from_document(histogram))
+
+    def add_rollup(self, document: Dict):
+        self.run_count += document["run_count"]
+        throughput = document["throughput_tokens_per_sec"]
+        self._add_throughput(throughput["mean"] * document["run_count"], throughput["min"], throughput["max"])
+        self.throughput_histogram.merge(LatencyHistogram.from_document(document["throughput_histogram"]))
+        latency = document["latency_ms"]
+        self._add_latency(latency["mean"] * document["run_count"], latency["min"], latency["max"])
+        self.latency_histogram.merge(LatencyHistogram.from_document(document["latency_histogram"]))
+
+    def _add_throughput(self, total: float, minimum: float, maximum: float):
+        self.throughput_sum += total
+        self.throughput_min = minimum if self.throughput_min is None else min(self.throughput_min, minimum)
+        self.throughput_max = maximum if self.throughput_max is None else max(self.throughput_max, maximum)
+
+    def _add_latency(self, total: float, minimum: float, maximum: float):
+        self.latency_sum += total
+        self.latency_min = minimum if self.latency_min is None else min(self.latency_min, minimum)
+        self.latency_max = maximum if self.latency_max is None else max(self.latency_max, maximum)
+
+    def to_document(self, model_name: str, hardware: str, granularity: str, bucket_start: datetime) -> Dict:
+        return {
+            "model_name": model_name,
+            "hardware": hardware,
+            "granularity": granularity,
+            "bucket_start": bucket_start,
+            "run_count": self.run_count,
+            "throughput_tokens_per_sec": {
+                "min": self.throughput_min,
+                "max": self.throughput_max,
+                "mean": self.throughput_sum / self.run_count,
+                "p50": self.throughput_histogram.percentile(50),
+                "p90": self.throughput_histogram.percentile(90),
+                "p99": self.throughput_histogram.percentile(99),
+            },
+            "latency_ms": {
+                "min": self.latency_min,
+                "max": self.latency_max,
+                "mean": self.latency_sum / self.run_count,
+                # 실행 평균이 아닌 요청 단위 꼬리 지연 (히스토그램 병합 결과)
+                **self.latency_histogram.percentiles(),
+            },
+            # 상위 구간(일 단위) 롤업을 원본 재조회 없이 만들기 위한 병합 가능 상태
+            "throughput_histogram": self.throughput_histogram.to_document(),
+            "latency_histogram": self.latency_histogram.to_document(),
+            "updated_at": datetime.now(),
+        }
+
+
+class BenchmarkRollupJob:
+    """
+    벤치마크 결과의 시간/일 단위 다운샘플링 롤업 작업
+
+    시간 단위 롤업은 원본 time-series 컬렉션에서, 일 단위 롤업은 시간 단위 롤업에서 계산하며
+    (model_name, hardware, bucket_start) 기준 upsert라 같은 구간을 여러 번 돌려도 결과가 같다.
+    bisect/임시 실행(baseline_eligible=False)은 정기 실행 추세를 흐리지 않도록 집계하지 않는다.
+    어느 구간을 다시 계산할지는 benchmark_rollup_state에 저장한 inserted_at 워터마크 이후
+    저장된 결과로 정하므로, 오래 걸려 한참 지난 구간에 늦게 저장된 실행도 반영된다.
+    """
+
+    def __init__(self, db, raw_collection):
+        self.raw_collection = raw_collection
+        self.collections = {
+            "hour": db.benchmark_rollups_hourly,
+            "day": db.benchmark_rollups_daily,
+        }
+        self.state_collection = db.benchmark_rollup_state
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_indexes(self):
+        for collection in self.collections.values():
+            if LEGACY_ROLLUP_INDEX in await collection.index_information():
+                # 하드웨어 구분 없이 섞인 이전 롤업은 버리고 워터마크를 지워 처음부터 다시 집계
+                await collection.drop_index(LEGACY_ROLLUP_INDEX)
+                await collection.delete_many({"hardware": {"$exists": False}})
+                await self.state_collection.delete_one({"_id": "raw"})
+            await collection.create_index(
+                [("model_name", ASCENDING), ("hardware", ASCENDING), ("bucket_start", ASCENDING)], unique=True
+            )
+
+    async def rollup_hours(self, start: datetime, end: datetime) -> int:
+        """[start, end) 구간의 원본 결과를 시간 단위로 집계"""
+        start = truncate_timestamp(start, "hour")
+        accumulators: Dict[tuple, _RollupAccumulator] = {}
+        cursor = self.raw_collection.find(
+            {"timestamp": {"$gte": start, "$lt": end}, "baseline_eligible": {"$ne": False}},
+            {
+                "_id": 0,
+                "metadata.model_name": 1,
+                "metadata.hardware": 1,
+                "timestamp": 1,
+                "throughput_tokens_per_sec": 1,
+                "latency_ms": 1,
+                "histograms.e2e_latency": 1,
+            },
+        )
+        async for document in cursor:
+            metadata = document["metadata"]
+            key = (
+                metadata["model_name"],
+                metadata.get("hardware", "unknown"),
+                truncate_timestamp(document["timestamp"], "hour"),
+            )
+            accumulators.setdefault(key, _RollupAccumulator()).add_run(document)
+
+        return await self._write("hour", accumulators)
+
+    async def rollup_days(self, start: datetime, end: datetime) -> int:
+        """[start, end) 구간의 시간 단위 롤업을 일 단위로 집계"""
+        start = truncate_timestamp(start, "day")
+        accumulators: Dict[tuple, _RollupAccumulator] = {}
+        cursor = self.collections["hour"].find({"bucket_start": {"$gte": start, "$lt": end}})
+        async for document in cursor:
+            key = (document["model_name"], document["hardware"], truncate_timestamp(document["bucket_start"], "day"))
+            accumulators.setdefault(key, _RollupAccumulator()).add_rollup(document)
+
+        return await self._write("day", accumulators)
+
+    async def _write(self, granularity: str, accumulators: Dict[tuple, _RollupAccumulator]) -> int:
+        if not accumulators:
+            return 0
+        operations = [
+            ReplaceOne(
+                {"model_name": model_name, "hardware": hardware, "bucket_start": bucket_start},
+                accumulator.to_document(model_name, hardware, granularity, bucket_start),
+                upsert=True,
+            )
+            for (model_name, hardware, bucket_start), accumulator in accumulators.items()
+        ]
+        await self.collections[granularity].bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def _changed_hours(self, watermark: Optional[datetime]) -> Tuple[List[datetime], Optional[datetime]]:
+        """워터마크 이후 저장된 결과가 속한 시간 구간들과 그중 가장 늦은 inserted_at (워터마크가 없으면 전체)"""
+        query = {} if watermark is None else {"inserted_at": {"$gt": watermark - WATERMARK_OVERLAP}}
+        hours: Set[datetime] = set()
+        latest = watermark
+        async for document in self.raw_collection.find(query, {"_id": 0, "timestamp": 1, "inserted_at": 1}):
+            hours.add(truncate_timestamp(document["timestamp"], "hour"))
+            inserted_at = document.get("inserted_at")
+            if inserted_at is not None and (latest is None or inserted_at > latest):
+                latest = inserted_at
+        return sorted(hours), latest
+
+    async def run_once(self) -> int:
+        """
+        마지막 실행 이후 저장된 결과가 속한 시간/일 구간만 다시 집계 (첫 실행은 전체 백필)
+
+        Returns:
+            int: 다시 집계한 시간 구간 수
+        """
+        state = await self.state_collection.find_one({"_id": "raw"})
+        watermark = state["inserted_at"] if state else None
+        hours, latest = await self._changed_hours(watermark)
+        for start, end in _contiguous_ranges(hours, ROLLUP_GRANULARITIES["hour"]):
+            await self.rollup_hours(start, end)
+        days = sorted({truncate_timestamp(hour, "day") for hour in hours})
+        for start, end in _contiguous_ranges(days, ROLLUP_GRANULARITIES["day"]):
+            await self.rollup_days(start, end)
+        # 집계가 끝난 뒤에만 워터마크를 올려 중간에 실패하면 다음 실행에서 다시 계산
+        if latest is not None and latest != watermark:
+            await self.state_collection.update_one(
+                {"_id": "raw"}, {"$max": {"inserted_at": latest}}, upsert=True
+            )
+        return len(hours)
+
+    async def _loop(self, interval_s: float):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logging.error(f"Benchmark rollup failed: {e}")
+            await asyncio.sleep(interval_s)
+
+    def start(self, interval_s: float = 300.0):
+        """백그라운드 롤업 시작"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(interval_s))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get_rollups(self, model_name: str, granularity: str, start: datetime,
+                          end: Optional[datetime] = None, hardware: Optional[str] = None) -> List[Dict]:
+        """대시보드용 롤업 조회 (hardware가 없으면 하드웨어별 구간을 모두 반환, 병합용 내부 상태 필드는 제외)"""
+        query = {"model_name": model_name, "bucket_start": {"$gte": start}}
+        if end is not None:
+            query["bucket_start"]["$lt"] = end
+        if hardware is not None:
+            query["hardware"] = hardware
+        cursor = self.collections[granularity].find(
+            query, {"_id": 0, "throughput_histogram": 0, "latency_histogram": 0}
+        ).sort([("bucket_start", ASCENDING), ("hardware", ASCENDING)])
+        return [document async for document in cursor]
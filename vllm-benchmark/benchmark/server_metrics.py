@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+# 결과에 저장할 지표: (Prometheus 메트릭 이름 후보, 라벨 간 집계 방식, 단위 배율)
+# vLLM 버전에 따라 이름이 다르므로 먼저 발견된 이름을 사용한다.
+# GPU 메모리/사용률은 vLLM이 노출하지 않으므로 DCGM exporter 메트릭을 사용한다.
+SAMPLED_METRICS: Dict[str, Tuple[Tuple[str, ...], str, float]] = {
+    "kv_cache_usage": (("vllm:kv_cache_usage_perc", "vllm:gpu_cache_usage_perc"), "mean", 1.0),
+    "num_requests_running": (("vllm:num_requests_running",), "sum", 1.0),
+    "num_requests_waiting": (("vllm:num_requests_waiting",), "sum", 1.0),
+    "gpu_memory_used_gb": (("DCGM_FI_DEV_FB_USED",), "sum", 1 / 1024),  # MiB -> GiB
+    "gpu_utilization": (("DCGM_FI_DEV_GPU_UTIL",), "mean", 1.0),
+    # prefix cache: v1은 누적 토큰 카운터 (구간 증가분으로 적중률 계산), v0은 적중률 게이지
+    "prefix_cache_queries": (("vllm:prefix_cache_queries_total",), "sum", 1.0),
+    "prefix_cache_hits": (("vllm:prefix_cache_hits_total",), "sum", 1.0),
+    "prefix_cache_hit_rate": (("vllm:gpu_prefix_cache_hit_rate",), "mean", 1.0),
+}
+
+# 노드의 GPU마다 한 줄씩 나오는 DCGM 지표: gpu_pod가 있으면 그 파드에 할당된 GPU만 집계
+# (DCGM exporter의 Kubernetes 매핑이 GPU를 쓰는 파드 이름을 pod 라벨로 붙임)
+PER_GPU_METRICS = frozenset({"DCGM_FI_DEV_FB_USED", "DCGM_FI_DEV_GPU_UTIL"})
+
+_LABEL_PATTERN = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_prometheus_text(text: str, names: frozenset,
+                          label_filters: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, List[float]]:
+    """
+    Prometheus 텍스트 포맷에서 필요한 메트릭의 값만 추출 (라벨 조합별 값 리스트)
+
+    names에 없는 줄은 이름만 확인하고 건너뛰므로 vLLM의 수백 줄짜리 응답도 가볍게 처리한다.
+    label_filters에 있는 메트릭은 라벨을 파싱해 주어진 라벨 값이 모두 일치하는 줄만 남긴다.
+    """
+    values: Dict[str, List[float]] = {}
+    for line in text.splitlines():
+        if not line or line[0] == "#":
+            continue
+        end = len(line)
+        for separator in ("{", " "):
+            index = line.find(separator)
+            if 0 <= index < end:
+                end = index
+        name = line[:end]
+        if name not in names or end == len(line):
+            continue
+        rest = line[line.rfind("}") + 1:] if line[end] == "{" else line[end:]
+        required = label_filters.get(name) if label_filters else None
+        if required:
+            labels = dict(_LABEL_PATTERN.findall(line[end:len(line) - len(rest)])) if line[end] == "{" else {}
+            if any(labels.get(key) != value for key, value in required.items()):
+                continue
+        try:
+            values.setdefault(name, []).append(float(rest.split()[0]))
+        except (IndexError, ValueError):
+            continue
+    return values
+
+
+@dataclass
+class ServerMetrics:
+    """실행 중 수집한 서버 지표 시계열 (열 단위 저장) 과 요약"""
+    interval_s: float
+    timestamps_s: List[float] = field(default_factory=list)  # 샘플링 시작 기준 경과 시간
+    series: Dict[str, List[Optional[float]]] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for name, points in self.series.items():
+            observed = [value for value in points if value is not None]
+            if observed:
+                summary[name] = {"peak": max(observed), "mean": sum(observed) / len(observed)}
+        return summary
+
+    def peak(self, name: str) -> Optional[float]:
+        return self.summary().get(name, {}).get("peak")
+
+    def counter_delta(self, name: str) -> Optional[float]:
+        """누적 카운터 열의 첫/마지막 관측값 차이 (서버 재시작으로 감소하면 마지막 값)"""
+        observed = [value for value in self.series.get(name, []) if value is not None]
+        if not observed:
+            return None
+        delta = observed[-1] - observed[0]
+        return delta if delta >= 0 else observed[-1]
+
+    def to_document(self) -> Dict:
+        return {
+            "interval_s": self.interval_s,
+            "timestamps_s": self.timestamps_s,
+            "series": self.series,
+            "summary": self.summary(),
+        }
+
+
+class ServerMetricsSampler:
+    """
+    벤치마크 실행 중 /metrics 엔드포인트를 주기적으로 수집하는 백그라운드 샘플러
+
+    엔드포인트별 요청은 병렬로 보내고 응답에서 필요한 메트릭만 파싱한다.
+    수집 실패는 해당 샘플만 건너뛰며 (엔드포인트별 첫 실패만 경고) 벤치마크를 중단하지 않는다.
+    stop()에서 한 번 더 수집하므로 짧은 실행에도 종료 시점 값이 남아 누적 카운터 증가분을 계산할 수 있다.
+    """
+
+    def __init__(self, urls: List[str], interval_s: float = 1.0, timeout_s: float = 2.0,
+                 gpu_pod: Optional[str] = None):
+        """
+        Args:
+            gpu_pod: 지정하면 DCGM GPU 지표를 이 파드에 할당된 GPU만 집계 (없으면 노드의 모든 GPU)
+        """
+        self.urls = urls
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self._names = frozenset(name for candidates, _, _ in SAMPLED_METRICS.values() for name in candidates)
+        self._label_filters = {name: {"pod": gpu_pod} for name in PER_GPU_METRICS} if gpu_pod else None
+        self._start = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._metrics: Optional[ServerMetrics] = None
+        self._failed_urls = set()
+
+    async def _scrape(self, session: aiohttp.ClientSession, url: str) -> Dict[str, List[float]]:
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}")
+                return parse_prometheus_text(await response.text(), self._names, self._label_filters)
+        except Exception as e:
+            if url not in self._failed_urls:
+                self._failed_urls.add(url)
+                logging.warning(f"Metrics scrape failed for {url}: {e}")
+            return {}
+
+    def _record(self, elapsed_s: float, raw: Dict[str, List[float]]):
+        self._metrics.timestamps_s.append(round(elapsed_s, 3))
+        for metric, (candidates, aggregation, scale) in SAMPLED_METRICS.items():
+            values = next((raw[name] for name in candidates if name in raw), None)
+            if values:
+                value = sum(values) if aggregation == "sum" else sum(values) / len(values)
+                value *= scale
+            else:
+                value = None
+            self._metrics.series.setdefault(metric, []).append(value)
+
+    async def _sample(self, session: aiohttp.ClientSession):
+        tick = asyncio.get_running_loop().time()
+        raw: Dict[str, List[float]] = {}
+        for result in await asyncio.gather(*(self._scrape(session, url) for url in self.urls)):
+            for name, values in result.items():
+                raw.setdefault(name, []).extend(values)
+        self._record(tick - self._start, raw)
+
+    def _session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout_s))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        async with self._session() as session:
+            while True:
+                tick = loop.time()
+                await self._sample(session)
+                # 수집 소요 시간과 무관하게 고정 간격 유지
+                await asyncio.sleep(max(0.0, self.interval_s - (loop.time() - tick)))
+
+    def start(self):
+        self._metrics = ServerMetrics(interval_s=self.interval_s)
+        self._failed_urls.clear()
+        self._start = asyncio.get_running_loop().time()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> ServerMetrics:
+        """샘플링 중지 후 종료 시점 값을 한 번 더 수집해 시계열 반환 (수집한 지표가 없는 열은 제외)"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            if self.urls:
+                async with self._session() as session:
+                    await self._sample(session)
+        metrics = self._metrics or ServerMetrics(interval_s=self.interval_s)
+        metrics.series = {
+            name: points for name, points in metrics.series.items()
+            if any(value is not None for value in points)
+        }
+        return metrics
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.mock_vllm_server import create_app  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _serve(app: web.Application):
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server
+
+
+@pytest.fixture
+async def mock_vllm_server():
+    """빠른 mock vLLM 서버 (토큰 200개/초, TTFT 10ms), base URL 반환"""
+    server = await _serve(create_app(tokens_per_sec=200.0, ttft_ms=10.0))
+    yield str(server.make_url("")).rstrip("/")
+    await server.close()
+
+
+@pytest.fixture
+async def slow_vllm_server():
+    """요청당 약 100ms가 걸리는 mock 서버 (동시성 상한에 의한 대기를 만들기 위함)"""
+    server = await _serve(create_app(tokens_per_sec=100.0, ttft_ms=0.0))
+    yield str(server.make_url("")).rstrip("/")
+    await server.close()
+
+
+@pytest.fixture
+async def vllm_only_metrics_server():
+    """DCGM 지표 없이 vLLM 지표만 노출하는 /metrics 엔드포인트"""
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(
+            text='vllm:num_requests_running{model_name="mock"} 3\nvllm:gpu_cache_usage_perc{model_name="mock"} 0.5\n',
+            content_type="text/plain",
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    server = await _serve(app)
+    yield str(server.make_url("/metrics"))
+    await server.close()
+
+
+@pytest.fixture
+def mongo_db():
+    return AsyncMongoMockClient().vllm_benchmark
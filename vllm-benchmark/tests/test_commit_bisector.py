@@ -0,0 +1,109 @@
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark.commit_bisector import BisectRequest, CommitBisector
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """커밋 8개짜리 임시 저장소 (오래된 순 SHA 목록 반환)"""
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", "-C", str(tmp_path), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    git("init", "-q")
+    shas = []
+    for index in range(8):
+        git("commit", "-q", "--allow-empty", "-m", f"commit {index}")
+        shas.append(git("rev-parse", "HEAD"))
+    return str(tmp_path), shas
+
+
+class FakeTracker:
+    """커밋별 처리량을 돌려주고 호출 인자를 기록하는 PerformanceTracker 대역"""
+
+    def __init__(self, db, throughput_by_sha):
+        self.db = db
+        self.collection = db.benchmark_results
+        self.throughput_by_sha = throughput_by_sha
+        self.calls = []
+
+    async def run_benchmark(self, model_name, test_data, hardware="unknown", github_commit_sha=None,
+                            evaluate_regression=True):
+        self.calls.append((github_commit_sha, evaluate_regression))
+        return SimpleNamespace(throughput_tokens_per_sec=self.throughput_by_sha[github_commit_sha])
+
+    def benchmark_config_hash(self, test_dataset):
+        return "config:" + "|".join(test_dataset)
+
+
+async def test_bisect_finds_first_bad_commit(git_repo, mongo_db):
+    repo_path, shas = git_repo
+    first_bad = 5
+    tracker = FakeTracker(mongo_db, {sha: 100.0 if i < first_bad else 60.0 for i, sha in enumerate(shas)})
+    request = BisectRequest(model_name="llama", good_sha=shas[0], bad_sha=shas[-1],
+                            test_dataset=["hello"], repo_path=repo_path, hardware="A100")
+
+    result = await CommitBisector(tracker).run(request)
+
+    assert result.first_bad_sha == shas[first_bad]
+    # 중간 커밋 7개 + good 1개를 모두 측정하지 않고 O(log N)만 실행
+    assert result.runs_executed == len(tracker.calls) <= 5
+    assert all(evaluate_regression is False for _, evaluate_regression in tracker.calls)
+    assert await mongo_db.benchmark_bisections.count_documents({"first_bad_sha": shas[first_bad]}) == 1
+
+
+async def test_bisect_reuses_stored_results(git_repo, mongo_db):
+    repo_path, shas = git_repo
+    tracker = FakeTracker(mongo_db, {sha: 100.0 if i < 3 else 60.0 for i, sha in enumerate(shas)})
+    await mongo_db.benchmark_results.insert_many([
+        {"metadata": {"model_name": "llama", "hardware": "A100", "github_commit_sha": shas[0]},
+         "config_hash": "config:hello", "throughput_tokens_per_sec": 100.0},
+        {"metadata": {"model_name": "llama", "hardware": "A100", "github_commit_sha": shas[-1]},
+         "config_hash": "config:hello", "throughput_tokens_per_sec": 60.0},
+    ])
+    request = BisectRequest(model_name="llama", good_sha=shas[0], bad_sha=shas[-1],
+                            test_dataset=["hello"], repo_path=repo_path, hardware="A100")
+
+    result = await CommitBisector(tracker).run(request)
+
+    assert result.first_bad_sha == shas[3]
+    assert shas[0] not in [sha for sha, _ in tracker.calls]
+    assert shas[-1] not in [sha for sha, _ in tracker.calls]
+    assert sum(step.cached for step in result.steps) == 2
+
+
+async def test_bisect_ignores_results_with_other_config(git_repo, mongo_db):
+    repo_path, shas = git_repo
+    tracker = FakeTracker(mongo_db, {sha: 100.0 if i < 3 else 60.0 for i, sha in enumerate(shas)})
+    # 다른 데이터셋으로 측정한 결과와 해시가 없는 이전 결과는 재사용하지 않음
+    await mongo_db.benchmark_results.insert_many([
+        {"metadata": {"model_name": "llama", "hardware": "A100", "github_commit_sha": shas[0]},
+         "config_hash": "config:other", "throughput_tokens_per_sec": 500.0},
+        {"metadata": {"model_name": "llama", "hardware": "A100", "github_commit_sha": shas[-1]},
+         "throughput_tokens_per_sec": 10.0},
+    ])
+    request = BisectRequest(model_name="llama", good_sha=shas[0], bad_sha=shas[-1],
+                            test_dataset=["hello"], repo_path=repo_path, hardware="A100")
+
+    result = await CommitBisector(tracker).run(request)
+
+    assert result.first_bad_sha == shas[3]
+    assert (result.good_value, result.bad_value) == (100.0, 60.0)
+    assert not any(step.cached for step in result.steps)
+
+
+async def test_bisect_rejects_range_without_regression(git_repo, mongo_db):
+    repo_path, shas = git_repo
+    tracker = FakeTracker(mongo_db, {sha: 100.0 for sha in shas})
+    request = BisectRequest(model_name="llama", good_sha=shas[0], bad_sha=shas[-1],
+                            test_dataset=["hello"], repo_path=repo_path)
+
+    with pytest.raises(Exception, match="No throughput_tokens_per_sec regression"):
+        await CommitBisector(tracker).run(request)
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import benchmark.dataset_loader as dataset_loader
+from benchmark.dataset_loader import DatasetSpec, iter_dataset
+
+pytestmark = pytest.mark.anyio
+
+
+async def _collect(spec: DatasetSpec):
+    return [prompt async for prompt in iter_dataset(spec)]
+
+
+@pytest.fixture
+def jsonl_path(tmp_path):
+    path = tmp_path / "prompts.jsonl"
+    path.write_text("".join(json.dumps({"prompt": f"prompt-{i}", "id": i}) + "\n" for i in range(20)))
+    return str(path)
+
+
+async def test_jsonl_shards_filters_and_limits(jsonl_path):
+    shard = await _collect(DatasetSpec(uri=jsonl_path, shard_index=1, num_shards=4))
+    limited = await _collect(DatasetSpec(uri=f"file://{jsonl_path}", min_length=9, max_prompts=3))
+
+    assert shard == [f"prompt-{i}" for i in range(1, 20, 4)]
+    # 길이 9 이상(두 자리 번호)만 남기고 3개까지
+    assert limited == ["prompt-10", "prompt-11", "prompt-12"]
+
+
+async def test_shuffle_is_reproducible_permutation(jsonl_path):
+    first = await _collect(DatasetSpec(uri=jsonl_path, shuffle_seed=3, shuffle_buffer_size=5))
+    second = await _collect(DatasetSpec(uri=jsonl_path, shuffle_seed=3, shuffle_buffer_size=5))
+
+    assert first == second
+    assert sorted(first) == sorted(f"prompt-{i}" for i in range(20))
+    assert first != [f"prompt-{i}" for i in range(20)]
+
+
+async def test_sharegpt_uses_first_user_turn(tmp_path):
+    path = tmp_path / "conversations.json"
+    path.write_text(json.dumps([
+        {"conversations": [{"from": "system", "value": "be nice"}, {"from": "human", "value": "hi"}]},
+        {"messages": [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hey"}]},
+        {"conversations": [{"from": "gpt", "value": "no user turn"}]},
+    ], indent=2))
+
+    assert await _collect(DatasetSpec(uri=str(path))) == ["hi", "hello"]
+
+
+async def test_remote_jsonl_is_streamed():
+    body = "".join(json.dumps({"text": f"remote-{i}"}) + "\n" for i in range(5))
+
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        # 줄 중간에서 잘린 조각으로 전송
+        for start in range(0, len(body), 7):
+            await response.write(body[start:start + 7].encode())
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/prompts.jsonl", handler)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    try:
+        spec = DatasetSpec(uri=str(server.make_url("/prompts.jsonl")), prompt_field="text")
+        assert await _collect(spec) == [f"remote-{i}" for i in range(5)]
+    finally:
+        await server.close()
+
+
+async def test_cancel_waits_for_in_flight_read_before_closing(jsonl_path, monkeypatch):
+    reading = threading.Event()
+    release = threading.Event()
+    events = []
+
+    def slow_batches(path, spec, dataset_format, batch_size):
+        try:
+            yield [{"prompt": "first"}]
+            reading.set()
+            release.wait(timeout=5.0)
+            events.append("read finished")
+            yield [{"prompt": "second"}]
+        finally:
+            events.append("closed")
+
+    monkeypatch.setattr(dataset_loader, "_read_local_batches", slow_batches)
+    prompts = iter_dataset(DatasetSpec(uri=jsonl_path))
+
+    async def consume():
+        return [prompt async for prompt in prompts]
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.to_thread(reading.wait, 5.0)
+    consumer.cancel()
+    await asyncio.sleep(0.05)
+    release.set()
+
+    # 진행 중인 next()가 끝난 뒤에야 제너레이터를 닫으므로 ValueError 없이 취소됨
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    assert events == ["read finished", "closed"]
@@ -0,0 +1,82 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import benchmark.dataset_preparation as dataset_preparation
+from benchmark.dataset_loader import DatasetSpec, iter_dataset
+from benchmark.dataset_preparation import DatasetPreparer
+
+pytestmark = pytest.mark.anyio
+
+PROMPTS = ["one", "one two", "one two three", "a b c d", "x"]
+
+
+class WhitespaceTokenizer:
+    """공백 기준으로 나누는 transformers 토크나이저 대역"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, prompts, add_special_tokens=False):
+        self.calls += 1
+        return {"input_ids": [prompt.split() for prompt in prompts]}
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    tokenizer = WhitespaceTokenizer()
+    monkeypatch.setattr(dataset_preparation, "_tokenizer", tokenizer)
+    return tokenizer
+
+
+@pytest.fixture
+def preparer(tmp_path, tokenizer, monkeypatch):
+    # 프로세스 풀 대신 같은 프로세스의 스레드에서 대역 토크나이저 사용
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(DatasetPreparer, "_executor", lambda self, tokenizer_name: executor)
+    yield DatasetPreparer(cache_dir=str(tmp_path / "cache"), max_workers=1, chunk_size=2)
+    executor.shutdown()
+
+
+@pytest.fixture
+def dataset_spec(tmp_path) -> DatasetSpec:
+    path = tmp_path / "prompts.jsonl"
+    path.write_text("".join(json.dumps({"prompt": prompt}) + "\n" for prompt in PROMPTS))
+    return DatasetSpec(uri=str(path))
+
+
+async def test_prepare_counts_tokens_and_caches(preparer, tokenizer):
+    prepared = await preparer.prepare("fake-tokenizer", PROMPTS)
+    try:
+        assert list(prepared.token_counts) == [1, 2, 3, 4, 1]
+        assert list(prepared.char_lengths) == [len(prompt) for prompt in PROMPTS]
+    finally:
+        prepared.close()
+    calls = tokenizer.calls
+
+    (await preparer.prepare("fake-tokenizer", PROMPTS)).close()
+    assert tokenizer.calls == calls
+
+
+async def test_prepare_stream_tokenizes_in_order_and_shares_cache(preparer, tokenizer, dataset_spec):
+    prepared = await preparer.prepare_stream("fake-tokenizer", lambda: iter_dataset(dataset_spec))
+    try:
+        # chunk_size=2, 동시 청크 2개: 완료 순서와 무관하게 원래 순서 유지
+        assert list(prepared.token_counts) == [1, 2, 3, 4, 1]
+        assert prepared.token_length_summary()["total"] == 11
+    finally:
+        prepared.close()
+    assert tokenizer.calls == 3
+
+    # 같은 내용의 리스트 데이터셋과 캐시 키가 같음
+    (await preparer.prepare("fake-tokenizer", PROMPTS)).close()
+    assert tokenizer.calls == 3
+
+
+async def test_prepare_stream_rejects_empty_dataset(preparer, tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_text("")
+
+    with pytest.raises(Exception, match="empty dataset"):
+        await preparer.prepare_stream("fake-tokenizer", lambda: iter_dataset(DatasetSpec(uri=str(path))))
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark.distributed_benchmark import (
+    BenchmarkShardWorker,
+    DistributedBenchmarkCoordinator,
+    merge_shard_reports,
+    shard_load_config,
+)
+from benchmark.durable_queue import DurableTaskQueue
+from benchmark.load_generator import LoadGeneratorConfig, LoadTestReport
+from benchmark.server_metrics import ServerMetricsSampler
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeTracker:
+    """코디네이터가 쓰는 부분만 흉내 내는 PerformanceTracker 대역 (병합 보고서를 기록)"""
+
+    def __init__(self, db, load_config: LoadGeneratorConfig):
+        self.db = db
+        self.load_generator = SimpleNamespace(config=load_config)
+        self.recorded = []
+
+    def create_metrics_sampler(self, base_url=None) -> ServerMetricsSampler:
+        return ServerMetricsSampler([])
+
+    async def record_load_report(self, model_name, report, start_time, hardware, github_commit_sha,
+                                 server_metrics, evaluate_regression):
+        self.recorded.append(report)
+        return report
+
+
+def _shard_report(start: datetime, duration_s: float, output_tokens: int) -> dict:
+    report = LoadTestReport(duration_s=duration_s, num_requests=10, total_output_tokens=output_tokens)
+    return {
+        "report": report.to_document(),
+        "measurement_started_at": start,
+        "measurement_ended_at": start + timedelta(seconds=duration_s),
+    }
+
+
+def test_shard_load_config_splits_totals():
+    config = LoadGeneratorConfig(concurrency=5, warmup_requests=3, request_rate=10.0, seed=7)
+
+    shards = [shard_load_config(config, index, 2) for index in range(2)]
+
+    assert [shard["concurrency"] for shard in shards] == [3, 2]
+    assert [shard["warmup_requests"] for shard in shards] == [2, 1]
+    assert [shard["request_rate"] for shard in shards] == [5.0, 5.0]
+    assert [shard["seed"] for shard in shards] == [7, 8]
+    assert "base_url" not in shards[0] and "api_key" not in shards[0]
+
+
+def test_merge_spans_earliest_start_to_latest_end():
+    start = datetime(2024, 1, 1)
+    # 두 번째 샤드가 5초 늦게 시작: 합산 처리량은 12초 구간 기준이어야 함
+    report = merge_shard_reports([
+        _shard_report(start, 10.0, 1000),
+        _shard_report(start + timedelta(seconds=5), 7.0, 800),
+    ])
+
+    assert report.duration_s == 12.0
+    assert report.throughput_tokens_per_sec == pytest.approx(150.0)
+
+
+def test_merge_without_timestamps_uses_longest_shard():
+    documents = [{"report": LoadTestReport(duration_s=duration, num_requests=1).to_document()}
+                 for duration in (4.0, 6.0)]
+
+    assert merge_shard_reports(documents).duration_s == 6.0
+
+
+async def test_distributed_run_merges_shards(mock_vllm_server, mongo_db):
+    durable_queue = DurableTaskQueue(mongo_db)
+    tracker = FakeTracker(mongo_db, LoadGeneratorConfig(concurrency=4, max_tokens=8))
+    coordinator = DistributedBenchmarkCoordinator(tracker, durable_queue, num_shards=2,
+                                                  start_delay_s=0.1, poll_interval_s=0.05)
+    workers = [BenchmarkShardWorker(mongo_db, durable_queue, LoadGeneratorConfig(base_url=mock_vllm_server),
+                                    poll_interval_s=0.05) for _ in range(2)]
+    worker_tasks = [asyncio.create_task(worker.run()) for worker in workers]
+    try:
+        report = await asyncio.wait_for(coordinator.run_benchmark("llama", ["hello world"] * 8), timeout=10.0)
+    finally:
+        for worker in workers:
+            worker.stop()
+        await asyncio.gather(*worker_tasks)
+
+    assert report.num_requests == 8
+    assert report.total_output_tokens == 64
+    assert report.duration_s > 0
+    assert await mongo_db.benchmark_shard_reports.count_documents({}) == 0
+
+
+async def test_timeout_cancels_shards_and_partial_reports(mongo_db):
+    durable_queue = DurableTaskQueue(mongo_db)
+    tracker = FakeTracker(mongo_db, LoadGeneratorConfig())
+    coordinator = DistributedBenchmarkCoordinator(tracker, durable_queue, num_shards=2,
+                                                  start_delay_s=0.0, timeout_s=0.3, poll_interval_s=0.05)
+    running = asyncio.create_task(coordinator.run_benchmark("llama", ["a", "b"]))
+
+    # 한 샤드만 보고하고 다른 샤드는 실행 중인 채로 시간 초과
+    while (finished := await durable_queue.lease("worker-a")) is None:
+        await asyncio.sleep(0.01)
+    stuck = await durable_queue.lease("worker-b")
+    await mongo_db.benchmark_shard_reports.insert_one({"_id": finished.task_id, "report": {}})
+    with pytest.raises(Exception, match="timed out"):
+        await running
+
+    assert await mongo_db.benchmark_shard_reports.count_documents({}) == 0
+    assert await durable_queue.collection.count_documents({}) == 0
+    # 실행 중이던 워커는 lease를 잃어 보고서를 쓰지 않음
+    assert not await durable_queue.heartbeat(stuck, "worker-b")
+    assert tracker.recorded == []
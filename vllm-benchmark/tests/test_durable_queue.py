@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark.durable_queue import DONE, DurableTaskQueue
+from benchmark.performance_tracker import BenchmarkQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def queue(mongo_db) -> DurableTaskQueue:
+    return DurableTaskQueue(mongo_db, max_attempts=2, backoff_base_s=60.0)
+
+
+async def test_enqueue_deduplicates_idempotency_key(queue):
+    first = await queue.enqueue("benchmark", {"model_name": "llama"}, idempotency_key="run-1")
+    second = await queue.enqueue("benchmark", {"model_name": "other"}, idempotency_key="run-1")
+
+    assert first == second == "run-1"
+    assert await queue.collection.count_documents({}) == 1
+
+
+async def test_lease_is_exclusive_and_ordered_by_priority(queue):
+    await queue.enqueue("benchmark", {"model_name": "low"}, priority=0)
+    await queue.enqueue("benchmark", {"model_name": "high"}, priority=5)
+    await queue.enqueue("bisect", {"model_name": "bisect"}, priority=9)
+
+    first = await queue.lease("worker-a", kinds=("benchmark",))
+    second = await queue.lease("worker-b", kinds=("benchmark",))
+
+    assert first.payload["model_name"] == "high"
+    assert first.attempts == 1
+    assert second.payload["model_name"] == "low"
+    assert await queue.lease("worker-c", kinds=("benchmark",)) is None
+    # 다른 워커 이름으로는 완료할 수 없음
+    assert not await queue.complete(first, "worker-b")
+    assert await queue.complete(first, "worker-a")
+    assert (await queue.collection.find_one({"_id": first.task_id}))["status"] == DONE
+
+
+async def test_failed_task_backs_off_then_dead_letters(queue):
+    task_id = await queue.enqueue("benchmark", {"model_name": "llama"})
+
+    leased = await queue.lease("worker-a")
+    assert await queue.fail(leased, "worker-a", "server unreachable")
+    # 백오프가 끝나기 전에는 다시 lease되지 않음
+    assert await queue.lease("worker-a") is None
+
+    # 백오프 경과를 흉내냄
+    await queue.collection.update_one({"_id": task_id}, {"$set": {"available_at": datetime.now() - timedelta(seconds=1)}})
+    retried = await queue.lease("worker-a")
+    assert retried.attempts == 2
+    assert await queue.fail(retried, "worker-a", "server unreachable again")
+
+    assert await queue.collection.count_documents({}) == 0
+    dead = await queue.dead_letter.find_one({"_id": task_id})
+    assert dead["status"] == "dead"
+    assert dead["last_error"] == "server unreachable again"
+
+
+async def test_release_returns_attempt(queue):
+    await queue.enqueue("benchmark", {"model_name": "llama"})
+
+    leased = await queue.lease("worker-a")
+    assert await queue.release(leased, "worker-a")
+
+    again = await queue.lease("worker-b")
+    assert again.attempts == 1
+
+
+class SlowTracker:
+    """run_benchmark가 duration_s만큼 걸리는 PerformanceTracker 대역"""
+
+    def __init__(self, duration_s: float):
+        self.duration_s = duration_s
+        self.started = asyncio.Event()
+
+    async def run_benchmark(self, model_name, test_data, **kwargs):
+        self.started.set()
+        await asyncio.sleep(self.duration_s)
+        return SimpleNamespace(throughput_tokens_per_sec=1.0)
+
+    async def flush_results(self):
+        pass
+
+
+async def test_stop_workers_keeps_lease_until_running_task_finishes(mongo_db):
+    # 실행 시간이 visibility timeout보다 길어 heartbeat가 멈추면 lease를 잃는 태스크
+    durable_queue = DurableTaskQueue(mongo_db, visibility_timeout_s=0.3)
+    benchmark_queue = BenchmarkQueue(durable_queue=durable_queue, poll_interval_s=0.01)
+    tracker = SlowTracker(duration_s=0.8)
+    task_id = await benchmark_queue.add_benchmark_task("llama", ["hello"])
+
+    await benchmark_queue.start_workers(1, tracker)
+    await asyncio.wait_for(tracker.started.wait(), timeout=5.0)
+    stopping = asyncio.create_task(benchmark_queue.stop_workers())
+    await asyncio.sleep(0.5)
+
+    # 정지 중에도 heartbeat가 lease를 연장하므로 다른 레플리카가 가져갈 수 없음
+    assert await durable_queue.lease("other-replica") is None
+    await stopping
+    document = await durable_queue.collection.find_one({"_id": task_id})
+    assert document["status"] == DONE
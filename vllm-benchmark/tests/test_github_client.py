@@ -0,0 +1,116 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from pymongo.errors import ServerSelectionTimeoutError
+
+from benchmark.github_client import GitHubCommitClient
+
+pytestmark = pytest.mark.anyio
+
+SHA = "a" * 40
+
+
+class GitHubStub:
+    """커밋 조회 API만 흉내 내는 로컬 HTTP 서버 (요청 기록, ETag 조건부 요청 지원)"""
+
+    def __init__(self):
+        self.requests = []
+        self.app = web.Application()
+        self.app.router.add_get("/repos/{owner}/{name}/commits/{ref}", self.get_commit)
+
+    async def get_commit(self, request: web.Request) -> web.Response:
+        ref = request.match_info["ref"]
+        self.requests.append((ref, request.headers.get("If-None-Match")))
+        if ref == "missing":
+            return web.json_response({"message": "Not Found"}, status=404)
+        etag = f'"{ref}-v1"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        sha = ref if len(ref) == 40 else ref[0] * 40
+        return web.json_response({"sha": sha, "ref": ref}, headers={"ETag": etag})
+
+
+class BrokenCollection:
+    """모든 조회/저장이 실패하는 MongoDB 컬렉션 대역"""
+
+    async def find_one(self, *args, **kwargs):
+        raise ServerSelectionTimeoutError("mongo down")
+
+    async def replace_one(self, *args, **kwargs):
+        raise ServerSelectionTimeoutError("mongo down")
+
+
+@pytest.fixture
+async def github_stub():
+    stub = GitHubStub()
+    server = TestServer(stub.app, host="127.0.0.1")
+    await server.start_server()
+    stub.url = str(server.make_url("")).rstrip("/")
+    yield stub
+    await server.close()
+
+
+@pytest.fixture
+async def make_client():
+    clients = []
+
+    def make(**kwargs) -> GitHubCommitClient:
+        client = GitHubCommitClient("token", **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.close()
+
+
+async def test_full_sha_is_cached_in_memory_and_mongo(github_stub, make_client, mongo_db):
+    client = make_client(api_url=github_stub.url, cache_collection=mongo_db.github_commits)
+
+    assert (await client.get_commit("org/repo", SHA))["sha"] == SHA
+    assert (await client.get_commit("org/repo", SHA))["sha"] == SHA
+    assert len(github_stub.requests) == 1
+
+    # 새 클라이언트(재시작)도 MongoDB 영구 캐시에서 읽음
+    restarted = make_client(api_url=github_stub.url, cache_collection=mongo_db.github_commits)
+    assert (await restarted.get_commit("org/repo", SHA))["sha"] == SHA
+    assert len(github_stub.requests) == 1
+
+
+async def test_expired_ref_revalidates_with_etag(github_stub, make_client):
+    client = make_client(api_url=github_stub.url, ref_ttl_s=0.0)
+
+    first = await client.get_commit("org/repo", "main")
+    second = await client.get_commit("org/repo", "main")
+
+    assert first == second
+    assert github_stub.requests == [("main", None), ("main", '"main-v1"')]
+
+
+async def test_ref_cache_is_bounded(github_stub, make_client):
+    client = make_client(api_url=github_stub.url, max_cache_entries=2)
+
+    for ref in ("main", "dev", "release"):
+        await client.get_commit("org/repo", ref)
+    await client.get_commit("org/repo", "dev")
+
+    assert list(client._refs) == [("org/repo", "release"), ("org/repo", "dev")]
+    assert len(client._commits) == 2
+
+
+async def test_cache_errors_fall_back_to_network(github_stub, make_client):
+    client = make_client(api_url=github_stub.url, cache_collection=BrokenCollection())
+
+    commit = await client.get_commit("org/repo", SHA)
+
+    assert commit["sha"] == SHA
+    assert len(github_stub.requests) == 1
+
+
+async def test_get_commits_skips_failed_lookups(github_stub, make_client):
+    client = make_client(api_url=github_stub.url)
+
+    commits = await client.get_commits("org/repo", [SHA, "missing", SHA])
+
+    assert list(commits) == [SHA]
+    assert [ref for ref, _ in github_stub.requests].count(SHA) == 1
@@ -0,0 +1,197 @@
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from kubernetes import client
+
+from benchmark.gpu_inventory import GpuInventory
+
+
+def _node(name: str, gpus: int, gpu_type: str = "NVIDIA-A100-SXM4-80GB", unschedulable: bool = False) -> dict:
+    return {
+        "metadata": {"name": name, "labels": {"nvidia.com/gpu.product": gpu_type}},
+        "spec": {"unschedulable": unschedulable},
+        "status": {"capacity": {"nvidia.com/gpu": str(gpus)}, "allocatable": {"nvidia.com/gpu": str(gpus)}},
+    }
+
+
+def _pod(uid: str, node_name, gpus: int, phase: str = "Running", init_gpus: int = 0) -> dict:
+    spec = {
+        "nodeName": node_name,
+        "containers": [{"name": "main", "resources": {"limits": {"nvidia.com/gpu": str(gpus)}}}],
+    }
+    if init_gpus:
+        spec["initContainers"] = [{"name": "init", "resources": {"requests": {"nvidia.com/gpu": str(init_gpus)}}}]
+    return {"metadata": {"name": uid, "uid": uid}, "spec": spec, "status": {"phase": phase}}
+
+
+class FakeKubernetesApi:
+    """노드/파드 list와 watch만 흉내 내는 로컬 Kubernetes API 서버
+
+    list는 현재 상태를 돌려주고, watch는 emit()으로 넣은 이벤트를 timeoutSeconds 동안 스트리밍한다.
+    """
+
+    def __init__(self):
+        self.items = {"nodes": [], "pods": []}
+        self.events = {"nodes": queue.Queue(), "pods": queue.Queue()}
+        self.list_calls = {"nodes": 0, "pods": 0}
+        self.version = 1
+        self.closed = threading.Event()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                resource = url.path.rsplit("/", 1)[-1]
+                query = parse_qs(url.query)
+                if query.get("watch", ["false"])[0].lower() == "true":
+                    fake._watch(self, resource, float(query.get("timeoutSeconds", ["1"])[0]))
+                else:
+                    fake._list(self, resource)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _list(self, handler, resource: str):
+        self.list_calls[resource] += 1
+        body = json.dumps({
+            "kind": "NodeList" if resource == "nodes" else "PodList",
+            "apiVersion": "v1",
+            "metadata": {"resourceVersion": str(self.version)},
+            "items": self.items[resource],
+        }).encode()
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _watch(self, handler, resource: str, timeout_s: float):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline and not self.closed.is_set():
+            try:
+                event = self.events[resource].get(timeout=0.05)
+            except queue.Empty:
+                continue
+            # 이벤트마다 청크로 바로 흘려보냄
+            line = (json.dumps(event) + "\n").encode()
+            handler.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            handler.wfile.flush()
+        handler.wfile.write(b"0\r\n\r\n")
+
+    def emit(self, resource: str, event_type: str, obj: dict):
+        self.version += 1
+        obj = {**obj, "metadata": {**obj["metadata"], "resourceVersion": str(self.version)}}
+        self.events[resource].put({"type": event_type, "object": obj})
+
+    def expire_watch(self, resource: str):
+        """410 Gone: 인벤토리가 다시 list부터 시작해야 함"""
+        self.events[resource].put({
+            "type": "ERROR",
+            "object": {"kind": "Status", "apiVersion": "v1", "status": "Failure", "code": 410,
+                       "reason": "Expired", "message": "too old resource version"},
+        })
+
+    def close(self):
+        self.closed.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def wait_until(predicate, timeout_s: float = 5.0):
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def fake_api():
+    fake = FakeKubernetesApi()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def make_inventory(fake_api):
+    inventories = []
+
+    def make() -> GpuInventory:
+        api = client.CoreV1Api(client.ApiClient(client.Configuration(host=fake_api.url)))
+        inventory = GpuInventory(api=api, watch_timeout_s=1)
+        inventories.append(inventory)
+        inventory.start()
+        return inventory
+
+    yield make
+    for inventory in inventories:
+        inventory.stop()
+
+
+def test_initial_list_counts_gpus_by_type(fake_api, make_inventory):
+    fake_api.items["nodes"] = [
+        _node("a100-1", 8),
+        _node("h100-1", 8, gpu_type="NVIDIA-H100-80GB-HBM3"),
+        _node("cpu-1", 0),
+    ]
+    fake_api.items["pods"] = [
+        _pod("train", "a100-1", 2, init_gpus=4),
+        _pod("serve", "h100-1", 1),
+        _pod("pending", None, 8, phase="Pending"),
+    ]
+
+    inventory = make_inventory()
+
+    assert inventory.synced
+    assert (inventory.total_gpus(), inventory.free_gpus()) == (16, 11)
+    assert inventory.gpu_types()["NVIDIA-A100-SXM4-80GB"]["used_gpus"] == 4
+    assert inventory.node_free_gpus("h100-1") == 7
+    assert "cpu-1" not in inventory.nodes()
+
+
+def test_watch_events_update_usage_incrementally(fake_api, make_inventory):
+    fake_api.items["nodes"] = [_node("a100-1", 8)]
+    fake_api.items["pods"] = [_pod("job", "a100-1", 4)]
+    inventory = make_inventory()
+    assert inventory.free_gpus() == 4
+
+    fake_api.emit("pods", "MODIFIED", _pod("job", "a100-1", 4, phase="Succeeded"))
+    wait_until(lambda: inventory.free_gpus() == 8)
+
+    fake_api.emit("nodes", "ADDED", _node("a100-2", 8, unschedulable=True))
+    wait_until(lambda: inventory.total_gpus() == 16)
+    # cordon된 노드의 GPU는 노드 단위 배치 대상에서 제외
+    assert inventory.node_free_gpus("a100-2") == 0
+
+    fake_api.emit("nodes", "DELETED", _node("a100-1", 8))
+    wait_until(lambda: inventory.total_gpus() == 8)
+    assert list(inventory.gpu_types()) == ["NVIDIA-A100-SXM4-80GB"]
+
+
+def test_expired_watch_relists(fake_api, make_inventory):
+    fake_api.items["nodes"] = [_node("a100-1", 8)]
+    inventory = make_inventory()
+    assert fake_api.list_calls["nodes"] == 1
+
+    # watch가 놓친 변경은 재list로 반영
+    fake_api.items["nodes"] = [_node("a100-1", 8), _node("a100-2", 4)]
+    fake_api.expire_watch("nodes")
+
+    wait_until(lambda: inventory.total_gpus() == 12)
+    assert fake_api.list_calls["nodes"] == 2
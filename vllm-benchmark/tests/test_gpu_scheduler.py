@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark.durable_queue import DurableTaskQueue
+from benchmark.gpu_scheduler import GpuScheduler
+from benchmark.performance_tracker import BenchmarkQueue
+
+pytestmark = pytest.mark.anyio
+
+NODES = {
+    "node-a": {"free_gpus": 8, "allocatable_gpus": 8, "gpu_type": "A100"},
+    "node-b": {"free_gpus": 2, "allocatable_gpus": 8, "gpu_type": "A100"},
+    "node-c": {"free_gpus": 4, "allocatable_gpus": 4, "gpu_type": "H100"},
+}
+
+
+def _scheduler(**kwargs) -> GpuScheduler:
+    async def free_gpus():
+        return NODES
+
+    return GpuScheduler(free_gpus, refresh_interval_s=0.01, **kwargs)
+
+
+async def test_pick_uses_best_fit_node():
+    scheduler = _scheduler(model_gpu_requirements={"small": 2, "large": 8})
+    await scheduler.submit("small", "small")
+    await scheduler.submit("large", "large")
+
+    first, first_reservation = scheduler._pick(NODES)
+    second, second_reservation = scheduler._pick(NODES)
+
+    # 작은 태스크가 큰 노드를 차지하지 않아 8-GPU 태스크도 바로 배치됨
+    assert (first.payload, first_reservation.node_name) == ("small", "node-b")
+    assert (second.payload, second_reservation.node_name) == ("large", "node-a")
+    assert scheduler._pick(NODES) is None
+
+
+async def test_pick_respects_priority_and_gpu_type():
+    scheduler = _scheduler(model_gpu_requirements={"a": 4, "b": 4}, model_gpu_types={"b": "H100"})
+    await scheduler.submit("a", "low")
+    await scheduler.submit("b", "high", priority=5)
+
+    task, reservation = scheduler._pick(NODES)
+
+    assert task.payload == "high"
+    assert reservation.node_name == "node-c"
+    assert reservation.gpu_type == "H100"
+
+
+async def test_release_frees_reserved_gpus():
+    scheduler = _scheduler(model_gpu_requirements={"large": 8})
+    await scheduler.submit("large", 1)
+    await scheduler.submit("large", 2)
+
+    _, reservation = await scheduler.acquire()
+    assert scheduler._pick(NODES) is None
+    assert scheduler.running_count == 1
+
+    await scheduler.release(reservation)
+    task, _ = await scheduler.acquire()
+    assert task.payload == 2
+
+
+async def test_unplaceable_task_is_rejected():
+    rejected = []
+
+    async def on_reject(task, reason):
+        rejected.append((task.payload, reason))
+
+    scheduler = _scheduler(model_gpu_requirements={"huge": 16}, on_reject=on_reject)
+    await scheduler.submit("huge", "too-big")
+    await scheduler.submit("other", "ok")
+
+    task, _ = await scheduler.acquire()
+
+    assert task.payload == "ok"
+    assert rejected == [("too-big", "no node can provide 16 GPUs")]
+    assert scheduler.pending_count == 0
+
+
+async def test_benchmark_queue_fails_rejected_lease(mongo_db):
+    durable_queue = DurableTaskQueue(mongo_db, max_attempts=1)
+    scheduler = _scheduler(model_gpu_requirements={"huge": 16})
+    queue = BenchmarkQueue(scheduler=scheduler, durable_queue=durable_queue)
+    task_id = await queue.add_benchmark_task("huge", ["hello"])
+
+    leased = await durable_queue.lease(queue.owner)
+    queue._leased[leased.task_id] = leased
+    await scheduler.submit("huge", leased)
+    scheduler._reject_unplaceable(NODES)
+    await scheduler._notify_rejected()
+
+    assert queue._leased == {}
+    dead = await durable_queue.dead_letter.find_one({"_id": task_id})
+    assert "GPU scheduling rejected" in dead["last_error"]
+
+
+async def test_cancel_during_reject_callback_keeps_no_reservation():
+    callback_started = asyncio.Event()
+    release_callback = asyncio.Event()
+    rejected = []
+
+    async def on_reject(task, reason):
+        callback_started.set()
+        await release_callback.wait()
+        rejected.append(task.payload)
+
+    scheduler = _scheduler(model_gpu_requirements={"huge": 16}, on_reject=on_reject)
+    await scheduler.submit("huge", "too-big")
+    await scheduler.submit("other", "ok")
+
+    acquire = asyncio.create_task(scheduler.acquire())
+    await asyncio.wait_for(callback_started.wait(), timeout=5.0)
+    acquire.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await acquire
+
+    # 취소된 acquire는 아무것도 예약하지 않았고, 알림은 끝까지 전달됨
+    assert scheduler.running_count == 0
+    assert scheduler.pending_count == 1
+    release_callback.set()
+    task, _ = await asyncio.wait_for(scheduler.acquire(), timeout=5.0)
+    assert task.payload == "ok"
+    assert rejected == ["too-big"]
+
+
+class FakeTracker:
+    """처리한 태스크를 기록하는 PerformanceTracker 대역"""
+
+    def __init__(self):
+        self.runs = []
+
+    async def run_benchmark(self, model_name, test_data, **kwargs):
+        self.runs.append((model_name, kwargs.get("hardware")))
+        return SimpleNamespace(throughput_tokens_per_sec=1.0)
+
+    async def flush_results(self):
+        pass
+
+
+async def test_worker_survives_gpu_lookup_failure():
+    calls = []
+
+    async def flaky_free_gpus():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Exception("kubernetes API unavailable")
+        return NODES
+
+    scheduler = GpuScheduler(flaky_free_gpus, refresh_interval_s=0.01)
+    queue = BenchmarkQueue(scheduler=scheduler, poll_interval_s=0.01)
+    tracker = FakeTracker()
+    await queue.add_benchmark_task("llama", ["hello"])
+
+    await queue.start_workers(1, tracker)
+    await asyncio.wait_for(queue.join(), timeout=5.0)
+    await queue.stop_workers()
+
+    assert tracker.runs == [("llama", "A100")]
+    assert len(calls) >= 2
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from benchmark.latency_histogram import LatencyHistogram
+
+
+def _histogram(values):
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def test_percentiles_are_within_bucket_precision():
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(3, 1) for _ in range(5000))
+    histogram = _histogram(values)
+
+    assert histogram.count == len(values)
+    for percentile in (50, 90, 99):
+        exact = values[int(percentile / 100 * (len(values) - 1))]
+        assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.02)
+
+
+def test_merge_matches_recording_everything_in_one_histogram():
+    rng = random.Random(1)
+    first = [rng.uniform(1, 100) for _ in range(1000)]
+    second = [rng.uniform(50, 5000) for _ in range(1000)]
+
+    merged = _histogram(first).merge(_histogram(second))
+    combined = _histogram(first + second)
+
+    assert merged.count == combined.count
+    assert merged.percentiles() == combined.percentiles()
+    assert merged.min_ms == combined.min_ms
+    assert merged.max_ms == combined.max_ms
+
+
+def test_document_round_trip_preserves_distribution():
+    histogram = _histogram([0.5, 1.0, 12.5, 12.5, 300.0, 45000.0])
+
+    restored = LatencyHistogram.from_document(histogram.to_document())
+
+    assert restored.count == histogram.count
+    assert restored.percentiles() == histogram.percentiles()
+    assert restored.mean_ms == pytest.approx(histogram.mean_ms)
+
+
+def test_empty_histogram_round_trip():
+    restored = LatencyHistogram.from_document(LatencyHistogram().to_document())
+
+    assert restored.count == 0
+    assert restored.percentile(99) == 0.0
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from benchmark.load_generator import LoadGenerator, LoadGeneratorConfig, LoadTestReport
+
+pytestmark = pytest.mark.anyio
+
+
+async def _run(config: LoadGeneratorConfig, prompts) -> LoadTestReport:
+    load_generator = LoadGenerator(config)
+    try:
+        return await load_generator.run("mock", prompts)
+    finally:
+        await load_generator.close()
+
+
+async def test_closed_loop_measures_every_request(mock_vllm_server):
+    report = await _run(LoadGeneratorConfig(base_url=mock_vllm_server, concurrency=4, max_tokens=8),
+                        ["hello world"] * 12)
+
+    assert report.num_requests == 12
+    assert report.failed_requests == 0
+    assert report.total_output_tokens == 12 * 8
+    assert report.total_prompt_tokens == 12 * 2
+    assert report.e2e_latency.count == 12
+    assert report.inter_token_latency.count == 12 * 7
+    assert report.throughput_tokens_per_sec > 0
+    assert report.ttft.percentile(50) <= report.e2e_latency.percentile(50)
+
+
+async def test_warmup_requests_are_excluded(mock_vllm_server):
+    report = await _run(
+        LoadGeneratorConfig(base_url=mock_vllm_server, concurrency=1, max_tokens=2, warmup_requests=3),
+        ["hello"] * 8
+    )
+
+    assert report.warmup_requests == 3
+    assert report.num_requests == 5
+
+
+async def test_throughput_covers_the_whole_run(mock_vllm_server):
+    # 16개를 동시에 보내면 모두 거의 같은 시각에 끝남: 첫 완료부터 재면 구간이 0에 가까워 처리량이 부풀려짐
+    config = LoadGeneratorConfig(base_url=mock_vllm_server, concurrency=16, max_tokens=8)
+    started = time.perf_counter()
+    report = await _run(config, ["hello"] * 16)
+    elapsed = time.perf_counter() - started
+
+    assert report.num_requests == 16
+    assert 0.5 * elapsed <= report.duration_s <= elapsed
+    assert report.throughput_tokens_per_sec <= report.total_output_tokens / (0.5 * elapsed)
+
+
+async def test_time_warmup_excludes_requests_sent_before_it_ends(slow_vllm_server):
+    # 요청당 약 100ms: 워밍업(50ms) 중에 보낸 첫 요청들은 측정 구간에 끝나도 제외
+    config = LoadGeneratorConfig(base_url=slow_vllm_server, concurrency=4, max_tokens=10, warmup_s=0.05)
+    report = await _run(config, ["hello"] * 8)
+
+    assert report.warmup_requests == 4
+    assert report.num_requests == 4
+
+
+async def test_open_loop_latency_includes_time_waiting_for_a_slot(slow_vllm_server):
+    # 요청당 ~100ms, 동시 2개 => 처리 한계 ~20 req/s 인데 200 req/s로 도착시킴
+    config = LoadGeneratorConfig(base_url=slow_vllm_server, concurrency=2, max_tokens=10,
+                                 request_rate=200.0, seed=7)
+    report = await _run(config, ["hello"] * 20)
+
+    assert report.completed_requests == 20
+    # 밀린 요청의 대기 시간이 기록되고 종단 지연에도 포함되어야 함 (coordinated omission 방지)
+    assert report.queue_delay.percentile(99) > 500
+    assert report.e2e_latency.percentile(99) > report.queue_delay.percentile(99)
+    assert report.e2e_latency.percentile(99) > 5 * report.e2e_latency.percentile(1)
+
+
+async def test_unreachable_server_counts_failures():
+    config = LoadGeneratorConfig(base_url="http://127.0.0.1:9", concurrency=2, request_timeout_s=2.0)
+    report = await _run(config, ["hello"] * 3)
+
+    assert report.num_requests == 3
+    assert report.failed_requests == 3
+    assert report.completed_requests == 0
+
+
+def test_report_document_round_trip_and_merge():
+    first = LoadTestReport(duration_s=2.0, num_requests=2, total_output_tokens=10, steady_state_reached=True)
+    first.e2e_latency.record(10.0)
+    first.e2e_latency.record(20.0)
+    second = LoadTestReport(duration_s=3.0, num_requests=1, failed_requests=1, steady_state_reached=False)
+    second.queue_delay.record(5.0)
+
+    restored = LoadTestReport.from_document(first.to_document())
+    assert restored.to_document() == first.to_document()
+
+    merged = restored.merge(LoadTestReport.from_document(second.to_document()))
+    assert merged.duration_s == 3.0
+    assert merged.num_requests == 3
+    assert merged.failed_requests == 1
+    assert merged.e2e_latency.count == 2
+    assert merged.queue_delay.count == 1
+    assert merged.steady_state_reached is False
+
+
+def test_steady_state_needs_at_least_two_windows():
+    with pytest.raises(ValueError):
+        LoadGeneratorConfig(steady_state_window_s=1.0, steady_state_windows=1)
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from benchmark.load_generator import LoadGeneratorConfig, LoadTestReport
+from benchmark.load_sweep import LoadSweep
+
+
+def _sweep(**kwargs) -> LoadSweep:
+    tracker = SimpleNamespace(
+        db=SimpleNamespace(benchmark_sweeps=None),
+        load_generator=SimpleNamespace(config=LoadGeneratorConfig(concurrency=8)),
+    )
+    return LoadSweep(tracker, slo_p99_ms=100.0, **kwargs)
+
+
+def _report(completed: int, duration_s: float, latency_ms: float = 50.0) -> LoadTestReport:
+    report = LoadTestReport(duration_s=duration_s, num_requests=completed)
+    for _ in range(completed):
+        report.e2e_latency.record(latency_ms)
+    return report
+
+
+def test_request_rate_mode_lifts_concurrency_cap():
+    config = _sweep(open_loop_concurrency=256)._config_for("request_rate", 50.0)
+
+    assert config.request_rate == 50.0
+    assert config.concurrency == 256
+    assert _sweep()._config_for("concurrency", 4).concurrency == 4
+
+
+def test_point_fails_slo_when_server_falls_behind():
+    sweep = _sweep(min_achieved_rate_ratio=0.8)
+
+    # 10초 동안 요청률 20을 제공했지만 100건(10 req/s)만 완료
+    behind = sweep._to_point("request_rate", 20.0, _report(completed=100, duration_s=10.0))
+    keeping_up = sweep._to_point("request_rate", 10.0, _report(completed=100, duration_s=10.0))
+    slow = sweep._to_point("concurrency", 4, _report(completed=100, duration_s=10.0, latency_ms=500.0))
+
+    assert not behind.meets_slo
+    assert keeping_up.meets_slo
+    assert keeping_up.requests_per_sec == 10.0
+    assert not slow.meets_slo
@@ -0,0 +1,215 @@
+import base64
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import benchmark.dataset_preparation as dataset_preparation
+import benchmark.performance_tracker as performance_tracker
+from benchmark.dataset_loader import DatasetSpec
+from benchmark.dataset_preparation import DatasetPreparer
+from benchmark.load_generator import LoadGeneratorConfig, LoadTestReport
+from benchmark.performance_tracker import BenchmarkResult, PerformanceTracker, decode_history_cursor
+from benchmark.server_metrics import ServerMetricsSampler
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def make_tracker(monkeypatch):
+    monkeypatch.setattr(performance_tracker, "AsyncIOMotorClient", AsyncMongoMockClient)
+    trackers = []
+
+    def make(**kwargs) -> PerformanceTracker:
+        kwargs.setdefault("metrics_urls", [])
+        tracker = PerformanceTracker("mongodb://localhost:27017", "", **kwargs)
+        trackers.append(tracker)
+        return tracker
+
+    yield make
+    for tracker in trackers:
+        await tracker.close()
+
+
+def _result(model_name: str, timestamp: datetime, throughput: float = 100.0) -> BenchmarkResult:
+    result = BenchmarkResult(
+        model_name=model_name,
+        throughput_tokens_per_sec=throughput,
+        latency_ms=50.0,
+        memory_usage_gb=None,
+        timestamp=timestamp,
+        github_commit_sha="abc123",
+        hardware="A100",
+    )
+    result.latency_histogram.record(50.0)
+    return result
+
+
+async def test_store_survives_unsupported_timeseries_setup(make_tracker):
+    # mongomock은 create_collection(timeseries=...)에서 NotImplementedError를 냄
+    tracker = make_tracker()
+    await tracker.store_benchmark_result(_result("llama", datetime.now()))
+    await tracker.store_benchmark_result(_result("llama", datetime.now()))
+    await tracker.flush_results()
+
+    assert await tracker.collection.count_documents({"metadata.model_name": "llama"}) == 2
+    assert await tracker.get_history_version("llama", max_age_s=0) == 2
+
+
+async def test_history_pages_with_after_cursor(make_tracker):
+    tracker = make_tracker()
+    start = datetime(2024, 1, 1)
+    for minute in range(5):
+        await tracker.store_benchmark_result(_result("llama", start + timedelta(minutes=minute)), False)
+    await tracker.store_benchmark_result(_result("mistral", start), False)
+    await tracker.flush_results()
+
+    seen = []
+    after = None
+    while True:
+        page = [record async for record in tracker.iter_performance_history("llama", after=after, limit=2)]
+        if not page:
+            break
+        seen.extend(record["timestamp"] for record in page)
+        after = page[-1]["cursor"]
+
+    assert seen == [start + timedelta(minutes=minute) for minute in reversed(range(5))]
+
+
+async def test_since_cursor_returns_late_flushed_runs(make_tracker):
+    tracker = make_tracker()
+    # BSON datetime은 밀리초 정밀도
+    now = datetime.now().replace(microsecond=0)
+    await tracker.store_benchmark_result(_result("llama", now), False)
+    await tracker.flush_results()
+    first = [record async for record in tracker.iter_performance_history("llama", fields=["model_name"])]
+
+    # 더 일찍 시작했지만 오래 걸려 나중에 저장된 실행
+    await tracker.store_benchmark_result(_result("llama", now - timedelta(hours=2)), False)
+    await tracker.flush_results()
+    newer = [record async for record in tracker.iter_performance_history("llama", since=first[0]["cursor"])]
+
+    assert len(newer) == 1
+    assert newer[0]["timestamp"] == now - timedelta(hours=2)
+    assert [record async for record in tracker.iter_performance_history("llama", since=newer[0]["cursor"])] == []
+
+
+async def test_since_pages_in_insertion_order(make_tracker):
+    tracker = make_tracker()
+    now = datetime.now().replace(microsecond=0)
+    await tracker.store_benchmark_result(_result("llama", now), False)
+    await tracker.flush_results()
+    first = [record async for record in tracker.iter_performance_history("llama")]
+    # 측정 시각과 저장 순서가 다른 결과 세 개
+    for hours in (3, 1, 2):
+        await tracker.store_benchmark_result(_result("llama", now - timedelta(hours=hours)), False)
+        await tracker.flush_results()
+
+    since = first[0]["cursor"]
+    seen = []
+    while True:
+        page = [record async for record in tracker.iter_performance_history("llama", since=since, limit=2)]
+        if not page:
+            break
+        seen.extend(record["timestamp"] for record in page)
+        since = page[-1]["cursor"]
+    unpaged = [record["timestamp"] async for record in
+               tracker.iter_performance_history("llama", since=first[0]["cursor"], page_size=1)]
+
+    expected = [now - timedelta(hours=hours) for hours in (3, 1, 2)]
+    assert seen == expected
+    assert unpaged == expected
+
+async def test_skipped_regression_runs_stay_out_of_baseline(make_tracker):
+    tracker = make_tracker()
+    await tracker.store_benchmark_result(_result("llama", datetime.now()), evaluate_regression=False)
+    await tracker.store_benchmark_result(_result("llama", datetime.now()))
+    await tracker.flush_results()
+
+    verdicts = await tracker.db.benchmark_regressions.find().to_list(length=None)
+    assert len(verdicts) == 1
+    assert await tracker.collection.count_documents({"baseline_eligible": False}) == 1
+
+
+async def test_config_hash_tracks_dataset_and_load_config(make_tracker):
+    tracker = make_tracker(load_config=LoadGeneratorConfig(concurrency=4))
+    same_load_elsewhere = make_tracker(load_config=LoadGeneratorConfig(base_url="http://other:8000", concurrency=4))
+    other_load = make_tracker(load_config=LoadGeneratorConfig(concurrency=8))
+
+    config_hash = tracker.benchmark_config_hash(["hello"])
+
+    assert same_load_elsewhere.benchmark_config_hash(["hello"]) == config_hash
+    assert other_load.benchmark_config_hash(["hello"]) != config_hash
+    assert tracker.benchmark_config_hash(["hello", "world"]) != config_hash
+    assert tracker.benchmark_config_hash(DatasetSpec(uri="prompts.jsonl")) != \
+        tracker.benchmark_config_hash(DatasetSpec(uri="prompts.jsonl", max_prompts=10))
+
+
+async def test_memory_usage_is_null_without_dcgm(make_tracker, vllm_only_metrics_server):
+    tracker = make_tracker()
+    sampler = ServerMetricsSampler([vllm_only_metrics_server], interval_s=0.01)
+    sampler.start()
+    report = LoadTestReport(duration_s=1.0, num_requests=1, total_output_tokens=10)
+    report.e2e_latency.record(10.0)
+    server_metrics = await sampler.stop()
+
+    result = await tracker.record_load_report("llama", report, datetime.now(), server_metrics=server_metrics,
+                                              evaluate_regression=False)
+    await tracker.flush_results()
+
+    assert result.memory_usage_gb is None
+    stored = await tracker.collection.find_one({})
+    assert stored["memory_usage_gb"] is None
+
+
+def test_legacy_two_part_cursor_still_decodes():
+    cursor = base64.urlsafe_b64encode(b"2024-01-01T00:00:00|65a000000000000000000000").decode()
+
+    timestamp, _, inserted_at = decode_history_cursor(cursor)
+
+    assert timestamp == datetime(2024, 1, 1)
+    assert inserted_at is None
+    with pytest.raises(ValueError):
+        decode_history_cursor("not-a-cursor")
+
+
+async def test_run_benchmark_against_mock_server(make_tracker, mock_vllm_server):
+    tracker = make_tracker(
+        load_config=LoadGeneratorConfig(base_url=mock_vllm_server, concurrency=4, max_tokens=8),
+        metrics_urls=[f"{mock_vllm_server}/metrics"],
+        metrics_interval_s=0.02,
+    )
+
+    result = await tracker.run_benchmark("llama", ["hello world"] * 16, hardware="A100",
+                                         github_commit_sha="deadbeef", evaluate_regression=False)
+    await tracker.flush_results()
+
+    assert result.num_requests == 16
+    assert result.throughput_tokens_per_sec > 0
+    # mock 서버는 DCGM 형식 GPU 메모리(20GiB 이상)를 노출
+    assert result.memory_usage_gb >= 20.0
+    stored = await tracker.collection.find_one({"metadata.github_commit_sha": "deadbeef"})
+    assert stored["num_requests"] == 16
+    assert stored["config_hash"] == tracker.benchmark_config_hash(["hello world"] * 16)
+    assert set(stored["histograms"]) == {"e2e_latency", "ttft", "inter_token_latency", "queue_delay"}
+
+
+async def test_run_benchmark_prepares_tokens_for_dataset_spec(make_tracker, mock_vllm_server, tmp_path, monkeypatch):
+    path = tmp_path / "prompts.jsonl"
+    path.write_text("".join(json.dumps({"prompt": "hello world " * i}) + "\n" for i in range(1, 5)))
+    # 공백 기준 대역 토크나이저를 스레드 풀에서 실행
+    monkeypatch.setattr(dataset_preparation, "_tokenizer",
+                        lambda prompts, add_special_tokens=False: {"input_ids": [p.split() for p in prompts]})
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(DatasetPreparer, "_executor", lambda self, tokenizer_name: executor)
+    tracker = make_tracker(load_config=LoadGeneratorConfig(base_url=mock_vllm_server, concurrency=2, max_tokens=4))
+    tracker.dataset_preparer = DatasetPreparer(cache_dir=str(tmp_path / "cache"))
+
+    result = await tracker.run_benchmark("llama", DatasetSpec(uri=str(path)), tokenizer_name="fake-tokenizer",
+                                         evaluate_regression=False)
+    executor.shutdown()
+
+    assert result.prompt_token_stats["count"] == 4
+    assert result.prompt_token_stats["total"] == 2 + 4 + 6 + 8
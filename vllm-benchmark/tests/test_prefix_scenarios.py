@@ -0,0 +1,26 @@
+from benchmark.prefix_scenarios import prefix_cache_hit_rate
+from benchmark.server_metrics import ServerMetrics
+
+
+def _metrics(**series) -> ServerMetrics:
+    length = max(len(points) for points in series.values())
+    return ServerMetrics(interval_s=1.0, timestamps_s=[float(i) for i in range(length)], series=series)
+
+
+def test_hit_rate_from_v1_counters():
+    metrics = _metrics(prefix_cache_queries=[100.0, 300.0], prefix_cache_hits=[50.0, 200.0])
+
+    assert prefix_cache_hit_rate(metrics) == 0.75
+
+
+def test_hit_rate_without_hits_counter_falls_back_to_gauge():
+    metrics = _metrics(prefix_cache_queries=[100.0, 300.0], prefix_cache_hits=[None, None],
+                       prefix_cache_hit_rate=[0.4, 0.6])
+
+    assert prefix_cache_hit_rate(metrics) == 0.5
+
+
+def test_hit_rate_is_none_without_any_prefix_metrics():
+    metrics = _metrics(prefix_cache_queries=[100.0, 300.0])
+
+    assert prefix_cache_hit_rate(metrics) is None
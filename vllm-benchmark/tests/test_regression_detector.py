@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from benchmark.latency_histogram import LatencyHistogram
+from benchmark.regression_detector import RegressionDetector, mann_whitney_greater
+
+pytestmark = pytest.mark.anyio
+
+
+def _histogram(mean_ms: float, count: int = 200, seed: int = 0) -> LatencyHistogram:
+    rng = random.Random(seed)
+    histogram = LatencyHistogram()
+    for _ in range(count):
+        histogram.record(rng.gauss(mean_ms, mean_ms * 0.05))
+    return histogram
+
+
+@pytest.fixture
+def detector(mongo_db) -> RegressionDetector:
+    return RegressionDetector(mongo_db.benchmark_results, mongo_db.benchmark_regressions)
+
+
+async def _seed_baseline(detector: RegressionDetector, runs: int = 5):
+    for index in range(runs):
+        await detector.evaluate("llama", "A100", f"base{index}", 100.0 + index % 2, _histogram(50.0, seed=index))
+
+
+def test_mann_whitney_detects_shift():
+    _, shifted_p = mann_whitney_greater(_histogram(60.0, seed=1), _histogram(50.0, seed=2))
+    _, same_p = mann_whitney_greater(_histogram(50.0, seed=3), _histogram(50.0, seed=4))
+    _, empty_p = mann_whitney_greater(LatencyHistogram(), _histogram(50.0))
+
+    assert shifted_p < 0.001
+    assert same_p > 0.01
+    assert empty_p == 1.0
+
+
+async def test_needs_minimum_baseline(detector, mongo_db):
+    first = await detector.evaluate("llama", "A100", "c1", 100.0, _histogram(50.0))
+
+    assert first["verdict"] == "insufficient_baseline"
+    assert await mongo_db.benchmark_regressions.count_documents({"github_commit_sha": "c1"}) == 1
+
+
+async def test_stable_commit_is_ok(detector):
+    await _seed_baseline(detector)
+
+    verdict = await detector.evaluate("llama", "A100", "next", 100.5, _histogram(50.0, seed=99))
+
+    assert verdict["verdict"] == "ok"
+    assert verdict["baseline_runs"] == 5
+
+
+async def test_latency_and_throughput_regressions(detector):
+    await _seed_baseline(detector)
+
+    slower = await detector.evaluate("llama", "A100", "slow", 100.5, _histogram(65.0, seed=98))
+    lower = await detector.evaluate("llama", "A100", "low", 70.0, _histogram(50.0, seed=97))
+
+    assert slower["verdict"] == "regression"
+    assert slower["latency"]["regressed"]
+    assert lower["verdict"] == "regression"
+    assert lower["throughput"]["regressed"]
+    assert not lower["latency"]["regressed"]
+
+
+async def test_reruns_of_same_commit_are_not_baseline(detector):
+    for seed in range(4):
+        verdict = await detector.evaluate("llama", "A100", "same", 100.0, _histogram(50.0, seed=seed))
+
+    assert verdict["verdict"] == "insufficient_baseline"
+    assert verdict["baseline_runs"] == 0
+
+
+async def test_baseline_loads_only_eligible_stored_runs(detector, mongo_db):
+    await mongo_db.benchmark_results.insert_many([
+        {
+            "metadata": {"model_name": "llama", "hardware": "A100", "github_commit_sha": f"stored{index}"},
+            "timestamp": index,
+            "throughput_tokens_per_sec": 100.0,
+            "histograms": {"e2e_latency": _histogram(50.0, seed=index).to_document()},
+            # 마지막 실행은 bisect 등 베이스라인 제외 실행
+            "baseline_eligible": index < 3,
+        }
+        for index in range(4)
+    ])
+
+    verdict = await detector.evaluate("llama", "A100", "new", 100.0, _histogram(50.0, seed=50))
+
+    assert verdict["baseline_commits"] == ["stored0", "stored1", "stored2"]
+    assert verdict["verdict"] == "ok"
@@ -0,0 +1,54 @@
+import pytest
+
+from benchmark.result_broadcaster import ResultBroadcaster
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_events_fan_out_by_model_filter():
+    broadcaster = ResultBroadcaster()
+    everything = broadcaster.subscribe()
+    llama = broadcaster.subscribe("llama")
+
+    broadcaster.publish({"model_name": "llama", "seq": 1})
+    broadcaster.publish({"model_name": "mistral", "seq": 2})
+
+    assert [(await everything.get())["seq"], (await everything.get())["seq"]] == [1, 2]
+    assert (await llama.get())["seq"] == 1
+    assert llama.queue.empty()
+
+
+async def test_full_queue_keeps_latest_events():
+    broadcaster = ResultBroadcaster(max_queue_size=2, max_dropped=10)
+    subscription = broadcaster.subscribe()
+
+    for seq in range(4):
+        broadcaster.publish({"model_name": "llama", "seq": seq})
+
+    assert [(await subscription.get())["seq"], (await subscription.get())["seq"]] == [2, 3]
+    assert subscription.dropped == 2
+    assert not subscription.closed
+
+
+async def test_slow_subscriber_is_disconnected():
+    broadcaster = ResultBroadcaster(max_queue_size=1, max_dropped=3)
+    slow = broadcaster.subscribe()
+    fast = broadcaster.subscribe()
+
+    for seq in range(5):
+        broadcaster.publish({"model_name": "llama", "seq": seq})
+        await fast.get()
+
+    assert slow.closed
+    assert await slow.get() is None
+    assert broadcaster.subscriber_count == 1
+
+
+async def test_stop_closes_every_subscription():
+    broadcaster = ResultBroadcaster()
+    subscription = broadcaster.subscribe()
+
+    await broadcaster.stop()
+
+    assert await subscription.get() is None
+    assert broadcaster.subscriber_count == 0
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson.errors import InvalidDocument
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from benchmark.result_writer import BufferedResultWriter
+
+pytestmark = pytest.mark.anyio
+
+
+def _documents(count: int):
+    start = datetime(2024, 1, 1)
+    return [{"index": i, "timestamp": start + timedelta(seconds=i)} for i in range(count)]
+
+
+async def test_close_drains_buffer_in_batches(mongo_db):
+    batches = []
+
+    async def on_flush(batch):
+        batches.append([document["index"] for document in batch])
+
+    writer = BufferedResultWriter(mongo_db.results, max_batch_size=4, flush_interval_s=0.05, on_flush=on_flush,
+                                  insert_time_field="inserted_at")
+    for document in _documents(10):
+        await writer.write(document)
+    await writer.close()
+
+    stored = await mongo_db.results.find().sort("index", 1).to_list(length=None)
+    assert [document["index"] for document in stored] == list(range(10))
+    assert all(isinstance(document["inserted_at"], datetime) for document in stored)
+    assert sorted(index for batch in batches for index in batch) == list(range(10))
+    assert max(len(batch) for batch in batches) <= 4
+
+
+async def test_flush_waits_for_pending_documents(mongo_db):
+    writer = BufferedResultWriter(mongo_db.results, flush_interval_s=0.01)
+    for document in _documents(3):
+        await writer.write(document)
+    await writer.flush()
+
+    assert await mongo_db.results.count_documents({}) == 3
+    await writer.close()
+
+
+async def test_partial_bulk_failure_publishes_only_stored_documents(mongo_db):
+    collection = mongo_db.results
+    insert_many = collection.insert_many
+
+    async def partially_failing(documents, ordered=False):
+        await insert_many([document for i, document in enumerate(documents) if i != 1], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}]})
+
+    collection.insert_many = partially_failing
+    published = []
+
+    async def on_flush(batch):
+        published.extend(document["index"] for document in batch)
+
+    writer = BufferedResultWriter(collection, flush_interval_s=0.01, on_flush=on_flush)
+    for document in _documents(3):
+        await writer.write(document)
+    await writer.close()
+
+    assert published == [0, 2]
+
+
+async def test_retry_after_ambiguous_error_does_not_duplicate(mongo_db):
+    collection = mongo_db.results
+    insert_many = collection.insert_many
+    calls = []
+
+    async def lost_acknowledgement(documents, ordered=False):
+        calls.append(len(documents))
+        if len(calls) == 1:
+            # 첫 시도는 저장되었지만 응답이 유실된 경우
+            await insert_many(documents[:2], ordered=ordered)
+            raise AutoReconnect("connection reset")
+        return await insert_many(documents, ordered=ordered)
+
+    collection.insert_many = lost_acknowledgement
+    published = []
+
+    async def on_flush(batch):
+        published.extend(document["index"] for document in batch)
+
+    writer = BufferedResultWriter(collection, flush_interval_s=0.01, on_flush=on_flush, time_field="timestamp")
+    for document in _documents(4):
+        await writer.write(document)
+    await writer.close()
+
+    assert calls == [4, 2]
+    assert await mongo_db.results.count_documents({}) == 4
+    assert sorted(published) == [0, 1, 2, 3]
+
+
+async def test_unexpected_insert_error_drops_batch_and_keeps_flushing(mongo_db):
+    collection = mongo_db.results
+    insert_many = collection.insert_many
+
+    async def rejects_invalid(documents, ordered=False):
+        if any(document.get("invalid") for document in documents):
+            raise InvalidDocument("cannot encode object")
+        return await insert_many(documents, ordered=ordered)
+
+    collection.insert_many = rejects_invalid
+    writer = BufferedResultWriter(collection, flush_interval_s=0.01)
+    await writer.write({"index": 0, "invalid": True})
+    await writer.flush()
+    await writer.write({"index": 1})
+    await writer.close()
+
+    assert [document["index"] async for document in collection.find()] == [1]
+
+
+async def test_flush_fails_fast_when_flusher_is_gone(mongo_db):
+    writer = BufferedResultWriter(mongo_db.results, flush_interval_s=10.0)
+    await writer.write({"index": 0})
+    writer._task.cancel()
+
+    # 남은 문서를 처리할 플러셔가 없으면 join에서 무한 대기하지 않고 실패
+    with pytest.raises(Exception, match="flusher stopped"):
+        await asyncio.wait_for(writer.flush(), timeout=1.0)
+    with pytest.raises(Exception, match="flusher stopped"):
+        await writer.close()
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmark.latency_histogram import LatencyHistogram
+from benchmark.rollups import BenchmarkRollupJob
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def rollup_job(mongo_db) -> BenchmarkRollupJob:
+    job = BenchmarkRollupJob(mongo_db, mongo_db.benchmark_results)
+    for collection in job.collections.values():
+        # mongomock의 bulk_write는 최신 pymongo ReplaceOne과 호환되지 않아 개별 replace로 대체
+        async def bulk_write(operations, ordered=True, collection=collection):
+            for operation in operations:
+                await collection.replace_one(operation._filter, operation._doc, upsert=True)
+        collection.bulk_write = bulk_write
+    return job
+
+
+async def _insert_run(db, timestamp: datetime, inserted_at: datetime, throughput: float, latency: float,
+                      hardware: str = "A100", **fields):
+    histogram = LatencyHistogram()
+    histogram.record(latency)
+    await db.benchmark_results.insert_one({
+        **fields,
+        "metadata": {"model_name": "llama", "hardware": hardware},
+        "timestamp": timestamp,
+        "inserted_at": inserted_at,
+        "throughput_tokens_per_sec": throughput,
+        "latency_ms": latency,
+        "histograms": {"e2e_latency": histogram.to_document()},
+    })
+
+
+async def test_rollup_aggregates_hours_and_days(mongo_db, rollup_job):
+    day = datetime(2024, 1, 1)
+    await _insert_run(mongo_db, day + timedelta(hours=1, minutes=5), day + timedelta(hours=1, minutes=6), 100.0, 40.0)
+    await _insert_run(mongo_db, day + timedelta(hours=1, minutes=30), day + timedelta(hours=1, minutes=31), 200.0, 60.0)
+    await _insert_run(mongo_db, day + timedelta(hours=3), day + timedelta(hours=3, minutes=1), 300.0, 80.0)
+
+    assert await rollup_job.run_once() == 2
+
+    hourly = await rollup_job.get_rollups("llama", "hour", day)
+    assert [(r["bucket_start"].hour, r["run_count"]) for r in hourly] == [(1, 2), (3, 1)]
+    assert hourly[0]["throughput_tokens_per_sec"]["mean"] == 150.0
+    assert hourly[0]["latency_ms"]["mean"] == 50.0
+    daily = await rollup_job.get_rollups("llama", "day", day)
+    assert len(daily) == 1
+    assert daily[0]["run_count"] == 3
+    assert daily[0]["latency_ms"]["max"] == 80.0
+    # 워터마크 겹침 구간만 다시 집계되며 결과는 같음 (upsert)
+    await rollup_job.run_once()
+    assert [r["run_count"] for r in await rollup_job.get_rollups("llama", "hour", day)] == [2, 1]
+
+
+async def test_late_inserted_run_is_backfilled(mongo_db, rollup_job):
+    day = datetime(2024, 1, 1)
+    await _insert_run(mongo_db, day + timedelta(hours=1), day + timedelta(hours=1, minutes=1), 100.0, 40.0)
+    await _insert_run(mongo_db, day + timedelta(hours=5), day + timedelta(hours=5, minutes=1), 100.0, 40.0)
+    await rollup_job.run_once()
+
+    # 1시 구간에 시작했지만 오래 걸려 워터마크보다 한참 뒤에 저장된 실행
+    await _insert_run(mongo_db, day + timedelta(hours=1, minutes=10), day + timedelta(hours=9), 300.0, 80.0)
+
+    # 늦게 저장된 1시 구간 + 워터마크 겹침 폭 안의 5시 구간
+    assert await rollup_job.run_once() == 2
+    hourly = await rollup_job.get_rollups("llama", "hour", day, day + timedelta(hours=2))
+    assert hourly[0]["run_count"] == 2
+    assert hourly[0]["throughput_tokens_per_sec"]["max"] == 300.0
+    daily = await rollup_job.get_rollups("llama", "day", day)
+    assert daily[0]["run_count"] == 3
+    state = await mongo_db.benchmark_rollup_state.find_one({"_id": "raw"})
+    assert state["inserted_at"] == day + timedelta(hours=9)
+
+
+async def test_rollup_splits_hardware_and_skips_ineligible_runs(mongo_db, rollup_job):
+    day = datetime(2024, 1, 1)
+    for minute in range(20):
+        await _insert_run(mongo_db, day + timedelta(hours=1, minutes=minute), day + timedelta(hours=2),
+                          100.0 + minute, 40.0)
+    await _insert_run(mongo_db, day + timedelta(hours=1), day + timedelta(hours=2), 900.0, 20.0, hardware="H100")
+    # bisect 중간 커밋 측정은 추세에서 제외
+    await _insert_run(mongo_db, day + timedelta(hours=1), day + timedelta(hours=2), 1.0, 999.0,
+                      baseline_eligible=False)
+
+    await rollup_job.run_once()
+
+    hourly = await rollup_job.get_rollups("llama", "hour", day)
+    assert [(r["hardware"], r["run_count"]) for r in hourly] == [("A100", 20), ("H100", 1)]
+    a100 = hourly[0]["throughput_tokens_per_sec"]
+    assert (a100["min"], a100["max"], a100["mean"]) == (100.0, 119.0, 109.5)
+    assert a100["p50"] == pytest.approx(109.5, rel=0.01)
+    assert hourly[0]["latency_ms"]["max"] == 40.0
+    # 실행 수만큼 커지는 원본 샘플 대신 고정 크기 히스토그램만 저장
+    stored = await rollup_job.collections["day"].find_one({"hardware": "A100"})
+    assert "throughput_samples" not in stored
+    assert stored["run_count"] == 20
+    h100 = await rollup_job.get_rollups("llama", "day", day, hardware="H100")
+    assert [r["throughput_tokens_per_sec"]["max"] for r in h100] == [900.0]
+
+
+async def test_legacy_rollups_are_rebuilt_per_hardware(mongo_db, rollup_job):
+    day = datetime(2024, 1, 1)
+    hourly = rollup_job.collections["hour"]
+    await hourly.create_index([("model_name", 1), ("bucket_start", 1)], unique=True)
+    await hourly.insert_one({"model_name": "llama", "bucket_start": day, "run_count": 7,
+                             "throughput_samples": [1.0] * 7})
+    await mongo_db.benchmark_rollup_state.insert_one({"_id": "raw", "inserted_at": day + timedelta(days=1)})
+    await _insert_run(mongo_db, day, day, 100.0, 40.0)
+
+    await rollup_job.ensure_indexes()
+    await rollup_job.run_once()
+
+    assert "model_name_1_bucket_start_1" not in await hourly.index_information()
+    assert [(r["hardware"], r["run_count"]) for r in await rollup_job.get_rollups("llama", "hour", day)] == [("A100", 1)]
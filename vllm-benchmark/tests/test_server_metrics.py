@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from benchmark.server_metrics import ServerMetricsSampler, parse_prometheus_text
+
+from conftest import _serve
+
+pytestmark = pytest.mark.anyio
+
+DCGM_TEXT = "\n".join([
+    "# HELP DCGM_FI_DEV_FB_USED Framebuffer memory used (in MiB).",
+    'DCGM_FI_DEV_FB_USED{gpu="0",Hostname="node-1",pod="vllm-0",namespace="serving"} 20480',
+    'DCGM_FI_DEV_FB_USED{gpu="1",Hostname="node-1",pod="vllm-0",namespace="serving"} 10240',
+    'DCGM_FI_DEV_FB_USED{gpu="2",Hostname="node-1",pod="trainer-7",namespace="ml"} 40960',
+    'DCGM_FI_DEV_FB_USED{gpu="3",Hostname="node-1"} 0',
+    'DCGM_FI_DEV_GPU_UTIL{gpu="0",pod="vllm-0"} 50',
+    'DCGM_FI_DEV_GPU_UTIL{gpu="2",pod="trainer-7"} 100',
+])
+
+
+def test_parse_keeps_only_lines_matching_label_filter():
+    names = frozenset({"DCGM_FI_DEV_FB_USED", "DCGM_FI_DEV_GPU_UTIL"})
+
+    assert parse_prometheus_text(DCGM_TEXT, names)["DCGM_FI_DEV_FB_USED"] == [20480, 10240, 40960, 0]
+    filtered = parse_prometheus_text(DCGM_TEXT, names, {"DCGM_FI_DEV_FB_USED": {"pod": "vllm-0"}})
+    assert filtered["DCGM_FI_DEV_FB_USED"] == [20480, 10240]
+    # 필터가 없는 지표는 그대로
+    assert filtered["DCGM_FI_DEV_GPU_UTIL"] == [50, 100]
+
+
+def test_parse_label_filter_handles_escaped_quotes():
+    text = 'DCGM_FI_DEV_FB_USED{note="a \\"quoted\\" value",pod="vllm-0"} 1024'
+    names = frozenset({"DCGM_FI_DEV_FB_USED"})
+
+    assert parse_prometheus_text(text, names, {"DCGM_FI_DEV_FB_USED": {"pod": "vllm-0"}}) == {
+        "DCGM_FI_DEV_FB_USED": [1024]}
+    assert parse_prometheus_text(text, names, {"DCGM_FI_DEV_FB_USED": {"pod": "other"}}) == {}
+
+
+@pytest.fixture
+async def dcgm_server():
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=DCGM_TEXT + "\n", content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    server = await _serve(app)
+    yield str(server.make_url("/metrics"))
+    await server.close()
+
+
+async def test_gpu_memory_counts_only_the_pods_gpus(dcgm_server):
+    sampler = ServerMetricsSampler([dcgm_server], interval_s=0.01, gpu_pod="vllm-0")
+    sampler.start()
+    metrics = await sampler.stop()
+
+    assert metrics.series["gpu_memory_used_gb"]
+    assert all(value == 30.0 for value in metrics.series["gpu_memory_used_gb"])
+    assert all(value == 50.0 for value in metrics.series["gpu_utilization"])
+
+
+async def test_gpu_memory_without_pod_sums_the_node(dcgm_server):
+    sampler = ServerMetricsSampler([dcgm_server], interval_s=0.01)
+    sampler.start()
+    metrics = await sampler.stop()
+
+    assert all(value == 70.0 for value in metrics.series["gpu_memory_used_gb"])
+
+
+async def test_stop_takes_a_final_scrape():
+    state = {"queries": 0}
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=f'vllm:prefix_cache_queries_total{{model_name="mock"}} {state["queries"]}\n',
+                            content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    server = await _serve(app)
+    try:
+        # 간격이 실행보다 길어 시작 시점 한 번만 수집되는 상황
+        sampler = ServerMetricsSampler([str(server.make_url("/metrics"))], interval_s=60.0)
+        sampler.start()
+        while not sampler._metrics.timestamps_s:
+            await asyncio.sleep(0.01)
+        state["queries"] = 500
+        result = await sampler.stop()
+    finally:
+        await server.close()
+
+    assert len(result.timestamps_s) == 2
+    assert result.counter_delta("prefix_cache_queries") == 500